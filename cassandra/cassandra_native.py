@@ -0,0 +1,264 @@
+"""
+Native asyncio CQL client for native_driver.py.
+
+Speaks the CQL native protocol v4 directly (the `cassandra` driver package
+would clash with this directory's name, and it isn't asyncio based). Each
+node gets cassandra.coreconnections connections, each multiplexing requests
+over stream ids; statements are prepared per connection. Requests go to
+the nodes round-robin, not token-aware like YCSB's driver. Statements match
+YCSB's cassandra-cql binding, so Cassandra and ScyllaDB work alike.
+"""
+
+import asyncio
+import itertools
+import struct
+
+PROTOCOL_VERSION = 0x04
+HEADER = struct.Struct(">BBhBi")
+
+OPCODE_ERROR = 0x00
+OPCODE_STARTUP = 0x01
+OPCODE_READY = 0x02
+OPCODE_AUTHENTICATE = 0x03
+OPCODE_RESULT = 0x08
+OPCODE_PREPARE = 0x09
+OPCODE_EXECUTE = 0x0A
+
+RESULT_ROWS = 0x0002
+RESULT_PREPARED = 0x0004
+
+ERROR_UNPREPARED = 0x2500
+
+QUERY_FLAG_VALUES = 0x01
+QUERY_FLAG_SKIP_METADATA = 0x02
+ROWS_FLAG_HAS_MORE_PAGES = 0x02
+
+MAX_STREAMS = 32768
+
+CONSISTENCY_LEVELS = {
+    "ANY": 0x00,
+    "ONE": 0x01,
+    "TWO": 0x02,
+    "THREE": 0x03,
+    "QUORUM": 0x04,
+    "ALL": 0x05,
+    "LOCAL_QUORUM": 0x06,
+    "EACH_QUORUM": 0x07,
+    "LOCAL_ONE": 0x0A,
+}
+
+YCSB_KEY_COLUMN = "y_id"
+
+
+class CqlError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{message} (error 0x{code:04x})")
+        self.code = code
+
+
+def string_map(entries: dict) -> bytes:
+    body = struct.pack(">H", len(entries))
+    for key, value in entries.items():
+        for item in (key.encode(), value.encode()):
+            body += struct.pack(">H", len(item)) + item
+    return body
+
+
+def bound_values(values: list) -> bytes:
+    body = struct.pack(">H", len(values))
+    for value in values:
+        if isinstance(value, str):
+            value = value.encode()
+        elif isinstance(value, int):
+            value = struct.pack(">i", value)
+        body += struct.pack(">i", len(value)) + value
+    return body
+
+
+def consistency_level(name: str) -> int:
+    if name.upper() not in CONSISTENCY_LEVELS:
+        raise ValueError(f"Unsupported consistency level {name}")
+    return CONSISTENCY_LEVELS[name.upper()]
+
+
+class CqlConnection:
+    """One connection; concurrent requests are told apart by stream id."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.pending = {}
+        self.free_streams = list(range(MAX_STREAMS - 1, 0, -1))
+        self.prepared = {}
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.reader_task = asyncio.create_task(self._read_frames())
+        opcode, _ = await self.request(
+            OPCODE_STARTUP, string_map({"CQL_VERSION": "3.0.0"})
+        )
+        if opcode == OPCODE_AUTHENTICATE:
+            raise CqlError(0, "Authentication is not supported by the native client")
+
+    async def _read_frames(self):
+        try:
+            while True:
+                header = await self.reader.readexactly(HEADER.size)
+                _, _, stream, opcode, length = HEADER.unpack(header)
+                body = await self.reader.readexactly(length)
+                future = self.pending.pop(stream, None)
+                if future is not None and not future.done():
+                    future.set_result((opcode, body))
+        except Exception as e:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"{self.host}: {e}"))
+            self.pending.clear()
+
+    async def request(self, opcode: int, body: bytes) -> tuple:
+        if not self.free_streams:
+            raise CqlError(0, f"No free stream ids on {self.host}")
+        stream = self.free_streams.pop()
+        future = asyncio.get_running_loop().create_future()
+        self.pending[stream] = future
+        self.writer.write(
+            HEADER.pack(PROTOCOL_VERSION, 0, stream, opcode, len(body)) + body
+        )
+        try:
+            opcode, body = await future
+        finally:
+            self.free_streams.append(stream)
+        if opcode == OPCODE_ERROR:
+            code, length = struct.unpack_from(">iH", body)
+            raise CqlError(code, body[6 : 6 + length].decode(errors="replace"))
+        return opcode, body
+
+    async def prepare(self, query: str) -> bytes:
+        if query not in self.prepared:
+            encoded = query.encode()
+            _, body = await self.request(
+                OPCODE_PREPARE, struct.pack(">i", len(encoded)) + encoded
+            )
+            kind, length = struct.unpack_from(">iH", body)
+            if kind != RESULT_PREPARED:
+                raise CqlError(0, f"Unexpected PREPARE result kind {kind}")
+            self.prepared[query] = body[6 : 6 + length]
+        return self.prepared[query]
+
+    async def execute(self, query: str, values: list, consistency: int) -> int:
+        """Execute a statement; returns the number of rows it returned."""
+        for attempt in range(2):
+            statement = await self.prepare(query)
+            body = (
+                struct.pack(">H", len(statement))
+                + statement
+                + struct.pack(
+                    ">HB", consistency, QUERY_FLAG_VALUES | QUERY_FLAG_SKIP_METADATA
+                )
+                + bound_values(values)
+            )
+            try:
+                _, result = await self.request(OPCODE_EXECUTE, body)
+                break
+            except CqlError as e:
+                # The node forgot the statement (e.g. it restarted): prepare again
+                if e.code != ERROR_UNPREPARED or attempt:
+                    raise
+                self.prepared.pop(query, None)
+        (kind,) = struct.unpack_from(">i", result)
+        if kind != RESULT_ROWS:
+            return 0
+        flags, _ = struct.unpack_from(">ii", result, 4)
+        offset = 12
+        if flags & ROWS_FLAG_HAS_MORE_PAGES:
+            (length,) = struct.unpack_from(">i", result, offset)
+            offset += 4 + max(length, 0)
+        (rows,) = struct.unpack_from(">i", result, offset)
+        return rows
+
+    def close(self):
+        self.reader_task.cancel()
+        self.writer.close()
+
+
+class CqlNativeClient:
+    def __init__(self, properties: dict, threadcount: int):
+        self.hosts = properties.get("hosts", "localhost").split(",")
+        self.port = int(properties.get("port", 9042))
+        self.keyspace = properties.get("cassandra.keyspace", "ycsb")
+        self.connections_per_host = int(properties.get("cassandra.coreconnections", 1))
+        self.read_consistency = consistency_level(
+            properties.get("cassandra.readconsistencylevel", "ONE")
+        )
+        self.write_consistency = consistency_level(
+            properties.get("cassandra.writeconsistencylevel", "ONE")
+        )
+        self.connections = []
+
+    async def connect(self):
+        for host in self.hosts:
+            for _ in range(self.connections_per_host):
+                connection = CqlConnection(host.strip(), self.port)
+                await connection.connect()
+                self.connections.append(connection)
+        self.next_connection = itertools.cycle(self.connections)
+
+    async def close(self):
+        for connection in self.connections:
+            connection.close()
+
+    def _table(self, table):
+        return f"{self.keyspace}.{table}"
+
+    @staticmethod
+    def _columns(fields):
+        return "*" if fields is None else ", ".join(fields)
+
+    async def _execute(self, query, values, consistency) -> int:
+        return await next(self.next_connection).execute(query, values, consistency)
+
+    async def read(self, table, key, fields):
+        rows = await self._execute(
+            f"SELECT {self._columns(fields)} FROM {self._table(table)} "
+            f"WHERE {YCSB_KEY_COLUMN} = ? LIMIT 1",
+            [key],
+            self.read_consistency,
+        )
+        return "OK" if rows else "NOT_FOUND"
+
+    async def scan(self, table, startkey, recordcount, fields):
+        await self._execute(
+            f"SELECT {self._columns(fields)} FROM {self._table(table)} "
+            f"WHERE token({YCSB_KEY_COLUMN}) >= token(?) LIMIT ?",
+            [startkey, recordcount],
+            self.read_consistency,
+        )
+        return "OK"
+
+    async def update(self, table, key, values):
+        assignments = ", ".join(f"{field} = ?" for field in values)
+        await self._execute(
+            f"UPDATE {self._table(table)} SET {assignments} "
+            f"WHERE {YCSB_KEY_COLUMN} = ?",
+            [*values.values(), key],
+            self.write_consistency,
+        )
+        return "OK"
+
+    async def insert(self, table, key, values):
+        columns = ", ".join([YCSB_KEY_COLUMN, *values])
+        placeholders = ", ".join("?" * (len(values) + 1))
+        await self._execute(
+            f"INSERT INTO {self._table(table)} ({columns}) VALUES ({placeholders})",
+            [key, *values.values()],
+            self.write_consistency,
+        )
+        return "OK"
+
+    async def delete(self, table, key):
+        await self._execute(
+            f"DELETE FROM {self._table(table)} WHERE {YCSB_KEY_COLUMN} = ?",
+            [key],
+            self.write_consistency,
+        )
+        return "OK"
@@ -1,58 +1,123 @@
-import os
-import subprocess
-import time
+import re
 
 from halo import Halo
 
+from engine_adapter import EngineAdapter
+from readiness import docker_exec, timed_stage, wait_for_nodes, wait_until
+from resources import subnet_address
 
-def wait_for_cassandra_cluster_init(node_count, max_wait=300):
+KEYSPACE_STRATEGIES = {
+    "simple": "SimpleStrategy",
+    "network": "NetworkTopologyStrategy",
+}
+
+# Short names used in result labels
+COMPACTION_LABELS = {
+    "SizeTieredCompactionStrategy": "stcs",
+    "LeveledCompactionStrategy": "lcs",
+    "TimeWindowCompactionStrategy": "twcs",
+    "UnifiedCompactionStrategy": "ucs",
+}
+
+YCSB_DEFAULT_CONSISTENCY_LEVEL = "ONE"
+
+# Params that change how the data is stored (consistency levels don't)
+CASSANDRA_DATASET_PARAMS = (
+    "cassandra_rf",
+    "cassandra_strategy",
+    "cassandra_compaction",
+    "cassandra_compression",
+)
+
+# "UN  172.18.0.2  70.2 KiB  16  100.0%  <host id>  rack1"
+NODETOOL_STATUS_RE = re.compile(r"^([UD])([NLJM])\s+(\S+)", re.MULTILINE)
+
+
+# cqlsh prints a single-column result as header, dashes, then the values
+CQLSH_VALUE_RE = re.compile(r"^-+\n\s*(\S+)", re.MULTILINE)
+
+
+def parse_nodetool_status(output):
+    """Map each node address in `nodetool status` output to its state (e.g. "UN")."""
+    return {
+        address: status + state
+        for status, state, address in NODETOOL_STATUS_RE.findall(output)
+    }
+
+
+def cassandra_node_ready(container, node_count):
+    """The node sees the whole ring Up/Normal and serves CQL clients."""
+    status = docker_exec(container, "nodetool", "status", timeout=15)
+    if status.returncode != 0:
+        return False
+    states = parse_nodetool_status(status.stdout)
+    if list(states.values()).count("UN") < node_count:
+        return False
+    binary = docker_exec(container, "nodetool", "statusbinary", timeout=15)
+    return binary.stdout.strip() == "running"
+
+
+def cassandra_requests_served(container):
+    """Client requests this node has coordinated (Native-Transport-Requests completed)."""
+    output = docker_exec(container, "nodetool", "tpstats", timeout=30).stdout
+    for line in output.splitlines():
+        fields = line.split()
+        if fields and fields[0] == "Native-Transport-Requests":
+            return int(fields[3])  # Active, Pending, Completed, ...
+    raise ValueError(f"No Native-Transport-Requests pool in tpstats of {container}")
+
+
+def cassandra_cql_ready(container="cassandra-1"):
+    result = docker_exec(
+        container, "cqlsh", "-e", "SELECT release_version FROM system.local;"
+    )
+    return result.returncode == 0
+
+
+def cassandra_nodes(node_count, prefix="cassandra"):
+    return [f"{prefix}-{i}" for i in range(1, node_count + 1)]
+
+
+def wait_for_cassandra_cluster_init(node_count, max_wait=300, prefix="cassandra"):
+    """Wait until every node sees the full ring as UN and CQL answers.
+
+    Returns the per-stage startup times.
+    """
     print("Waiting for Cassandra cluster initialization...")
-    try:
-        start_time = time.time()
-        ready = False
+    stages = {}
+    nodes = cassandra_nodes(node_count, prefix)
 
-        spinner = Halo(
-            text="Waiting for Cassandra cluster to be ready (This can be multiple minutes)",
-            spinner="dots",
+    spinner = Halo(
+        text="Waiting for Cassandra cluster to be ready (This can be multiple minutes)",
+        spinner="dots",
+    )
+    spinner.start()
+    try:
+        ready = timed_stage(
+            stages,
+            "ring_up",
+            wait_for_nodes,
+            nodes,
+            lambda node: cassandra_node_ready(node, node_count),
+            max_wait,
+        ) and timed_stage(
+            stages,
+            "cql_ready",
+            wait_until,
+            lambda: cassandra_cql_ready(nodes[0]),
+            max_wait,
         )
-        spinner.start()
-
-        while time.time() - start_time < max_wait:
-            try:
-                result = subprocess.run(
-                    [
-                        "sudo",
-                        "docker",
-                        "exec",
-                        "cassandra-1",
-                        "nodetool",
-                        "status",
-                    ],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    timeout=10,
-                )
-
-                if result.returncode == 0:
-                    output = result.stdout
-                    up_nodes = output.count("UN")
-                    if up_nodes >= node_count:
-                        ready = True
-                        break
-            except Exception:
-                pass
-
-            time.sleep(5)
 
         if ready:
             spinner.succeed("Cassandra cluster ready")
         else:
             spinner.warn(
-                "Cassandra cluster did not fully stabilize within timeout, try running: `sudo docker exec cassandra-1 nodetool status`, if no errors, the cluster is ready, so add more time in this function"
+                f"Cassandra cluster did not fully stabilize within timeout, try running: `sudo docker exec {nodes[0]} nodetool status`, if no errors, the cluster is ready, so add more time in this function"
             )
     except Exception as e:
+        spinner.stop()
         print(f"Warning: Could not initialize Cassandra cluster: {e}")
+    return stages
 
 
 def generate_cassandra_docker_compose(node_count, config):
@@ -63,6 +128,7 @@ def generate_cassandra_docker_compose(node_count, config):
         cassandra_yml = f.read()
 
     seeds = ",".join([f"cassandra-{j}" for j in range(1, node_count + 1)])
+    volumes = ["cassandra-1-data"]
     for i in range(2, node_count + 1):
         port = 9042 + i - 1
         cassandra_yml += f"""
@@ -74,81 +140,214 @@ def generate_cassandra_docker_compose(node_count, config):
     environment:
       CASSANDRA_SEEDS: {seeds}
       CASSANDRA_CLUSTER_NAME: ycsb-cluster
+      CASSANDRA_ENDPOINT_SNITCH: GossipingPropertyFileSnitch
       CASSANDRA_DC: dc1
       CASSANDRA_RACK: rack1
       CASSANDRA_LISTEN_ADDRESS: cassandra-{i}
       MAX_HEAP_SIZE: 256M
       HEAP_NEWSIZE: 50M
+    volumes:
+      - cassandra-{i}-data:/var/lib/cassandra
     networks:
-      - cassandra-net
+      cassandra-net:
+        ipv4_address: {subnet_address(config["CASSANDRA_SUBNET"], i)}
 """
+        volumes.append(f"cassandra-{i}-data")
 
-    cassandra_yml += """
+    cassandra_yml += f"""
 networks:
   cassandra-net:
     driver: bridge
+    ipam:
+      config:
+        - subnet: {config["CASSANDRA_SUBNET"]}
+
+volumes:
+"""
+    for volume in volumes:
+        cassandra_yml += f"""  {volume}:
+    name: ycsb-{volume}
 """
 
     with open(docker_compose_path, "w") as f:
         f.write(cassandra_yml)
 
 
-def create_cassandra_keyspace(node_count):
-    print("Creating Cassandra keyspace and table...")
+def cassandra_settings(params):
+    """Effective keyspace, consistency and table settings of a run."""
+    return {
+        "replication_factor": params["cassandra_rf"] or params["node_count"],
+        "strategy": params["cassandra_strategy"] or "SimpleStrategy",
+        "read_consistency": params["cassandra_read_cl"]
+        or YCSB_DEFAULT_CONSISTENCY_LEVEL,
+        "write_consistency": params["cassandra_write_cl"]
+        or YCSB_DEFAULT_CONSISTENCY_LEVEL,
+        "compaction": params["cassandra_compaction"],
+        "compression": params["cassandra_compression"],
+    }
+
+
+def cassandra_dataset_settings(params):
+    """The settings that shape the stored data (all but consistency levels)."""
+    return {
+        key: value
+        for key, value in cassandra_settings(params).items()
+        if not key.endswith("_consistency")
+    }
+
+
+def cassandra_variant(params):
+    """Result label for explicitly set settings, e.g. "rf3-rquorum-wone-lcs"."""
+    parts = []
+    if params["cassandra_rf"]:
+        parts.append(f"rf{params['cassandra_rf']}")
+    if params["cassandra_strategy"] == "NetworkTopologyStrategy":
+        parts.append("nts")
+    if params["cassandra_read_cl"]:
+        parts.append(f"r{params['cassandra_read_cl'].lower()}")
+    if params["cassandra_write_cl"]:
+        parts.append(f"w{params['cassandra_write_cl'].lower()}")
+    compaction = params["cassandra_compaction"]
+    if compaction:
+        parts.append(COMPACTION_LABELS.get(compaction, compaction.lower()))
+    compression = params["cassandra_compression"]
+    if compression:
+        parts.append(compression.lower().removesuffix("compressor") or "none")
+    return "-".join(parts) or None
+
+
+def cassandra_datacenter(container):
+    """The datacenter a node reports (NetworkTopologyStrategy must name it)."""
+    result = docker_exec(
+        container, "cqlsh", "-e", "SELECT data_center FROM system.local;", timeout=30
+    )
+    match = CQLSH_VALUE_RE.search(result.stdout)
+    if result.returncode != 0 or not match:
+        raise RuntimeError(f"Could not read the datacenter of {container}")
+    return match.group(1)
+
+
+def create_cassandra_keyspace(node_count, settings=None, container="cassandra-1"):
+    """(Re)create the ycsb keyspace and table with the run's settings.
+
+    The keyspace is dropped first so that a new replication factor or table
+    options never inherit anything from a previous run on the same cluster.
+    """
+    settings = settings or {
+        "replication_factor": node_count,
+        "strategy": "SimpleStrategy",
+        "compaction": None,
+        "compression": None,
+    }
+    print(
+        f"Creating Cassandra keyspace and table "
+        f"({settings['strategy']}, RF={settings['replication_factor']})..."
+    )
+    table_options = []
+    if settings["compaction"]:
+        table_options.append(f"compaction = {{'class': '{settings['compaction']}'}}")
+    if settings["compression"] == "none":
+        table_options.append("compression = {'enabled': 'false'}")
+    elif settings["compression"]:
+        table_options.append(f"compression = {{'class': '{settings['compression']}'}}")
+    with_options = f" WITH {' AND '.join(table_options)}" if table_options else ""
+
     try:
+        if settings["strategy"] == "NetworkTopologyStrategy":
+            replication = f"{{'class': 'NetworkTopologyStrategy', '{cassandra_datacenter(container)}': {settings['replication_factor']}}}"
+        else:
+            replication = f"{{'class': 'SimpleStrategy', 'replication_factor': {settings['replication_factor']}}}"
         cql_commands = f"""
-CREATE KEYSPACE IF NOT EXISTS ycsb WITH REPLICATION = {{'class': 'SimpleStrategy', 'replication_factor': {node_count}}};
+DROP KEYSPACE IF EXISTS ycsb;
+CREATE KEYSPACE ycsb WITH REPLICATION = {replication};
 USE ycsb;
-CREATE TABLE IF NOT EXISTS usertable (y_id varchar PRIMARY KEY, field0 varchar, field1 varchar, field2 varchar, field3 varchar, field4 varchar, field5 varchar, field6 varchar, field7 varchar, field8 varchar, field9 varchar);
+CREATE TABLE usertable (y_id varchar PRIMARY KEY, field0 varchar, field1 varchar, field2 varchar, field3 varchar, field4 varchar, field5 varchar, field6 varchar, field7 varchar, field8 varchar, field9 varchar){with_options};
 """
-        subprocess.run(
-            [
-                "sudo",
-                "docker",
-                "exec",
-                "cassandra-1",
-                "cqlsh",
-                "-e",
-                cql_commands,
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=10,
+        result = docker_exec(
+            container,
+            "cqlsh",
+            "--request-timeout=60",
+            "-e",
+            cql_commands,
+            timeout=90,
         )
+        if result.returncode != 0:
+            print(f"Warning: Could not create keyspace/table: {result.stderr.strip()}")
+            return
         print("✓ Keyspace and table created")
     except Exception as e:
         print(f"Warning: Could not create keyspace/table: {e}")
 
 
-def handle_cassandra_workload(
-    workload_path, params, config, ycsb_wrapper, parse_ycsb_output
-):
-    results = {
-        "workload": os.path.splitext(os.path.basename(params["workload_path"]))[0],
-        "database": params["db"],
-        "node_count": params["node_count"],
-        "phases": [],
-    }
+def truncate_cassandra_table(container="cassandra-1"):
+    try:
+        docker_exec(container, "cqlsh", "-e", "TRUNCATE ycsb.usertable;", timeout=120)
+    except Exception as e:
+        print(f"Warning: Could not truncate Cassandra table: {e}")
+
+
+class CassandraEngine(EngineAdapter):
+    """An Apache Cassandra ring; every node is a CQL contact point."""
+
+    name = "cassandra"
+    node_prefix = "cassandra"  # containers are <node_prefix>-1, -2, ...
+    ycsb_binding = "cassandra-cql"
 
-    time.sleep(5)
-    create_cassandra_keyspace(params["node_count"])
-
-    print("Starting YCSB load phase...")
-    load_output = ycsb_wrapper(config["YCSB_LOAD_COMMAND"], 0, workload_path)
-    load_data = parse_ycsb_output(load_output, "load", 0)
-    results["phases"].append(load_data)
-    print("\n\n✓ Load phase complete!\n")
-
-    print(f"Starting {params['iteration_count']} run iterations...")
-    for i in range(params["iteration_count"]):
-        print(
-            f"\n Running iteration {i + 1}/{params['iteration_count']}...",
-            end="",
-            flush=True,
+    def generate_compose(self, params, config):
+        generate_cassandra_docker_compose(params["node_count"], config)
+
+    def nodes(self, params):
+        return cassandra_nodes(params["node_count"], self.node_prefix)
+
+    def wait_ready(self, params, config):
+        return wait_for_cassandra_cluster_init(
+            params["node_count"], prefix=self.node_prefix
+        )
+
+    def setup_schema(self, params, config):
+        create_cassandra_keyspace(
+            params["node_count"],
+            cassandra_dataset_settings(params),
+            self.nodes(params)[0],
         )
-        run_output = ycsb_wrapper(config["YCSB_RUN_COMMAND"], i, workload_path)
-        run_data = parse_ycsb_output(run_output, "run", i)
-        results["phases"].append(run_data)
 
-    print("\n✓ Done running all iterations!")
-    return results
+    def connection_properties(self, params, config):
+        properties = f"""
+# Cassandra connection settings (auto-added, every node as contact point)
+hosts={",".join(self.node_addresses())}
+port=9042
+"""
+        if params["connection_pool_size"]:
+            properties += (
+                f"cassandra.coreconnections={params['connection_pool_size']}\n"
+                f"cassandra.maxconnections={params['connection_pool_size']}\n"
+            )
+        if params["cassandra_read_cl"]:
+            properties += (
+                f"cassandra.readconsistencylevel={params['cassandra_read_cl']}\n"
+            )
+        if params["cassandra_write_cl"]:
+            properties += (
+                f"cassandra.writeconsistencylevel={params['cassandra_write_cl']}\n"
+            )
+        return properties
+
+    def reset(self, params, config):
+        truncate_cassandra_table(self.nodes(params)[0])
+
+    def data_nodes(self, params):
+        return self.nodes(params)
+
+    def requests_served(self, container):
+        return cassandra_requests_served(container)
+
+    def variant(self, params):
+        return cassandra_variant(params)
+
+    def settings(self, params):
+        return {"cassandra": cassandra_settings(params)}
+
+    def dataset_settings(self, params):
+        if any(params[key] for key in CASSANDRA_DATASET_PARAMS):
+            return {"cassandra": cassandra_dataset_settings(params)}
+        return {}
@@ -0,0 +1,268 @@
+"""
+Statistical comparison of two result sets (baseline vs candidate).
+
+    python3 compare.py BASELINE CANDIDATE [--test welch|mannwhitney]
+        [--alpha A] [--min-change C] [--pool N] [--json PATH]
+
+BASELINE and CANDIDATE are each one of:
+    results/redis/3/workloada.json   a results JSON file
+    42                               a run id in the results store
+    redis:3:workloada[@rev]          the latest stored run(s) of that
+                                     db/node count/workload (optionally at a
+                                     git revision prefix); --pool N pools
+                                     the run iterations of the last N runs.
+                                     A base db matches all its variants, a
+                                     label like cassandra-rf3 only itself
+
+Exit code: 0 without regressions, 1 if any metric regressed, 2 on bad input.
+"""
+
+import json
+import math
+import os
+import sys
+
+import numpy as np
+from scipy import stats
+
+from config import CONFIG
+from results_store import connect, db_condition, load_run
+from stats_engine import phases_to_array
+
+# Overall metrics worth comparing; per-op counts depend on run length only
+COMPARED_OVERALL_METRICS = ("overall.throughput_ops_sec",)
+
+# Latency metrics of a single extreme sample, too noisy to gate on
+UNCOMPARED_LATENCY_METRICS = ("min_latency_us", "max_latency_us")
+
+TESTS = ("welch", "mannwhitney")
+
+
+def higher_is_better(key: str) -> bool:
+    return key.endswith("throughput_ops_sec")
+
+
+def compared_metric(key: str) -> bool:
+    if key in COMPARED_OVERALL_METRICS:
+        return True
+    return key.endswith("_latency_us") and not key.endswith(UNCOMPARED_LATENCY_METRICS)
+
+
+def run_phases(results: dict) -> list:
+    return [p for p in results["phases"] if p["phase"] == "run"]
+
+
+def resolve_side(spec: str, pool: int = 1) -> tuple:
+    """(label, run phases) of one side of the comparison."""
+    if os.path.isfile(spec):
+        with open(spec, "r") as f:
+            return spec, run_phases(json.load(f))
+
+    if spec.isdigit():
+        return f"run #{spec}", run_phases(load_run(int(spec), include_arrays=False))
+
+    selector, _, revision = spec.partition("@")
+    fields = selector.split(":")
+    if len(fields) != 3 or not fields[1].isdigit():
+        raise ValueError(f"Not a results file, run id or db:nodes:workload: {spec}")
+    db, node_count, workload = fields[0], int(fields[1]), fields[2]
+
+    db_clause, db_values = db_condition(db)
+    connection = connect()
+    try:
+        rows = connection.execute(
+            f"SELECT id FROM runs WHERE {db_clause} AND node_count = ?"
+            " AND workload = ? AND (? = '' OR git_revision LIKE ? || '%')"
+            " ORDER BY created_at DESC LIMIT ?",
+            (*db_values, node_count, workload, revision, revision, pool),
+        ).fetchall()
+        if not rows:
+            raise ValueError(f"No stored runs match {spec}")
+        phases = []
+        for row in rows:
+            phases += run_phases(
+                load_run(row["id"], include_arrays=False, connection=connection)
+            )
+    finally:
+        connection.close()
+    run_ids = ", ".join(f"#{row['id']}" for row in rows)
+    return f"{spec} ({run_ids})", phases
+
+
+def hedges_g(a: np.ndarray, b: np.ndarray) -> float:
+    """Standardized mean difference (b - a), bias-corrected for small samples."""
+    n_a, n_b = len(a), len(b)
+    if n_a < 2 or n_b < 2:
+        return math.nan
+    pooled_var = ((n_a - 1) * a.var(ddof=1) + (n_b - 1) * b.var(ddof=1)) / (
+        n_a + n_b - 2
+    )
+    if pooled_var == 0:
+        return (
+            0.0
+            if a.mean() == b.mean()
+            else math.copysign(math.inf, b.mean() - a.mean())
+        )
+    correction = 1 - 3 / (4 * (n_a + n_b) - 9)
+    return correction * (b.mean() - a.mean()) / math.sqrt(pooled_var)
+
+
+def compare_metric(a: np.ndarray, b: np.ndarray, test: str) -> tuple:
+    """(p-value, effect size) of candidate b against baseline a."""
+    if test == "welch":
+        if len(a) < 2 or len(b) < 2:
+            return math.nan, math.nan
+        if a.var() == 0 and b.var() == 0:
+            return (1.0 if a.mean() == b.mean() else 0.0), hedges_g(a, b)
+        return float(stats.ttest_ind(a, b, equal_var=False).pvalue), hedges_g(a, b)
+
+    # Mann-Whitney U with the rank-biserial correlation as effect size
+    u = stats.mannwhitneyu(b, a, alternative="two-sided")
+    return float(u.pvalue), 2 * float(u.statistic) / (len(a) * len(b)) - 1
+
+
+def compare_phases(
+    baseline: list,
+    candidate: list,
+    test: str = "welch",
+    alpha: float | None = None,
+    min_change: float | None = None,
+) -> list:
+    """Compare every latency/throughput metric present on both sides.
+
+    A metric is flagged when the difference is significant at `alpha` and
+    the relative change of the mean is at least `min_change`.
+    """
+    alpha = CONFIG["COMPARE_ALPHA"] if alpha is None else alpha
+    min_change = CONFIG["COMPARE_MIN_CHANGE"] if min_change is None else min_change
+    keys, values = phases_to_array([baseline, candidate])
+
+    rows = []
+    for m, key in enumerate(keys):
+        a = values[0, m][~np.isnan(values[0, m])]
+        b = values[1, m][~np.isnan(values[1, m])]
+        if not compared_metric(key) or not len(a) or not len(b):
+            continue
+        mean_a, mean_b = float(a.mean()), float(b.mean())
+        delta = mean_b - mean_a
+        relative = delta / mean_a if mean_a else math.nan
+        p_value, effect = compare_metric(a, b, test)
+
+        verdict = "unchanged"
+        if math.isnan(p_value):
+            verdict = "too few samples"
+        elif p_value < alpha and abs(relative) >= min_change:
+            better = (delta > 0) == higher_is_better(key)
+            verdict = "improvement" if better else "regression"
+
+        rows.append(
+            {
+                "metric": key,
+                "n": (len(a), len(b)),
+                "baseline": mean_a,
+                "candidate": mean_b,
+                "delta": delta,
+                "relative_change": relative,
+                "p_value": p_value,
+                "effect_size": effect,
+                "verdict": verdict,
+            }
+        )
+    return rows
+
+
+def json_rows(rows: list) -> list:
+    """Rows with non-finite statistics as None, for strict JSON.
+
+    NaN means too few samples; Hedges' g is infinite when both sides are
+    constant but differ.
+    """
+    return [
+        {
+            key: None
+            if isinstance(value, float) and not math.isfinite(value)
+            else value
+            for key, value in row.items()
+        }
+        for row in rows
+    ]
+
+
+def print_comparison(rows: list, test: str):
+    effect_name = "g" if test == "welch" else "r_rb"
+    print(
+        f"{'metric':<34} {'baseline':>12} {'candidate':>12} {'change':>8}"
+        f" {'p':>8} {effect_name:>7}  verdict"
+    )
+    for row in rows:
+        print(
+            f"{row['metric']:<34} {row['baseline']:>12.1f} {row['candidate']:>12.1f}"
+            f" {row['relative_change']:>+8.1%} {row['p_value']:>8.4f}"
+            f" {row['effect_size']:>7.2f}  {row['verdict']}"
+        )
+
+
+def main():
+    args = sys.argv[1:]
+    options = {
+        "--test": "welch",
+        "--alpha": None,
+        "--min-change": None,
+        "--pool": "1",
+        "--json": None,
+    }
+    sides = []
+    while args:
+        if args[0] in options and len(args) >= 2:
+            options[args[0]] = args[1]
+            args = args[2:]
+        elif not args[0].startswith("--"):
+            sides.append(args.pop(0))
+        else:
+            print(__doc__)
+            return 2
+    if len(sides) != 2 or options["--test"] not in TESTS:
+        print(__doc__)
+        return 2
+
+    try:
+        pool = int(options["--pool"])
+        (label_a, baseline), (label_b, candidate) = (
+            resolve_side(spec, pool) for spec in sides
+        )
+        rows = compare_phases(
+            baseline,
+            candidate,
+            test=options["--test"],
+            alpha=float(options["--alpha"]) if options["--alpha"] else None,
+            min_change=(
+                float(options["--min-change"]) if options["--min-change"] else None
+            ),
+        )
+    except (ValueError, KeyError, OSError) as e:
+        print(f"Error: {e}")
+        return 2
+
+    print(f"Baseline:  {label_a} ({len(baseline)} iterations)")
+    print(f"Candidate: {label_b} ({len(candidate)} iterations)\n")
+    print_comparison(rows, options["--test"])
+
+    if options["--json"]:
+        with open(options["--json"], "w") as f:
+            json.dump(
+                {"baseline": label_a, "candidate": label_b, "metrics": json_rows(rows)},
+                f,
+                indent=2,
+                allow_nan=False,
+            )
+
+    regressions = [row["metric"] for row in rows if row["verdict"] == "regression"]
+    if regressions:
+        print(f"\n✗ {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\n✓ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,12 +2,87 @@ import os
 
 CONFIG = {
     "YCSB_BIN_PATH": os.path.expanduser("~/ycsb-0.17.0/bin/ycsb.sh"),
+    # Load drivers (--driver): YCSB's JVM client or the asyncio native_driver.py
+    "DRIVERS": ["ycsb", "native"],
+    "NATIVE_DRIVER_PATH": "native_driver.py",
+    # Request traces replayed by the native driver (--trace), see trace_generator
+    "TRACES_PATH": "traces",
+    "TRACE_SEED": 42,
     "WORKLOADS_PATH": "./workloads",
     "RESULTS_PATH": "results",
+    "RESULTS_DB_PATH": "results/results.db",
     "DOCKER_COMPOSE_BASE_FILENAME": "docker-compose-base.yml",
     "YCSB_RUN_COMMAND": "run",
     "YCSB_LOAD_COMMAND": "load",
-    "SUPPORTED_DBS": ["redis", "mongodb", "cassandra"],
+    # Engine adapters are registered in engines.py
+    "SUPPORTED_DBS": ["redis", "keydb", "mongodb", "cassandra", "scylladb"],
+    # Cluster topologies per database; the first one is the default
+    "TOPOLOGIES": {
+        "redis": ["replication", "cluster"],
+        "keydb": ["replication", "cluster"],
+        "mongodb": ["replicaset", "sharded"],
+        "cassandra": ["ring"],
+        "scylladb": ["ring"],
+    },
+    # Redis/KeyDB Cluster: fixed node IPs, reachable from the host
+    "REDIS_CLUSTER_SUBNET": "172.30.0.0/24",
+    # Fixed node IPs of the replica set / ring; node 1's address is in the base file
+    "MONGODB_SUBNET": "172.31.0.0/24",
+    "CASSANDRA_SUBNET": "172.29.0.0/24",
+    "SCYLLADB_SUBNET": "172.28.0.0/24",
+    "SCYLLADB_SMP": 1,  # shards (pinned threads) per ScyllaDB node
+    "SCYLLADB_MEMORY": "1G",  # memory per ScyllaDB node (below --pin-resources' mem_limit)
+    "MONGODB_CONFIG_SERVERS": 1,  # members of the sharded cluster's config replica set
+    "MONGODB_ROUTERS": 2,  # mongos routers, published on 27017, 27018, ...
+    "MONGODB_CHUNKS_PER_SHARD": 4,  # chunks presplit per shard before loading
+    "MONGODB_READ_PREFERENCES": [
+        "primary",
+        "primaryPreferred",
+        "secondary",
+        "secondaryPreferred",
+        "nearest",
+    ],
+    "CASSANDRA_CONSISTENCY_LEVELS": [
+        "ANY",
+        "ONE",
+        "TWO",
+        "THREE",
+        "QUORUM",
+        "ALL",
+        "LOCAL_ONE",
+        "LOCAL_QUORUM",
+        "EACH_QUORUM",
+    ],
+    "DOCKER_COMMAND": ["sudo", "docker"],  # docker CLI invocation (or a stand-in)
+    "TC_COMMAND": ["sudo", "tc"],  # shapes the containers' host-side veths
+    # Inter-node network profiles (--network-profile). rtt_ms/jitter_ms are per
+    # round trip, loss_pct per packet and direction, rate_mbit per receiving
+    # node; with "zones", nodes are dealt out round-robin and only traffic
+    # between zones is shaped (default: every node is its own zone)
+    "NETWORK_PROFILES": {
+        "same-rack": {"rtt_ms": 0.2},
+        "cross-az": {"rtt_ms": 1, "jitter_ms": 0.2, "zones": 3},
+        "cross-region": {"rtt_ms": 40, "jitter_ms": 4, "loss_pct": 1},
+        "wan-100mbit": {"rtt_ms": 20, "rate_mbit": 100},
+    },
+    "YCSB_TIMEOUT_SEC": 600,
+    "CORES_PER_YCSB_CLIENT": 4,
+    "SATURATION_THREADCOUNTS": [1, 2, 4, 8, 16, 32, 64, 128],
+    "SATURATION_MIN_GAIN": 0.05,  # relative throughput gain that counts as progress
+    "SATURATION_PATIENCE": 2,  # steps without progress before stopping
+    "OPEN_LOOP_THREADCOUNT": 64,  # client threads available to hold a target rate
+    "OPEN_LOOP_MIN_ACHIEVED": 0.95,  # achieved/offered rate below this is saturated
+    "STAGE_WARMUP_FRACTION": 0.9,  # share of steady throughput that ends a stage's warm-up
+    "SNAPSHOT_CACHE_PATH": "snapshots",
+    "SNAPSHOT_CACHE_BUDGET_GB": 20,
+    "SNAPSHOT_HELPER_IMAGE": "alpine:latest",
+    "CLIENT_CPU_FRACTION": 0.25,  # share of host CPUs reserved for YCSB when pinning
+    "NODE_MEMORY_FRACTION": 0.75,  # share of host memory split between the nodes
+    "FAULT_RECOVERY_FRACTION": 0.9,  # share of baseline throughput that counts as recovered
+    "FAULT_P99_TOLERANCE": 1.2,  # p99 within this factor of baseline counts as recovered
+    "ADAPTIVE_MIN_ITERATIONS": 3,  # iterations before the CI is first checked
+    "COMPARE_ALPHA": 0.05,  # significance level of compare.py
+    "COMPARE_MIN_CHANGE": 0.05,  # relative change below which nothing is flagged
 }
 
 # Runtime parameters (set during main())
@@ -17,4 +92,42 @@ params = {
     "workload_path": None,
     "iteration_count": 1,
     "keep_alive": False,
+    "status_interval": 10,
+    "client_count": 1,
+    "skip_load": False,
+    "mode": "benchmark",
+    "driver": "ycsb",  # one of DRIVERS
+    "trace": None,  # trace file replayed in run phases (native driver only)
+    "saturation_threadcounts": None,
+    "saturation_targets": None,
+    "network_profile": None,  # key of CONFIG["NETWORK_PROFILES"]
+    "network": None,  # network shaping currently applied to the cluster
+    "faults": None,  # fault events applied during every run iteration
+    "schedule": None,  # stages loaded from a schedule file, see schedule_handler
+    "open_loop_rates": None,  # offered-rate schedule, see utils.parse_rate_schedule
+    "p99_slo_us": None,
+    "snapshot_cache": False,
+    "snapshot": None,  # restore/save info of the dataset snapshot, if any
+    "matrix": None,  # cluster reuse info when driven by matrix.py
+    "startup": None,  # per-stage cluster startup times
+    "pin_resources": False,
+    "client_cpus": None,  # CPUs reserved for YCSB (default: CLIENT_CPU_FRACTION)
+    "placement": None,  # CPU/memory placement of nodes and client, if pinned
+    "telemetry_interval": 1.0,  # seconds between resource samples, 0 disables
+    "target_precision": None,  # stop iterating at this relative 95% CI half-width
+    "precision_p99": False,  # also require the p99 latencies to reach it
+    "min_iterations": None,  # adaptive lower bound (default: ADAPTIVE_MIN_ITERATIONS)
+    "topology": None,  # one of TOPOLOGIES[db] (default: the first)
+    "replicas": 0,  # replicas per shard/master in sharded topologies
+    "shard_key": "hashed",  # MongoDB sharded: "hashed" or "ranged" _id shard key
+    # Cassandra keyspace/table settings; None keeps the defaults
+    # (SimpleStrategy with RF = node_count, YCSB's ONE, Cassandra's table options)
+    "cassandra_rf": None,
+    "cassandra_strategy": None,  # "SimpleStrategy" or "NetworkTopologyStrategy"
+    "cassandra_read_cl": None,
+    "cassandra_write_cl": None,
+    "cassandra_compaction": None,  # e.g. "LeveledCompactionStrategy"
+    "cassandra_compression": None,  # e.g. "ZstdCompressor", or "none"
+    "mongodb_read_preference": None,  # e.g. "secondaryPreferred" (default: primary)
+    "connection_pool_size": None,  # MongoDB maxPoolSize / Cassandra connections per host
 }
@@ -1,34 +1,25 @@
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from cassandra.cassandra_operations import (
-    generate_cassandra_docker_compose,
-    wait_for_cassandra_cluster_init,
-)
 from config import CONFIG, params
-from mongodb.mongodb_operations import (
-    generate_mongodb_docker_compose,
-    initialize_mongodb_replica_set,
-)
-from redis.redis_operations import (
-    generate_redis_docker_compose,
-)
+from engines import get_engine
+from resources import apply_placement
 
 
 def generate_docker_compose():
-    if params["db"] == "redis":
-        generate_redis_docker_compose(params["node_count"], CONFIG)
-    elif params["db"] == "mongodb":
-        generate_mongodb_docker_compose(params["node_count"], CONFIG)
-    elif params["db"] == "cassandra":
-        generate_cassandra_docker_compose(params["node_count"], CONFIG)
+    get_engine(params["db"]).generate_compose(params, CONFIG)
+
+    if params["pin_resources"]:
+        params["placement"] = apply_placement(f"{params['db']}/docker-compose-run.yml")
 
 
 def run_docker_compose():
     db_name = params["db"]
+    start_time = time.time()
     subprocess.run(
         [
-            "sudo",
-            "docker",
+            *CONFIG["DOCKER_COMMAND"],
             "compose",
             "-f",
             f"{db_name}/docker-compose-run.yml",
@@ -37,10 +28,56 @@ def run_docker_compose():
         ]
     )
 
-    if db_name == "mongodb":
-        initialize_mongodb_replica_set(params["node_count"])
-    elif db_name == "cassandra":
-        wait_for_cassandra_cluster_init(params["node_count"])
+    compose_up_s = time.time() - start_time
+
+    stages = wait_for_cluster_ready()
+    params["startup"] = {
+        "compose_up_s": compose_up_s,
+        "stages": stages,
+        "total_s": time.time() - start_time,
+    }
+
+
+def wait_for_cluster_ready():
+    """Wait for the cluster to serve clients; returns per-stage startup times."""
+    return get_engine(params["db"]).wait_ready(params, CONFIG)
+
+
+def node_request_counters():
+    """Requests served so far by every data node, read concurrently.
+
+    What counts as a request is up to the engine, e.g. Redis counts key
+    lookups (reads), MongoDB client CRUD operations and Cassandra the client
+    requests each node coordinated.
+    """
+    engine = get_engine(params["db"])
+    nodes = engine.data_nodes(params)
+    if not nodes:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(nodes)) as executor:
+        return dict(zip(nodes, executor.map(engine.requests_served, nodes)))
+
+
+def reset_database():
+    """Remove the benchmark data while keeping the cluster running."""
+    get_engine(params["db"]).reset(params, CONFIG)
+
+
+def compose_command(action: str):
+    """Run `docker compose <action>` (e.g. stop/start) on the generated cluster."""
+    subprocess.run(
+        [
+            *CONFIG["DOCKER_COMMAND"],
+            "compose",
+            "-f",
+            f"{params['db']}/docker-compose-run.yml",
+            action,
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=300,
+        check=True,
+    )
 
 
 def cleanup_containers():
@@ -49,13 +86,13 @@ def cleanup_containers():
     try:
         subprocess.run(
             [
-                "sudo",
-                "docker",
+                *CONFIG["DOCKER_COMMAND"],
                 "compose",
                 "-f",
                 f"{params['db']}/docker-compose-run.yml",
                 "down",
                 "--remove-orphans",
+                "--volumes",
             ],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
@@ -65,3 +102,5 @@ def cleanup_containers():
         print("✓ Containers cleaned up")
     except Exception as e:
         print(f"Warning: Could not clean up all containers: {e}")
+    # Network shaping lives on the containers' veths and is gone with them
+    params["network"] = None
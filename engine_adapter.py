@@ -0,0 +1,73 @@
+from abc import ABC, abstractmethod
+
+from resources import compose_service_addresses
+
+
+class EngineAdapter(ABC):
+    """Everything the runner needs to benchmark one database engine.
+
+    Each engine subclasses this in <name>/<name>_operations.py, next to its
+    compose base file, and is registered in engines.py. The runner only
+    talks to engines through these methods; `params` and `config` are the
+    runtime parameters and CONFIG of the current run. A subclass that misses
+    an abstract method fails when it is instantiated.
+    """
+
+    # Database name on the command line, compose directory and result label
+    name = None
+    # YCSB binding passed to ycsb.sh
+    ycsb_binding = None
+
+    def compose_path(self) -> str:
+        return f"{self.name}/docker-compose-run.yml"
+
+    def node_addresses(self) -> list:
+        """Fixed node IPs of the generated cluster, in node order."""
+        with open(self.compose_path(), "r") as f:
+            return list(compose_service_addresses(f.read()).values())
+
+    @abstractmethod
+    def generate_compose(self, params, config):
+        """Write compose_path() for the run's node count and topology."""
+
+    def wait_ready(self, params, config) -> dict:
+        """Wait for the started cluster to serve clients; returns stage times."""
+        return {}
+
+    def setup_schema(self, params, config):
+        """Prepare the (empty) database for a load phase."""
+
+    @abstractmethod
+    def connection_properties(self, params, config) -> str:
+        """YCSB properties appended to the workload file to reach the cluster."""
+
+    @abstractmethod
+    def reset(self, params, config):
+        """Remove the benchmark data while keeping the cluster running."""
+
+    def data_nodes(self, params) -> list:
+        """Containers whose request counters show how load is spread."""
+        return []
+
+    def client_nodes(self, params) -> list:
+        """Data nodes the topology routes client requests to.
+
+        Replicas that only receive replicated writes are left out, since they
+        serve no requests however well the load is spread.
+        """
+        return self.data_nodes(params)
+
+    @abstractmethod
+    def requests_served(self, container) -> int:
+        """Requests a data node has served so far."""
+
+    def variant(self, params):
+        """Result label part for engine settings that differ from the defaults."""
+
+    def settings(self, params) -> dict:
+        """Extra entries of the results, e.g. {"cassandra": {...}}."""
+        return {}
+
+    def dataset_settings(self, params) -> dict:
+        """Engine settings that shape the stored data (part of the snapshot key)."""
+        return {}
@@ -0,0 +1,25 @@
+from cassandra.cassandra_operations import CassandraEngine
+from keydb.keydb_operations import KeyDbEngine
+from mongodb.mongodb_operations import MongoDbEngine
+from redis.redis_operations import RedisEngine
+from scylladb.scylladb_operations import ScyllaDbEngine
+
+# Every database the runner can benchmark, by name (CONFIG["SUPPORTED_DBS"]
+# selects which ones are offered). Adding an engine means subclassing
+# EngineAdapter in <name>/<name>_operations.py and listing it here.
+ENGINES = {
+    engine.name: engine
+    for engine in (
+        RedisEngine(),
+        KeyDbEngine(),
+        MongoDbEngine(),
+        CassandraEngine(),
+        ScyllaDbEngine(),
+    )
+}
+
+
+def get_engine(db: str):
+    if db not in ENGINES:
+        raise ValueError(f"No engine adapter for {db}")
+    return ENGINES[db]
@@ -0,0 +1,238 @@
+import statistics
+import subprocess
+import threading
+import time
+
+from config import CONFIG
+from resources import compose_service_names
+from utils import aggregate_metric
+
+# Fault action -> action that undoes it once the run iteration is over
+FAULT_ACTIONS = {
+    "pause": "unpause",
+    "unpause": None,
+    "kill": "start",
+    "stop": "start",
+    "start": None,
+    "restart": None,
+}
+
+# Impact metrics aggregated across run iterations
+IMPACT_METRICS = ("dip_depth", "time_to_recover_s", "p99_recovery_s", "failed_ops")
+
+
+def parse_fault_schedule(value: str) -> list:
+    """Parse "pause:mongo2@30,unpause:mongo2@60" into events sorted by offset."""
+    events = []
+    for item in (item.strip() for item in value.split(",")):
+        if not item:
+            continue
+        action, _, rest = item.partition(":")
+        node, _, offset = rest.partition("@")
+        if action not in FAULT_ACTIONS or not node or not offset:
+            raise ValueError(
+                f"Invalid fault: {item}. Please use ACTION:NODE@SECONDS with ACTION "
+                f"one of {', '.join(FAULT_ACTIONS)}"
+            )
+        offset_s = float(offset)
+        if offset_s < 0:
+            raise ValueError(f"Invalid fault offset: {item}")
+        events.append({"action": action, "node": node, "offset_s": offset_s})
+    if not events:
+        raise ValueError(f"Invalid fault schedule: {value}")
+    return sorted(events, key=lambda event: event["offset_s"])
+
+
+def validate_fault_nodes(events: list, compose_path: str):
+    """Check that every faulted node is a service of the generated cluster."""
+    with open(compose_path, "r") as f:
+        services = compose_service_names(f.read())
+    unknown = sorted({event["node"] for event in events} - set(services))
+    if unknown:
+        raise ValueError(
+            f"Unknown fault nodes: {', '.join(unknown)}. "
+            f"Nodes of this cluster: {', '.join(services)}"
+        )
+
+
+def docker_action(action: str, node: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [*CONFIG["DOCKER_COMMAND"], action, node],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        timeout=120,
+        check=False,
+    )
+
+
+class FaultInjector:
+    """Applies a fault schedule to the cluster while one YCSB process runs.
+
+    Offsets are seconds of the workload's own clock, the one its status
+    lines count: nothing fires until anchor() is given the first status
+    sample, so JVM start-up and connecting don't shift the faults against
+    the timeline. Events due before that sample fire with it. stop() cancels
+    what hasn't fired yet
+    and undoes every fault still in effect (unpauses paused nodes, starts
+    killed or stopped ones), so the next iteration starts on a full cluster.
+    """
+
+    def __init__(self, events: list):
+        self.events = events
+        self.applied = []
+        self.healed = []
+        self._stop = threading.Event()
+        self._anchored = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def anchor(self, elapsed_s: float):
+        """Start the schedule clock from a status sample `elapsed_s` into the run."""
+        if not self._anchored.is_set():
+            self._start_time = time.monotonic() - elapsed_s
+            self._anchored.set()
+
+    def _run(self):
+        self._anchored.wait()
+        if self._stop.is_set():
+            return
+        for event in self.events:
+            delay = event["offset_s"] - (time.monotonic() - self._start_time)
+            if self._stop.wait(max(0, delay)):
+                return
+            self.applied.append(self._apply(event["action"], event["node"], event))
+
+    def _apply(self, action: str, node: str, event: dict | None = None) -> dict:
+        record = dict(event or {"action": action, "node": node})
+        record["at_s"] = round(time.monotonic() - self._start_time, 3)
+        try:
+            result = docker_action(action, node)
+            record["returncode"] = result.returncode
+            if result.returncode != 0:
+                record["error"] = result.stderr.strip()
+        except Exception as e:
+            record["returncode"] = None
+            record["error"] = str(e)
+        record["duration_s"] = round(
+            time.monotonic() - self._start_time - record["at_s"], 3
+        )
+        if record.get("error"):
+            print(f"\n    WARNING: Fault {action} {node} failed: {record['error']}")
+        else:
+            print(f"\n    Fault: {action} {node} at {record['at_s']:.1f}s", end="")
+        return record
+
+    def stop(self) -> dict:
+        """Stop injecting and heal the cluster; returns the fault record."""
+        if self._thread is None:
+            return {}
+        self._stop.set()
+        self._anchored.set()
+        self._thread.join()
+
+        pending = {}
+        for record in self.applied:
+            if record["returncode"] == 0:
+                pending[record["node"]] = FAULT_ACTIONS[record["action"]]
+        for node, undo in pending.items():
+            if undo:
+                self.healed.append(self._apply(undo, node))
+        return {"events": self.applied, "healed": self.healed}
+
+    def disturbed(self) -> bool:
+        """Whether any node was restarted, killed or stopped."""
+        return any(r["action"] in ("kill", "stop", "restart") for r in self.applied)
+
+
+def worst_p99(timeline: dict, index: int, operations) -> float:
+    """Highest p99 of the given operations in one status sample."""
+    values = [
+        columns["p99"][index]
+        for op, columns in timeline["latency_us"].items()
+        if op in operations and columns["p99"][index] is not None
+    ]
+    return max(values) if values else None
+
+
+def fault_impact(timeline: dict, events: list, operations) -> dict:
+    """Throughput dip, recovery times and failed ops around the first fault.
+
+    Samples up to the first fault give the baseline (median). The dip is the
+    lowest throughput after it; throughput has recovered at the first sample
+    after the dip back at FAULT_RECOVERY_FRACTION of the baseline, and p99
+    at the first sample after its peak back within FAULT_P99_TOLERANCE times
+    the baseline p99. Times are relative to the fault and have the
+    resolution of the status interval; None means it never recovered.
+    `operations` are the op types whose p99 counts (not failed/intended).
+    """
+    if not events or not timeline["elapsed_s"]:
+        return {}
+    fault_s = events[0].get("at_s", events[0]["offset_s"])
+    elapsed = timeline["elapsed_s"]
+    before = [i for i, t in enumerate(elapsed) if t <= fault_s]
+    after = [i for i, t in enumerate(elapsed) if t > fault_s]
+    failed = timeline.get("failed_ops", [])
+    impact = {
+        "fault_s": fault_s,
+        "failed_ops": sum(failed[i] for i in after if i < len(failed)),
+    }
+    if not before or not after:
+        return impact
+
+    ops_per_sec = timeline["ops_per_sec"]
+    baseline = statistics.median(ops_per_sec[i] for i in before)
+    dip = min(after, key=lambda i: ops_per_sec[i])
+    impact["baseline_ops_sec"] = baseline
+    impact["min_ops_sec"] = ops_per_sec[dip]
+    impact["dip_depth"] = (
+        max(0.0, 1 - ops_per_sec[dip] / baseline) if baseline else None
+    )
+    threshold = CONFIG["FAULT_RECOVERY_FRACTION"] * baseline
+    recovered = next(
+        (i for i in after if i >= dip and ops_per_sec[i] >= threshold), None
+    )
+    impact["time_to_recover_s"] = (
+        elapsed[recovered] - fault_s if recovered is not None else None
+    )
+    if ops_per_sec[dip] >= threshold:
+        impact["time_to_recover_s"] = 0.0
+
+    p99_before = [
+        v for v in (worst_p99(timeline, i, operations) for i in before) if v is not None
+    ]
+    p99_after = {i: worst_p99(timeline, i, operations) for i in after}
+    p99_after = {i: v for i, v in p99_after.items() if v is not None}
+    if p99_before and p99_after:
+        baseline_p99 = statistics.median(p99_before)
+        peak = max(p99_after, key=p99_after.get)
+        limit = CONFIG["FAULT_P99_TOLERANCE"] * baseline_p99
+        impact["baseline_p99_us"] = baseline_p99
+        impact["peak_p99_us"] = p99_after[peak]
+        back = next((i for i in p99_after if i >= peak and p99_after[i] <= limit), None)
+        impact["p99_recovery_s"] = elapsed[back] - fault_s if back is not None else None
+        if p99_after[peak] <= limit:
+            impact["p99_recovery_s"] = 0.0
+    return impact
+
+
+def aggregate_fault_impact(run_phases: list) -> dict:
+    """Mean/SD/CI of each impact metric across run iterations.
+
+    Iterations that never recovered are counted in `not_recovered` instead.
+    """
+    impacts = [p["faults"]["impact"] for p in run_phases if p.get("faults")]
+    aggregated = {"iterations": len(impacts)}
+    for key in IMPACT_METRICS:
+        values = [impact[key] for impact in impacts if impact.get(key) is not None]
+        if values:
+            aggregated[key] = aggregate_metric(values)
+    aggregated["not_recovered"] = sum(
+        1
+        for impact in impacts
+        if "time_to_recover_s" in impact and impact["time_to_recover_s"] is None
+    )
+    return aggregated
@@ -0,0 +1,70 @@
+import glob
+import os
+import shutil
+
+from hdrh.histogram import HdrHistogram
+from hdrh.log import HistogramLogReader
+
+# Latencies are recorded in microseconds; one hour comfortably bounds any op
+HDR_LOWEST_US = 1
+HDR_HIGHEST_US = 3_600_000_000
+HDR_SIGNIFICANT_FIGURES = 3
+
+# Percentiles reported for merged histograms: result key -> percentile
+REPORTED_PERCENTILES = {
+    "p50": 50.0,
+    "p90": 90.0,
+    "p99": 99.0,
+    "p99_9": 99.9,
+    "p99_99": 99.99,
+}
+
+
+def new_histogram() -> HdrHistogram:
+    return HdrHistogram(HDR_LOWEST_US, HDR_HIGHEST_US, HDR_SIGNIFICANT_FIGURES)
+
+
+def read_hdr_log(path: str) -> HdrHistogram:
+    """Sum every interval of a YCSB `.hdr` log into a single histogram."""
+    histogram = new_histogram()
+    reader = HistogramLogReader(path, new_histogram())
+    while reader.add_next_interval_histogram(histogram):
+        pass
+    return histogram
+
+
+def collect_hdr_histograms(hdr_dir: str) -> dict:
+    """Read the `<OP>.hdr` files YCSB exported into hdr_dir, then remove it.
+
+    Returns {op_type: base64 compressed histogram}, which is what gets stored
+    in the results so histograms can be merged again later.
+    """
+    histograms = {}
+    for path in sorted(glob.glob(f"{hdr_dir}/*.hdr")):
+        op_type = os.path.splitext(os.path.basename(path))[0]
+        try:
+            histograms[op_type] = read_hdr_log(path).encode().decode("ascii")
+        except Exception as e:
+            print(f"\n    WARNING: Could not read histogram {path}: {e}")
+    shutil.rmtree(hdr_dir, ignore_errors=True)
+    return histograms
+
+
+def merge_histograms(encoded_histograms) -> HdrHistogram:
+    """Merge base64 compressed histograms into one histogram."""
+    merged = new_histogram()
+    for encoded in encoded_histograms:
+        merged.decode_and_add(encoded)
+    return merged
+
+
+def histogram_summary(histogram: HdrHistogram) -> dict:
+    """Exact percentiles, max and count of a (merged) histogram."""
+    summary = {
+        key: histogram.get_value_at_percentile(percentile)
+        for key, percentile in REPORTED_PERCENTILES.items()
+    }
+    summary["max"] = histogram.get_max_value()
+    summary["mean"] = histogram.get_mean_value()
+    summary["count"] = histogram.get_total_count()
+    return summary
@@ -0,0 +1,23 @@
+from redis.redis_operations import RedisEngine
+
+# KeyDB is a multi-threaded fork of Redis: same protocol, replication and
+# cluster mode, so it runs through the Redis adapter with its own binaries
+KEYDB_SERVER_THREADS = 4  # keydb-master's are set in docker-compose-base.yml
+
+KEYDB_SERVER = {
+    "name": "keydb",
+    "image": "eqalpha/keydb:latest",
+    "server": "keydb-server",
+    "cli": "keydb-cli",
+    "options": (
+        f"--bind 0.0.0.0 --protected-mode no --server-threads {KEYDB_SERVER_THREADS}"
+    ),
+}
+
+
+class KeyDbEngine(RedisEngine):
+    """KeyDB with master/replica replication or in cluster mode."""
+
+    name = "keydb"
+    ycsb_binding = "redis"
+    server = KEYDB_SERVER
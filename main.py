@@ -5,19 +5,59 @@ CONSULT README.md FOR USAGE DETAILS!
 
 import sys
 
+from cassandra.cassandra_operations import KEYSPACE_STRATEGIES
 from config import CONFIG, params
 from docker_handler import (
     cleanup_containers,
     generate_docker_compose,
     run_docker_compose,
 )
+from fault_injector import parse_fault_schedule, validate_fault_nodes
+from network_emulation import NetworkProfileError
+from schedule_handler import handle_schedule, load_schedule
+from snapshot_cache import restore_snapshot
+from trace_generator import validate_trace, workload_trace
 from utils import (
+    parse_positive_int_list,
+    parse_rate_schedule,
+    validate_client_count,
+    validate_client_cpus,
+    validate_consistency_level,
     validate_db,
+    validate_driver,
     validate_iteration_count,
+    validate_network_profile,
     validate_node_count,
+    validate_pool_size,
+    validate_read_preference,
+    validate_replication_factor,
+    validate_shard_key,
+    validate_status_interval,
+    validate_target_precision,
+    validate_telemetry_interval,
+    validate_topology,
     validate_workload_path,
 )
-from workload_handler import cleanup_temp_workload, handle_workload, prepare_workload
+from workload_handler import (
+    cleanup_temp_workload,
+    handle_cross_check,
+    handle_open_loop,
+    handle_saturation,
+    handle_workload,
+    prepare_workload,
+)
+
+
+def pop_option(args, name):
+    """Remove `name <value>` from args and return the value (None if absent)."""
+    if name not in args:
+        return None
+    index = args.index(name)
+    if index + 1 >= len(args):
+        raise ValueError(f"Missing value for {name}")
+    value = args[index + 1]
+    del args[index : index + 2]
+    return value
 
 
 def parse_arguments():
@@ -28,6 +68,128 @@ def parse_arguments():
         params["keep_alive"] = True
         args.remove("--keep-alive")
 
+    if "--snapshot-cache" in args:
+        params["snapshot_cache"] = True
+        args.remove("--snapshot-cache")
+
+    if "--pin-resources" in args:
+        params["pin_resources"] = True
+        args.remove("--pin-resources")
+
+    if "--precision-p99" in args:
+        params["precision_p99"] = True
+        args.remove("--precision-p99")
+
+    if "--saturate" in args:
+        params["mode"] = "saturation"
+        args.remove("--saturate")
+
+    try:
+        status_interval = pop_option(args, "--status-interval")
+        if status_interval is not None:
+            params["status_interval"] = validate_status_interval(int(status_interval))
+        client_count = pop_option(args, "--clients")
+        if client_count is not None:
+            params["client_count"] = validate_client_count(client_count)
+        telemetry_interval = pop_option(args, "--telemetry-interval")
+        if telemetry_interval is not None:
+            params["telemetry_interval"] = validate_telemetry_interval(
+                float(telemetry_interval)
+            )
+        client_cpus = pop_option(args, "--client-cpus")
+        if client_cpus is not None:
+            params["client_cpus"] = validate_client_cpus(int(client_cpus))
+        threadcounts = pop_option(args, "--threads")
+        if threadcounts is not None:
+            params["saturation_threadcounts"] = parse_positive_int_list(threadcounts)
+        targets = pop_option(args, "--targets")
+        if targets is not None:
+            params["saturation_targets"] = parse_positive_int_list(targets)
+        target_precision = pop_option(args, "--target-precision")
+        if target_precision is not None:
+            params["target_precision"] = validate_target_precision(
+                float(target_precision)
+            )
+        min_iterations = pop_option(args, "--min-iterations")
+        if min_iterations is not None:
+            params["min_iterations"] = validate_iteration_count(int(min_iterations))
+        topology = pop_option(args, "--topology")
+        replicas = pop_option(args, "--replicas")
+        if replicas is not None:
+            params["replicas"] = int(replicas)
+        shard_key = pop_option(args, "--shard-key")
+        if shard_key is not None:
+            params["shard_key"] = validate_shard_key(shard_key)
+        rf = pop_option(args, "--rf")
+        read_cl = pop_option(args, "--read-cl")
+        if read_cl is not None:
+            params["cassandra_read_cl"] = validate_consistency_level(read_cl)
+        write_cl = pop_option(args, "--write-cl")
+        if write_cl is not None:
+            params["cassandra_write_cl"] = validate_consistency_level(write_cl)
+        strategy = pop_option(args, "--keyspace-strategy")
+        if strategy is not None:
+            if strategy not in KEYSPACE_STRATEGIES:
+                raise ValueError(
+                    "Invalid keyspace strategy. Please use simple or network"
+                )
+            params["cassandra_strategy"] = KEYSPACE_STRATEGIES[strategy]
+        params["cassandra_compaction"] = pop_option(args, "--compaction")
+        params["cassandra_compression"] = pop_option(args, "--compression")
+        read_preference = pop_option(args, "--read-preference")
+        if read_preference is not None:
+            params["mongodb_read_preference"] = validate_read_preference(
+                read_preference
+            )
+        pool_size = pop_option(args, "--pool-size")
+        if pool_size is not None:
+            params["connection_pool_size"] = validate_pool_size(int(pool_size))
+        rates = pop_option(args, "--open-loop")
+        if rates is not None:
+            if params["mode"] == "saturation":
+                raise ValueError("--saturate and --open-loop can't be combined")
+            params["mode"] = "open_loop"
+            params["open_loop_rates"] = parse_rate_schedule(rates)
+        network_profile = pop_option(args, "--network-profile")
+        if network_profile is not None:
+            params["network_profile"] = validate_network_profile(network_profile)
+        faults = pop_option(args, "--faults")
+        if faults is not None:
+            params["faults"] = parse_fault_schedule(faults)
+        schedule = pop_option(args, "--schedule")
+        if schedule is not None:
+            if params["mode"] != "benchmark":
+                raise ValueError("--schedule can't be combined with another mode")
+            params["mode"] = "schedule"
+        driver = pop_option(args, "--driver")
+        if driver is not None:
+            params["driver"] = validate_driver(driver)
+        trace = pop_option(args, "--trace")
+        if trace is not None:
+            if params["driver"] == "ycsb" and driver is not None:
+                raise ValueError("--trace is replayed by the native driver only")
+            if params["mode"] == "schedule":
+                raise ValueError("--schedule stages can't replay one --trace")
+            params["driver"] = "native"
+        if "--cross-check" in args:
+            if params["mode"] != "benchmark" or driver or trace:
+                raise ValueError(
+                    "--cross-check can't be combined with another mode, "
+                    "--driver or --trace"
+                )
+            params["mode"] = "cross_check"
+            args.remove("--cross-check")
+        p99_slo = pop_option(args, "--p99-slo-us")
+        if p99_slo is not None:
+            params["p99_slo_us"] = float(p99_slo)
+        if params["mode"] == "saturation" and not (
+            params["saturation_threadcounts"] or params["saturation_targets"]
+        ):
+            params["saturation_threadcounts"] = CONFIG["SATURATION_THREADCOUNTS"]
+    except ValueError as e:
+        print(f"Error: {e}")
+        return False
+
     if len(args) < 3:
         print_usage()
         return False
@@ -38,6 +200,19 @@ def parse_arguments():
         params["workload_path"] = validate_workload_path(args[2])
         if len(args) > 3:
             params["iteration_count"] = validate_iteration_count(int(args[3]))
+        params["topology"] = validate_topology(
+            params["db"], topology, params["node_count"], params["replicas"]
+        )
+        if schedule is not None:
+            params["schedule"] = load_schedule(schedule)
+        if trace == "auto":
+            params["trace"] = workload_trace(params["workload_path"])
+        elif trace is not None:
+            params["trace"] = validate_trace(trace, params["workload_path"])
+        if rf is not None:
+            params["cassandra_rf"] = validate_replication_factor(
+                int(rf), params["node_count"]
+            )
         cleanup_containers()
         return True
     except ValueError as e:
@@ -48,13 +223,54 @@ def parse_arguments():
 def print_usage():
     """Print usage information."""
     print(
-        "Usage: python script.py <db> <node_count> <workload_file> [iterations] [--keep-alive]"
+        "Usage: python script.py <db> <node_count> <workload_file> [iterations] [--target-precision P [--min-iterations N] [--precision-p99]] [--topology NAME [--replicas N] [--shard-key hashed|ranged]] [--rf N] [--read-cl CL] [--write-cl CL] [--keyspace-strategy simple|network] [--compaction CLASS] [--compression CLASS|none] [--read-preference MODE] [--pool-size N] [--keep-alive] [--snapshot-cache] [--status-interval N] [--telemetry-interval S] [--clients N|auto] [--pin-resources [--client-cpus N]] [--saturate [--threads 1,2,4] [--targets R1,R2] [--p99-slo-us N]] [--open-loop RATES [--threads N]] [--schedule FILE] [--faults ACTION:NODE@S,...] [--network-profile NAME] [--driver ycsb|native | --cross-check] [--trace FILE|auto]"
     )
     print(f"  db: {' or '.join(CONFIG['SUPPORTED_DBS'])}")
     print("  node_count: positive integer")
     print("  workload_file: path to workload file in ./workloads/")
     print("  iterations: number of run iterations (optional, default: 1)")
+    print("  --target-precision P: stop once the throughput 95% CI is within ±P")
+    print("    (e.g. 0.02); iterations becomes the maximum")
+    print("    --min-iterations: iterations before stopping early (default: 3)")
+    print("    --precision-p99: also require each operation's p99 to reach P")
+    print("  --topology NAME: cluster topology (redis/keydb: replication or cluster,")
+    print("    mongodb: replicaset or sharded)")
+    print("    --replicas N: replicas per master/shard (sharded topologies only)")
+    print("    --shard-key: MongoDB shard key, hashed (default) or ranged")
+    print(
+        "  Cassandra/ScyllaDB settings (default: SimpleStrategy, RF = node_count, CL ONE):"
+    )
+    print("    --rf N: replication factor of the ycsb keyspace")
+    print("    --read-cl / --write-cl CL: read/write consistency level (e.g. QUORUM)")
+    print("    --keyspace-strategy: simple or network (NetworkTopologyStrategy)")
+    print("    --compaction CLASS: e.g. LeveledCompactionStrategy")
+    print("    --compression CLASS|none: e.g. ZstdCompressor")
+    print("  --read-preference MODE: MongoDB readPreference (e.g. secondaryPreferred)")
+    print("  --pool-size N: MongoDB maxPoolSize / Cassandra connections per node")
     print("  --keep-alive: keep containers running after exit")
+    print("  --snapshot-cache: restore/save the loaded dataset instead of reloading")
+    print("  --status-interval N: seconds between YCSB status samples (default: 10)")
+    print("  --telemetry-interval S: seconds between resource samples, 0 disables")
+    print("  --clients N|auto: concurrent YCSB client processes (default: 1)")
+    print("  --pin-resources: split host CPUs/memory between nodes and YCSB")
+    print("    --client-cpus: CPUs reserved for YCSB (default: 25% of the host)")
+    print("  --saturate: sweep threadcount/target to find the throughput knee")
+    print("    --threads: comma-separated threadcount schedule")
+    print("    --targets: comma-separated target ops/sec schedule")
+    print("    --p99-slo-us: stop once the worst p99 latency exceeds this")
+    print("  --open-loop RATES: latency vs offered load at fixed target rates")
+    print("    RATES: e.g. 1000,2000 or 1000:10000:1000 or 25%,50%,100% of max")
+    print("    --threads: client threadcount (default: 64)")
+    print("  --schedule FILE: run the stages of a schedule file on one loaded dataset")
+    print("  --faults: pause/unpause/kill/stop/start/restart nodes in every run")
+    print("    iteration, e.g. pause:mongo2@30,unpause:mongo2@60")
+    print(
+        "  --network-profile NAME: emulate inter-node RTT/loss/bandwidth with tc netem"
+    )
+    print("  --driver: load driver, ycsb (default) or native (asyncio, no JVM)")
+    print("  --cross-check: run with both drivers and compare their results")
+    print("  --trace FILE|auto: replay a precomputed request trace in every run")
+    print("    (native driver); auto generates one from the workload file")
     print("\nNote: Read/write ratios are defined in the workload file itself")
 
 
@@ -67,14 +283,42 @@ def main():
         f"Setting up Docker containers for {params['db'].upper()} with {params['node_count']} nodes..."
     )
     generate_docker_compose()
+    if params["faults"]:
+        try:
+            validate_fault_nodes(
+                params["faults"], f"{params['db']}/docker-compose-run.yml"
+            )
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+    if params["snapshot_cache"]:
+        params["snapshot"] = restore_snapshot()
+        params["skip_load"] = params["snapshot"] is not None
     run_docker_compose()
     print("✓ Docker setup complete!\n")
 
     # Create a workload file with database connection settings
     workload_with_config = prepare_workload(params["workload_path"])
 
-    print("Starting YCSB workload with provided workload file...")
-    handle_workload(workload_with_config)
+    try:
+        if params["mode"] == "saturation":
+            print("Starting saturation sweep with provided workload file...")
+            handle_saturation(workload_with_config)
+        elif params["mode"] == "schedule":
+            print("Starting workload schedule with provided workload file...")
+            handle_schedule(workload_with_config, params["schedule"])
+        elif params["mode"] == "open_loop":
+            print("Starting open-loop rate sweep with provided workload file...")
+            handle_open_loop(workload_with_config)
+        elif params["mode"] == "cross_check":
+            print("Starting driver cross-check with provided workload file...")
+            handle_cross_check(workload_with_config)
+        else:
+            print("Starting YCSB workload with provided workload file...")
+            handle_workload(workload_with_config)
+    except NetworkProfileError as e:
+        print(f"\nError: {e}")
+        return 1
 
     return 0
 
@@ -0,0 +1,205 @@
+"""
+Run a whole benchmark matrix, bringing each (db, node_count) cluster up once.
+
+    python3 matrix.py <matrix.json>
+
+CONSULT README.md FOR THE MATRIX FILE FORMAT!
+"""
+
+import itertools
+import json
+import os
+import sys
+import time
+
+from config import CONFIG, params
+from docker_handler import (
+    cleanup_containers,
+    generate_docker_compose,
+    reset_database,
+    run_docker_compose,
+)
+from network_emulation import NetworkProfileError
+from utils import (
+    validate_consistency_level,
+    validate_db,
+    validate_driver,
+    validate_iteration_count,
+    validate_network_profile,
+    validate_node_count,
+    validate_workload_path,
+)
+from workload_handler import cleanup_temp_workload, handle_workload, prepare_workload
+
+
+def load_matrix(matrix_path: str) -> dict:
+    """Read and validate a matrix file."""
+    with open(matrix_path, "r") as f:
+        matrix = json.load(f)
+
+    matrix["databases"] = [validate_db(db) for db in matrix["databases"]]
+    matrix["node_counts"] = [validate_node_count(int(n)) for n in matrix["node_counts"]]
+    for workload in matrix["workloads"]:
+        validate_workload_path(workload)
+    matrix["iterations"] = validate_iteration_count(int(matrix.get("iterations", 1)))
+    matrix.setdefault("params", {})
+    matrix.setdefault("sweeps", {})
+    for sweep in matrix["sweeps"].values():
+        for key in ("cassandra_read_cl", "cassandra_write_cl"):
+            if key in sweep:
+                sweep[key] = [validate_consistency_level(level) for level in sweep[key]]
+        if "driver" in sweep:
+            sweep["driver"] = [validate_driver(driver) for driver in sweep["driver"]]
+        if "network_profile" in sweep:
+            sweep["network_profile"] = [
+                name and validate_network_profile(name)
+                for name in sweep["network_profile"]
+            ]
+    swept = [key for sweep in matrix["sweeps"].values() for key in sweep]
+    unknown = (set(matrix["params"]) | set(swept)) - set(params)
+    if unknown:
+        raise ValueError(f"Unknown params in matrix file: {', '.join(sorted(unknown))}")
+    return matrix
+
+
+def sweep_variants(db: str, node_count: int, matrix: dict) -> list:
+    """Every combination of the db's swept params (one empty variant if none).
+
+    Combinations that don't fit the cluster, e.g. a Cassandra replication
+    factor above node_count, are skipped.
+    """
+    sweep = matrix["sweeps"].get(db, {})
+    variants = []
+    for values in itertools.product(*sweep.values()):
+        variant = dict(zip(sweep, values))
+        rf = variant.get("cassandra_rf")
+        if rf is not None and rf > node_count:
+            print(f"Skipping {variant} on {node_count} nodes (RF > node count)")
+            continue
+        variants.append(variant)
+    return variants
+
+
+def run_cluster(db: str, node_count: int, matrix: dict) -> dict:
+    """Bring one cluster up, run every workload against it, tear it down.
+
+    Between workloads the data is dropped/truncated instead of recreating
+    the containers; the time saved is the bring-up time avoided for every
+    workload after the first, minus the resets.
+    """
+    params.update(matrix["params"])
+    params.update(
+        db=db,
+        node_count=node_count,
+        iteration_count=matrix["iterations"],
+        skip_load=False,
+        snapshot=None,
+    )
+    cleanup_containers()
+
+    print(f"Setting up Docker containers for {db.upper()} with {node_count} nodes...")
+    start_time = time.time()
+    generate_docker_compose()
+    run_docker_compose()
+    bring_up_s = time.time() - start_time
+    print(f"✓ Docker setup complete in {bring_up_s:.1f}s!\n")
+
+    summary = {
+        "db": db,
+        "node_count": node_count,
+        "bring_up_s": bring_up_s,
+        "workloads": [],
+    }
+    runs = [
+        (workload, variant)
+        for workload in matrix["workloads"]
+        for variant in sweep_variants(db, node_count, matrix)
+    ]
+    defaults = {key: params[key] for key in matrix["sweeps"].get(db, {})}
+    try:
+        for index, (workload, variant) in enumerate(runs):
+            params.update(defaults, **variant)
+            reset_s = 0
+            if index > 0:
+                print(f"Resetting {db.upper()} data for {workload}...")
+                start_time = time.time()
+                reset_database()
+                reset_s = time.time() - start_time
+
+            params["workload_path"] = validate_workload_path(workload)
+            params["matrix"] = {
+                "cluster_bring_up_s": bring_up_s,
+                "workload_index": index,
+                "reset_s": reset_s,
+            }
+            workload_with_config = prepare_workload(params["workload_path"])
+
+            print(
+                f"⚙️  Running {db} with {node_count} nodes, workload {workload}"
+                + (f", {variant}" if variant else "")
+                + "..."
+            )
+            start_time = time.time()
+            handle_workload(workload_with_config)
+            summary["workloads"].append(
+                {
+                    "workload": workload,
+                    "variant": variant,
+                    "reset_s": reset_s,
+                    "duration_s": time.time() - start_time,
+                }
+            )
+    finally:
+        params.update(defaults)
+        params["matrix"] = None
+        cleanup_temp_workload()
+        cleanup_containers()
+
+    resets_s = sum(w["reset_s"] for w in summary["workloads"])
+    summary["time_saved_s"] = bring_up_s * (len(summary["workloads"]) - 1) - resets_s
+    print(
+        f"\n✓ Finished {db} with {node_count} nodes "
+        f"(saved ~{summary['time_saved_s']:.1f}s of cluster bring-up)"
+    )
+    print("---------------------------------------------")
+    return summary
+
+
+def main():
+    """Main entry point."""
+    if len(sys.argv) != 2:
+        print("Usage: python matrix.py <matrix.json>")
+        return 1
+
+    try:
+        matrix = load_matrix(sys.argv[1])
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Error: Invalid matrix file: {e}")
+        return 1
+
+    clusters = []
+    try:
+        for db in matrix["databases"]:
+            for node_count in matrix["node_counts"]:
+                clusters.append(run_cluster(db, node_count, matrix))
+    except NetworkProfileError as e:
+        print(f"\nError: {e}")
+        return 1
+
+    summary = {
+        "matrix": matrix,
+        "clusters": clusters,
+        "time_saved_s": sum(c["time_saved_s"] for c in clusters),
+    }
+    os.makedirs(CONFIG["RESULTS_PATH"], exist_ok=True)
+    summary_file = f"{CONFIG['RESULTS_PATH']}/matrix_summary.json"
+    with open(summary_file, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"\n⚙️  All benchmarks completed! Summary saved to {summary_file}")
+    print(f"   Cluster reuse saved ~{summary['time_saved_s']:.1f}s of wall-clock time")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
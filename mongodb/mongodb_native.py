@@ -0,0 +1,61 @@
+"""
+Native asyncio MongoDB client for native_driver.py.
+
+Uses pymongo's AsyncMongoClient (pymongo >= 4.13) and stores records like
+YCSB's mongodb binding: one document per key, {_id: key, <field>: binary}.
+Connection pooling, replica set discovery and read preference come from
+mongodb.url (maxPoolSize, replicaSet, readPreference, ...).
+"""
+
+DEFAULT_URL = "mongodb://localhost:27017/ycsb?w=1"
+DEFAULT_DATABASE = "ycsb"
+
+
+class MongoNativeClient:
+    def __init__(self, properties: dict, threadcount: int):
+        try:
+            from pymongo import AsyncMongoClient
+        except ImportError as e:
+            raise ImportError(
+                "The native MongoDB client needs pymongo >= 4.13 (pip install pymongo)"
+            ) from e
+        self.client = AsyncMongoClient(properties.get("mongodb.url", DEFAULT_URL))
+        self.database = self.client.get_default_database(DEFAULT_DATABASE)
+
+    async def connect(self):
+        await self.client.admin.command("ping")
+
+    async def close(self):
+        await self.client.close()
+
+    @staticmethod
+    def _projection(fields):
+        return None if fields is None else {field: 1 for field in fields}
+
+    async def read(self, table, key, fields):
+        document = await self.database[table].find_one(
+            {"_id": key}, self._projection(fields)
+        )
+        return "OK" if document is not None else "NOT_FOUND"
+
+    async def scan(self, table, startkey, recordcount, fields):
+        cursor = (
+            self.database[table]
+            .find({"_id": {"$gte": startkey}}, self._projection(fields))
+            .sort("_id", 1)
+            .limit(recordcount)
+        )
+        found = await cursor.to_list()
+        return "OK" if found else "ERROR"
+
+    async def update(self, table, key, values):
+        result = await self.database[table].update_one({"_id": key}, {"$set": values})
+        return "NOT_FOUND" if result.matched_count == 0 else "OK"
+
+    async def insert(self, table, key, values):
+        await self.database[table].insert_one({"_id": key, **values})
+        return "OK"
+
+    async def delete(self, table, key):
+        result = await self.database[table].delete_one({"_id": key})
+        return "NOT_FOUND" if result.deleted_count == 0 else "OK"
@@ -1,105 +1,184 @@
 import json
-import os
-import subprocess
 import time
 
 from halo import Halo
 
+from engine_adapter import EngineAdapter
+from readiness import docker_exec, timed_stage, wait_for_nodes, wait_until
+from resources import subnet_address
+from utils import topology_name
 
-def initialize_mongodb_replica_set(node_count):
+MONGODB_PORT = 27017
+
+# YCSB keys are "user" followed by digits; ranged sharding splits on the first digit
+RANGED_SPLIT_POINTS = [f"user{digit}" for digit in range(1, 10)]
+
+# Read preferences that leave the secondaries without client requests
+PRIMARY_READ_PREFERENCES = (None, "primary", "primaryPreferred")
+
+
+def mongosh_eval(container, expression, timeout=10):
+    result = docker_exec(
+        container, "mongosh", "--quiet", "--eval", expression, timeout=timeout
+    )
+    return result.stdout.strip()
+
+
+def mongodb_node_ready(container):
+    return mongosh_eval(container, "db.adminCommand({ping: 1}).ok") == "1"
+
+
+def mongodb_operations_served(container):
+    """Client CRUD operations served by a mongod so far (replicated ones excluded)."""
+    output = mongosh_eval(
+        container,
+        "const o = db.serverStatus().opcounters; "
+        '["query", "insert", "update", "delete", "getmore"]'
+        ".reduce((total, key) => total + parseInt(o[key].toString()), 0)",
+    )
+    return int(output.splitlines()[-1])
+
+
+def replica_set_states(container="mongo1"):
+    """stateStr of every replica set member, as seen from `container`."""
+    output = mongosh_eval(
+        container, "JSON.stringify(rs.status().members.map(m => m.stateStr))"
+    )
+    return json.loads(output.splitlines()[-1])
+
+
+def replica_set_stable(node_count, container="mongo1"):
+    states = replica_set_states(container)
+    return (
+        len(states) == node_count
+        and states.count("PRIMARY") == 1
+        and states.count("SECONDARY") == node_count - 1
+    )
+
+
+def initialize_mongodb_replica_set(node_count, config, max_wait=120):
+    """Initiate rs0 and wait until it has one PRIMARY and only SECONDARYs.
+
+    Members are registered by their fixed IPs so that clients on the host
+    can reach every member the replica set advertises.
+
+    Returns the per-stage startup times.
+    """
     print("Initializing MongoDB replica set...")
-    time.sleep(3)
+    stages = {}
+    nodes = [f"mongo{i + 1}" for i in range(node_count)]
 
+    spinner = Halo(
+        text="Waiting for MongoDB nodes to accept connections", spinner="dots"
+    )
+    spinner.start()
     try:
+        if not timed_stage(
+            stages,
+            "nodes_reachable",
+            wait_for_nodes,
+            nodes,
+            mongodb_node_ready,
+            max_wait,
+        ):
+            spinner.warn("Not every MongoDB node accepted connections within timeout")
+            return stages
+
         members_list = []
         for i in range(node_count):
             priority = 10 if i == 0 else 1
+            host = subnet_address(config["MONGODB_SUBNET"], i + 1)
             members_list.append(
-                {"_id": i, "host": f"mongo{i + 1}:27017", "priority": priority}
+                {"_id": i, "host": f"{host}:{MONGODB_PORT}", "priority": priority}
             )
 
         init_cmd = f'rs.initiate({{_id:"rs0",members:{json.dumps(members_list)}}}, {{force: true}})'
 
-        subprocess.run(
-            [
-                "sudo",
-                "docker",
-                "exec",
-                "mongo1",
-                "mongosh",
-                "--eval",
-                init_cmd,
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=10,
-        )
-
-        max_wait = 120
         start_time = time.time()
-        stabilized = False
-
-        spinner = Halo(text="Waiting for replica set to stabilize", spinner="dots")
-        spinner.start()
-
-        while time.time() - start_time < max_wait:
-            result = subprocess.run(
-                [
-                    "sudo",
-                    "docker",
-                    "exec",
-                    "mongo1",
-                    "mongosh",
-                    "--eval",
-                    "rs.status().members.map(m => ({_id: m._id, name: m.name, state: m.state, stateStr: m.stateStr}))",
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=10,
-            )
+        docker_exec("mongo1", "mongosh", "--eval", init_cmd, timeout=10)
+        stages["replica_set_initiated"] = {
+            "duration_s": time.time() - start_time,
+            "ready": True,
+        }
 
-            if "PRIMARY" in result.stdout or "SECONDARY" in result.stdout:
-                stabilized = True
-                break
-
-            time.sleep(10)
-
-        if stabilized:
+        spinner.text = "Waiting for replica set to stabilize"
+        if timed_stage(
+            stages,
+            "replica_set_stable",
+            wait_until,
+            lambda: replica_set_stable(node_count),
+            max_wait,
+        ):
             spinner.succeed(" MongoDB replica set initialized")
         else:
             spinner.warn("MongoDB replica set did not stabilize within timeout")
     except Exception as e:
+        spinner.stop()
         print(f"Warning: Could not initialize MongoDB replica set: {e}")
+    return stages
 
 
-def drop_mongodb_database():
+def drop_mongodb_database(container="mongo1"):
     try:
-        subprocess.run(
-            [
-                "sudo",
-                "docker",
-                "exec",
-                "mongo1",
-                "mongosh",
-                "--eval",
-                "db.getSiblingDB('ycsb').dropDatabase()",
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+        docker_exec(
+            container,
+            "mongosh",
+            "--eval",
+            "db.getSiblingDB('ycsb').dropDatabase()",
             timeout=10,
         )
     except Exception as e:
         print(f"Warning: Could not drop MongoDB database: {e}")
 
 
-def generate_mongodb_docker_compose(node_count, config):
+def config_servers(config):
+    return [f"cfg{i}" for i in range(1, config["MONGODB_CONFIG_SERVERS"] + 1)]
+
+
+def mongos_routers(config):
+    return [f"mongos{i}" for i in range(1, config["MONGODB_ROUTERS"] + 1)]
+
+
+def mongos_ports(config):
+    """Host ports of the mongos routers, in router order."""
+    return [MONGODB_PORT + i for i in range(config["MONGODB_ROUTERS"])]
+
+
+def shard_replica_sets(node_count, replicas):
+    """{replica set name: member containers} of the shards of a sharded cluster."""
+    return {
+        f"shard{s}": [f"shard{s}-{m}" for m in range(1, replicas + 2)]
+        for s in range(1, node_count + 1)
+    }
+
+
+def mongodb_data_nodes(topology, node_count, replicas):
+    """Every mongod holding benchmark data (shard members, or replica set members)."""
+    if topology == "sharded":
+        return [
+            member
+            for members in shard_replica_sets(node_count, replicas).values()
+            for member in members
+        ]
+    return [f"mongo{i}" for i in range(1, node_count + 1)]
+
+
+def generate_mongodb_docker_compose(
+    node_count, config, topology="replicaset", replicas=0
+):
     db_name = "mongodb"
     docker_compose_path = f"{db_name}/docker-compose-run.yml"
 
+    if topology == "sharded":
+        generate_mongodb_sharded_docker_compose(
+            node_count, replicas, config, docker_compose_path
+        )
+        return
+
     with open(f"{db_name}/{config['DOCKER_COMPOSE_BASE_FILENAME']}", "r") as f:
         mongodb_yml = f.read()
 
+    volumes = ["mongo1-data"]
     for i in range(2, node_count + 1):
         port = 27016 + i
         if port > 27019:
@@ -111,6 +190,79 @@ def generate_mongodb_docker_compose(node_count, config):
     ports:
       - "{port}:27017"
     command: ["mongod", "--replSet", "rs0", "--port", "27017", "--bind_ip_all"]
+    volumes:
+      - mongo{i}-data:/data/db
+    networks:
+      mongo-net:
+        ipv4_address: {subnet_address(config["MONGODB_SUBNET"], i)}
+"""
+        volumes.append(f"mongo{i}-data")
+
+    mongodb_yml += f"""
+networks:
+  mongo-net:
+    driver: bridge
+    ipam:
+      config:
+        - subnet: {config["MONGODB_SUBNET"]}
+
+volumes:
+"""
+    for volume in volumes:
+        mongodb_yml += f"""  {volume}:
+    name: ycsb-{volume}
+"""
+
+    with open(docker_compose_path, "w") as f:
+        f.write(mongodb_yml)
+
+
+def generate_mongodb_sharded_docker_compose(
+    node_count, replicas, config, docker_compose_path
+):
+    """Config server replica set, node_count shard replica sets and mongos routers.
+
+    Each shard has 1 + replicas members. Only the routers publish ports.
+    """
+    mongodb_yml = "services:"
+    volumes = []
+
+    def add_mongod(name, *options):
+        nonlocal mongodb_yml
+        command = json.dumps(["mongod", *options, "--port", "27017", "--bind_ip_all"])
+        mongodb_yml += f"""
+  {name}:
+    image: mongo:latest
+    container_name: {name}
+    command: {command}
+    volumes:
+      - {name}-data:/data/db
+    networks:
+      - mongo-net
+"""
+        volumes.append(f"{name}-data")
+
+    for name in config_servers(config):
+        add_mongod(name, "--configsvr", "--replSet", "cfg")
+    for replica_set, members in shard_replica_sets(node_count, replicas).items():
+        for name in members:
+            add_mongod(name, "--shardsvr", "--replSet", replica_set)
+
+    config_db = "cfg/" + ",".join(
+        f"{name}:{MONGODB_PORT}" for name in config_servers(config)
+    )
+    for name, port in zip(mongos_routers(config), mongos_ports(config)):
+        command = json.dumps(
+            ["mongos", "--configdb", config_db, "--port", "27017", "--bind_ip_all"]
+        )
+        mongodb_yml += f"""
+  {name}:
+    image: mongo:latest
+    container_name: {name}
+    ports:
+      - "{port}:27017"
+    command: {command}
+    restart: on-failure
     networks:
       - mongo-net
 """
@@ -119,40 +271,239 @@ def generate_mongodb_docker_compose(node_count, config):
 networks:
   mongo-net:
     driver: bridge
+
+volumes:
+"""
+    for volume in volumes:
+        mongodb_yml += f"""  {volume}:
+    name: ycsb-{volume}
 """
 
     with open(docker_compose_path, "w") as f:
         f.write(mongodb_yml)
 
 
-def handle_mongodb_workload(
-    workload_path, params, config, ycsb_wrapper, parse_ycsb_output
-):
-    results = {
-        "workload": os.path.splitext(os.path.basename(params["workload_path"]))[0],
-        "database": params["db"],
-        "node_count": params["node_count"],
-        "phases": [],
+def initiate_replica_set(name, members, configsvr=False):
+    """rs.initiate() unless the set already exists (e.g. restored volumes)."""
+    replica_set = {
+        "_id": name,
+        "configsvr": configsvr,
+        "members": [
+            {
+                "_id": i,
+                "host": f"{member}:{MONGODB_PORT}",
+                "priority": 10 if i == 0 else 1,
+            }
+            for i, member in enumerate(members)
+        ],
     }
+    return mongosh_eval(
+        members[0],
+        f"try {{ rs.status().ok }} catch (e) {{ rs.initiate({json.dumps(replica_set)}).ok }}",
+    )
+
+
+def initialize_mongodb_sharded_cluster(node_count, replicas, config, max_wait=180):
+    """Bring up the config server and shard replica sets, then register the shards.
+
+    Returns the per-stage startup times.
+    """
+    print("Initializing MongoDB sharded cluster...")
+    stages = {}
+    replica_sets = {"cfg": config_servers(config)}
+    replica_sets.update(shard_replica_sets(node_count, replicas))
+    mongods = [member for members in replica_sets.values() for member in members]
+    routers = mongos_routers(config)
+
+    spinner = Halo(
+        text="Waiting for MongoDB nodes to accept connections", spinner="dots"
+    )
+    spinner.start()
+    try:
+        if not timed_stage(
+            stages,
+            "nodes_reachable",
+            wait_for_nodes,
+            mongods,
+            mongodb_node_ready,
+            max_wait,
+        ):
+            spinner.warn("Not every MongoDB node accepted connections within timeout")
+            return stages
+
+        start_time = time.time()
+        for name, members in replica_sets.items():
+            initiate_replica_set(name, members, configsvr=name == "cfg")
+        stages["replica_sets_initiated"] = {
+            "duration_s": time.time() - start_time,
+            "ready": True,
+        }
+
+        spinner.text = "Waiting for replica sets to stabilize"
+        if not timed_stage(
+            stages,
+            "replica_sets_stable",
+            wait_for_nodes,
+            list(replica_sets),
+            lambda name: replica_set_stable(
+                len(replica_sets[name]), replica_sets[name][0]
+            ),
+            max_wait,
+        ):
+            spinner.warn("MongoDB replica sets did not stabilize within timeout")
+            return stages
+
+        spinner.text = "Waiting for mongos routers"
+        if not timed_stage(
+            stages,
+            "routers_reachable",
+            wait_for_nodes,
+            routers,
+            mongodb_node_ready,
+            max_wait,
+        ):
+            spinner.warn("Not every mongos router accepted connections within timeout")
+            return stages
+
+        spinner.text = f"Adding {node_count} shards"
+        for name, members in shard_replica_sets(node_count, replicas).items():
+            hosts = ",".join(f"{member}:{MONGODB_PORT}" for member in members)
+            mongosh_eval(routers[0], f'sh.addShard("{name}/{hosts}").ok', timeout=60)
+        if timed_stage(
+            stages,
+            "shards_added",
+            wait_until,
+            lambda: (
+                mongosh_eval(
+                    routers[0], "db.adminCommand({listShards: 1}).shards.length"
+                )
+                == str(node_count)
+            ),
+            max_wait,
+        ):
+            spinner.succeed(
+                f" MongoDB sharded cluster initialized ({node_count} shards)"
+            )
+        else:
+            spinner.warn("Not every MongoDB shard was added within timeout")
+    except Exception as e:
+        spinner.stop()
+        print(f"Warning: Could not initialize MongoDB sharded cluster: {e}")
+    return stages
+
+
+def shard_ycsb_collection(node_count, shard_key, config, router="mongos1"):
+    """Shard ycsb.usertable on _id and presplit it before anything is loaded.
+
+    A hashed key is presplit into MONGODB_CHUNKS_PER_SHARD chunks per shard
+    by shardCollection itself. A ranged key is split on the leading digit of
+    YCSB's "user<digits>" keys and the chunks are dealt out round-robin.
+    """
+    if shard_key == "hashed":
+        chunks = node_count * config["MONGODB_CHUNKS_PER_SHARD"]
+        script = (
+            'sh.enableSharding("ycsb"); '
+            'sh.shardCollection("ycsb.usertable", {_id: "hashed"}, false, '
+            f"{{numInitialChunks: {chunks}}}).ok"
+        )
+    else:
+        script = (
+            'sh.enableSharding("ycsb"); '
+            'sh.shardCollection("ycsb.usertable", {_id: 1}); '
+            f"const points = {json.dumps(RANGED_SPLIT_POINTS)}; "
+            'points.forEach(p => sh.splitAt("ycsb.usertable", {_id: p})); '
+            "points.forEach((p, i) => { try { "
+            f'sh.moveChunk("ycsb.usertable", {{_id: p}}, "shard" + ((i + 1) % {node_count} + 1)) '
+            "} catch (e) {} }); 1"
+        )
+    try:
+        if mongosh_eval(router, script, timeout=120).splitlines()[-1:] == ["1"]:
+            print(f"✓ Sharded ycsb.usertable ({shard_key} _id key, presplit)")
+            return True
+    except Exception as e:
+        print(f"Warning: Could not shard ycsb.usertable: {e}")
+        return False
+    print("Warning: Could not shard ycsb.usertable")
+    return False
+
+
+def reset_mongodb_collection(topology, node_count, shard_key, config):
+    """Drop the YCSB database; a sharded cluster gets a freshly sharded collection."""
+    if topology == "sharded":
+        drop_mongodb_database(mongos_routers(config)[0])
+        shard_ycsb_collection(node_count, shard_key, config, mongos_routers(config)[0])
+    else:
+        drop_mongodb_database()
+
 
-    drop_mongodb_database()
+def mongodb_url_options(params):
+    options = []
+    if topology_name(params) == "replicaset":
+        options.append("replicaSet=rs0")
+    if params["mongodb_read_preference"]:
+        options.append(f"readPreference={params['mongodb_read_preference']}")
+    if params["connection_pool_size"]:
+        options.append(f"maxPoolSize={params['connection_pool_size']}")
+    return f"/?{'&'.join(options)}" if options else ""
 
-    print("Starting YCSB load phase...")
-    load_output = ycsb_wrapper(config["YCSB_LOAD_COMMAND"], 0, workload_path)
-    load_data = parse_ycsb_output(load_output, "load", 0)
-    results["phases"].append(load_data)
-    print("\n\n✓ Load phase complete!\n")
 
-    print(f"Starting {params['iteration_count']} run iterations...")
-    for i in range(params["iteration_count"]):
-        print(
-            f"\n Running iteration {i + 1}/{params['iteration_count']}...",
-            end="",
-            flush=True,
+class MongoDbEngine(EngineAdapter):
+    """A MongoDB replica set, or a sharded cluster behind mongos routers."""
+
+    name = "mongodb"
+    ycsb_binding = "mongodb"
+
+    def generate_compose(self, params, config):
+        generate_mongodb_docker_compose(
+            params["node_count"], config, topology_name(params), params["replicas"]
         )
-        run_output = ycsb_wrapper(config["YCSB_RUN_COMMAND"], i, workload_path)
-        run_data = parse_ycsb_output(run_output, "run", i)
-        results["phases"].append(run_data)
 
-    print("\n✓ Done running all iterations!")
-    return results
+    def wait_ready(self, params, config):
+        if topology_name(params) == "sharded":
+            return initialize_mongodb_sharded_cluster(
+                params["node_count"], params["replicas"], config
+            )
+        return initialize_mongodb_replica_set(params["node_count"], config)
+
+    def setup_schema(self, params, config):
+        self.reset(params, config)
+
+    def connection_properties(self, params, config):
+        if topology_name(params) == "sharded":
+            routers = ",".join(f"localhost:{port}" for port in mongos_ports(config))
+            return f"""
+# MongoDB sharded cluster connection settings (auto-added, mongos routers)
+mongodb.url=mongodb://{routers}{mongodb_url_options(params)}
+"""
+        members = ",".join(f"{ip}:{MONGODB_PORT}" for ip in self.node_addresses())
+        return f"""
+# MongoDB connection settings (auto-added, every replica set member)
+mongodb.url=mongodb://{members}{mongodb_url_options(params)}
+"""
+
+    def reset(self, params, config):
+        reset_mongodb_collection(
+            topology_name(params), params["node_count"], params["shard_key"], config
+        )
+
+    def data_nodes(self, params):
+        return mongodb_data_nodes(
+            topology_name(params), params["node_count"], params["replicas"]
+        )
+
+    def client_nodes(self, params):
+        if params["mongodb_read_preference"] not in PRIMARY_READ_PREFERENCES:
+            return self.data_nodes(params)
+        # Every request goes to the primaries, i.e. the first member of each
+        # replica set (it has the top priority)
+        if topology_name(params) == "sharded":
+            return [
+                members[0]
+                for members in shard_replica_sets(
+                    params["node_count"], params["replicas"]
+                ).values()
+            ]
+        return ["mongo1"]
+
+    def requests_served(self, container):
+        return mongodb_operations_served(container)
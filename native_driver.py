@@ -0,0 +1,770 @@
+"""
+Native asyncio load driver, a drop-in for the YCSB client without the JVM.
+
+    python3 native_driver.py load|run BINDING [-s] [-P FILE]... [-p KEY=VALUE]...
+        [-threads N] [-target N]
+
+Takes the arguments of `ycsb.sh` and prints the same status lines and
+summary, and writes the same `<OP>.hdr` histogram logs, so its output goes
+through parse_ycsb_output like YCSB's. It implements YCSB's CoreWorkload
+(operation proportions, uniform/zipfian/latest/hotspot request
+distributions, scan and field lengths, insert order and key names) on top of
+the per-database clients in NATIVE_CLIENTS, which store records in the same
+layout as YCSB's bindings. A dataset loaded by either client can be run
+against by the other.
+
+With -p trace.file=PATH, the run phase replays the requests of a trace
+written by trace_generator.py instead of drawing them (optionally from
+-p trace.start=N, for operationcount operations or up to the trace's end).
+
+BINDING is a YCSB binding name: redis, mongodb or cassandra-cql.
+"""
+
+import asyncio
+import importlib
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+from hdrh.log import HistogramLogWriter
+
+from histogram_handler import new_histogram
+from utils import read_workload_properties
+
+# YCSB binding -> (module, class) of the native client speaking its protocol.
+# A client provides `async connect()`, `close()`, and read/scan/update/insert/
+# delete coroutines that return a YCSB status name ("OK", "NOT_FOUND", ...).
+NATIVE_CLIENTS = {
+    "redis": ("redis.redis_native", "RedisNativeClient"),
+    "mongodb": ("mongodb.mongodb_native", "MongoNativeClient"),
+    "cassandra-cql": ("cassandra.cassandra_native", "CqlNativeClient"),
+}
+
+FNV_OFFSET_BASIS_64 = 0xCBF29CE484222325
+FNV_PRIME_64 = 1099511628211
+MASK_64 = (1 << 64) - 1
+
+ZIPFIAN_CONSTANT = 0.99
+# Key space of YCSB's ScrambledZipfianGenerator and its precomputed zeta
+SCRAMBLED_ITEM_COUNT = 10_000_000_000
+SCRAMBLED_ZETAN = 26.46902820178302
+
+# Pool of printable characters that field values are sliced from
+VALUE_POOL_BYTES = 1 << 20
+
+# Terms of a zeta sum computed per numpy batch (bounds memory for big key spaces)
+ZETA_BATCH = 10_000_000
+
+# Run-phase operations; a trace stores an operation as its index here
+OPERATIONS = ("READ", "UPDATE", "INSERT", "SCAN", "READ-MODIFY-WRITE")
+
+# Field index in a request meaning "all fields"
+ALL_FIELDS = -1
+
+# Trace records read from the memory-mapped file at a time
+TRACE_BLOCK_OPS = 1 << 16
+
+# Operation errors printed before the rest are only counted
+MAX_PRINTED_ERRORS = 10
+
+DEFAULT_HDR_PERCENTILES = "95,99"
+
+
+def fnvhash64(value: int) -> int:
+    """YCSB's Utils.fnvhash64 (FNV-1a over the 8 bytes of a long)."""
+    hashval = FNV_OFFSET_BASIS_64
+    for _ in range(8):
+        hashval ^= value & 0xFF
+        value >>= 8
+        hashval = (hashval * FNV_PRIME_64) & MASK_64
+    if hashval >= 1 << 63:
+        hashval -= 1 << 64
+    return abs(hashval)
+
+
+def build_key_name(keynum: int, zeropadding: int, ordered: bool) -> str:
+    """YCSB's CoreWorkload.buildKeyName, e.g. "user6284781860667377211"."""
+    if not ordered:
+        keynum = fnvhash64(keynum)
+    value = str(keynum)
+    return "user" + "0" * (zeropadding - len(value)) + value
+
+
+def zeta(start: int, count: int, theta: float, initial: float = 0.0) -> float:
+    """initial + sum of 1 / i^theta for i in (start, count]."""
+    total = initial
+    for first in range(start + 1, count + 1, ZETA_BATCH):
+        last = min(first + ZETA_BATCH, count + 1)
+        total += float(np.sum(np.arange(first, last, dtype=np.float64) ** -theta))
+    return total
+
+
+class ZipfianGenerator:
+    """YCSB's ZipfianGenerator over [minimum, maximum] (Gray et al.)."""
+
+    def __init__(self, minimum, maximum, rng, constant=ZIPFIAN_CONSTANT, zetan=None):
+        self.rng = rng
+        self.items = maximum - minimum + 1
+        self.base = minimum
+        self.theta = constant
+        self.zeta2theta = zeta(0, 2, constant)
+        self.alpha = 1.0 / (1.0 - constant)
+        self.zetan = zeta(0, self.items, constant) if zetan is None else zetan
+        self.countforzeta = self.items
+        self.eta = self._eta()
+
+    def _eta(self):
+        # YCSB keeps using the initial item count here
+        return (1 - (2.0 / self.items) ** (1 - self.theta)) / (
+            1 - self.zeta2theta / self.zetan
+        )
+
+    def next_long(self, itemcount: int) -> int:
+        if itemcount > self.countforzeta:
+            self.zetan = zeta(self.countforzeta, itemcount, self.theta, self.zetan)
+            self.countforzeta = itemcount
+            self.eta = self._eta()
+        u = self.rng.random()
+        uz = u * self.zetan
+        if uz < 1.0:
+            return self.base
+        if uz < 1.0 + 0.5**self.theta:
+            return self.base + 1
+        return self.base + int(itemcount * (self.eta * u - self.eta + 1) ** self.alpha)
+
+    def next(self) -> int:
+        return self.next_long(self.countforzeta)
+
+
+class ScrambledZipfianGenerator:
+    """Zipfian popularity with the popular items scattered over the key space."""
+
+    def __init__(self, minimum, maximum, rng):
+        self.minimum = minimum
+        self.itemcount = maximum - minimum + 1
+        self.gen = ZipfianGenerator(0, SCRAMBLED_ITEM_COUNT, rng, zetan=SCRAMBLED_ZETAN)
+
+    def next(self) -> int:
+        return self.minimum + fnvhash64(self.gen.next()) % self.itemcount
+
+
+class UniformGenerator:
+    def __init__(self, minimum, maximum, rng):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.rng = rng
+
+    def next(self) -> int:
+        return self.rng.randint(self.minimum, self.maximum)
+
+
+class HotspotGenerator:
+    """hotspotopnfraction of the requests go to the first hotspotdatafraction of keys."""
+
+    def __init__(self, minimum, maximum, hot_set, hot_operations, rng):
+        self.minimum = minimum
+        self.hot_interval = int((maximum - minimum + 1) * hot_set)
+        self.cold_interval = maximum - minimum + 1 - self.hot_interval
+        self.hot_operations = hot_operations
+        self.rng = rng
+
+    def next(self) -> int:
+        if self.rng.random() < self.hot_operations:
+            return self.minimum + self.rng.randrange(max(1, self.hot_interval))
+        return (
+            self.minimum
+            + self.hot_interval
+            + self.rng.randrange(max(1, self.cold_interval))
+        )
+
+
+class AcknowledgedCounter:
+    """Insert key sequence; last() is the highest key inserted without gaps."""
+
+    def __init__(self, start):
+        self.counter = start
+        self.limit = start - 1
+        self.acknowledged = set()
+
+    def next(self) -> int:
+        value = self.counter
+        self.counter += 1
+        return value
+
+    def acknowledge(self, value):
+        self.acknowledged.add(value)
+        while self.limit + 1 in self.acknowledged:
+            self.limit += 1
+            self.acknowledged.discard(self.limit)
+
+    def last(self) -> int:
+        return self.limit
+
+
+class SkewedLatestGenerator:
+    """Zipfian over the insert sequence, favouring the most recent keys."""
+
+    def __init__(self, basis: AcknowledgedCounter, rng):
+        self.basis = basis
+        self.zipfian = ZipfianGenerator(0, max(1, basis.last()) - 1, rng)
+
+    def next(self) -> int:
+        maximum = self.basis.last()
+        return maximum - self.zipfian.next_long(maximum)
+
+
+def number_generator(distribution, minimum, maximum, rng):
+    """Scan/field length generator for constant, uniform or zipfian."""
+    if distribution == "uniform":
+        return UniformGenerator(minimum, maximum, rng)
+    if distribution == "zipfian":
+        return ZipfianGenerator(minimum, maximum, rng)
+    if distribution == "constant":
+        return UniformGenerator(maximum, maximum, rng)
+    raise ValueError(f"Unsupported length distribution: {distribution}")
+
+
+def operation_proportions(properties: dict) -> dict:
+    """Normalized share of each operation in the run phase, in OPERATIONS order."""
+    get = properties.get
+    proportions = {
+        "READ": float(get("readproportion", 0.95)),
+        "UPDATE": float(get("updateproportion", 0.05)),
+        "INSERT": float(get("insertproportion", 0)),
+        "SCAN": float(get("scanproportion", 0)),
+        "READ-MODIFY-WRITE": float(get("readmodifywriteproportion", 0)),
+    }
+    total = sum(proportions.values())
+    if total <= 0:
+        raise ValueError("The workload's operation proportions are all zero")
+    return {operation: value / total for operation, value in proportions.items()}
+
+
+class CoreWorkload:
+    """YCSB's CoreWorkload: which operation, on which key, with which values."""
+
+    def __init__(self, properties: dict, rng: random.Random):
+        get = properties.get
+        self.rng = rng
+        self.table = get("table", "usertable")
+        self.fieldcount = int(get("fieldcount", 10))
+        self.fieldnames = [
+            f"{get('fieldnameprefix', 'field')}{i}" for i in range(self.fieldcount)
+        ]
+        self.fieldlength = number_generator(
+            get("fieldlengthdistribution", "constant"),
+            1,
+            int(get("fieldlength", 100)),
+            rng,
+        )
+        self.readallfields = get("readallfields", "true") == "true"
+        self.writeallfields = get("writeallfields", "false") == "true"
+        self.ordered = get("insertorder", "hashed") != "hashed"
+        self.zeropadding = int(get("zeropadding", 1))
+
+        recordcount = int(get("recordcount", 0))
+        self.insertstart = int(get("insertstart", 0))
+        self.insertcount = int(get("insertcount", recordcount - self.insertstart))
+        self.keysequence = AcknowledgedCounter(self.insertstart)
+        self.transaction_inserts = AcknowledgedCounter(recordcount)
+
+        proportions = operation_proportions(properties)
+        self.choices = []
+        cumulative = 0.0
+        for operation, proportion in proportions.items():
+            if proportion > 0:
+                cumulative += proportion
+                self.choices.append((cumulative, operation))
+
+        last_key = self.insertstart + self.insertcount - 1
+        distribution = get("requestdistribution", "uniform")
+        if distribution == "uniform":
+            self.keychooser = UniformGenerator(self.insertstart, last_key, rng)
+        elif distribution == "zipfian":
+            expected_new_keys = int(
+                int(get("operationcount", 0)) * proportions["INSERT"] * 2.0
+            )
+            self.keychooser = ScrambledZipfianGenerator(
+                self.insertstart, last_key + 1 + expected_new_keys, rng
+            )
+        elif distribution == "latest":
+            self.keychooser = SkewedLatestGenerator(self.transaction_inserts, rng)
+        elif distribution == "hotspot":
+            self.keychooser = HotspotGenerator(
+                self.insertstart,
+                last_key,
+                float(get("hotspotdatafraction", 0.2)),
+                float(get("hotspotopnfraction", 0.8)),
+                rng,
+            )
+        else:
+            raise ValueError(f"Unsupported requestdistribution: {distribution}")
+        self.scanlength = number_generator(
+            get("scanlengthdistribution", "uniform"),
+            int(get("minscanlength", 1)),
+            int(get("maxscanlength", 1000)),
+            rng,
+        )
+
+        self.value_pool = (
+            np.random.default_rng(rng.getrandbits(64))
+            .integers(32, 127, VALUE_POOL_BYTES, dtype=np.uint8)
+            .tobytes()
+        )
+
+    def key_name(self, keynum: int) -> str:
+        return build_key_name(keynum, self.zeropadding, self.ordered)
+
+    def next_keynum(self) -> int:
+        limit = self.transaction_inserts.last()
+        while True:
+            keynum = self.keychooser.next()
+            if keynum <= limit:
+                return keynum
+
+    def value(self) -> bytes:
+        length = self.fieldlength.next()
+        offset = self.rng.randrange(VALUE_POOL_BYTES - length)
+        return self.value_pool[offset : offset + length]
+
+    def all_values(self) -> dict:
+        return {name: self.value() for name in self.fieldnames}
+
+    def update_values(self, field: int) -> dict:
+        if field == ALL_FIELDS:
+            return self.all_values()
+        return {self.fieldnames[field]: self.value()}
+
+    def read_fields(self, field: int):
+        return None if field == ALL_FIELDS else [self.fieldnames[field]]
+
+    def next_operation(self) -> str:
+        u = self.rng.random()
+        for cumulative, operation in self.choices:
+            if u < cumulative:
+                return operation
+        return self.choices[-1][1]
+
+    def next_field(self, all_fields: bool) -> int:
+        return ALL_FIELDS if all_fields else self.rng.randrange(self.fieldcount)
+
+    def next_request(self) -> tuple:
+        """(operation, keynum, scan length, read field, write field)."""
+        operation = self.next_operation()
+        if operation == "INSERT":
+            keynum = self.transaction_inserts.next()
+        else:
+            keynum = self.next_keynum()
+        return (
+            operation,
+            keynum,
+            self.scanlength.next() if operation == "SCAN" else 0,
+            self.next_field(self.readallfields),
+            self.next_field(self.writeallfields),
+        )
+
+
+class TraceReplay:
+    """Requests read in order from a trace written by trace_generator.py.
+
+    The trace is memory-mapped and read a block at a time, so replaying
+    touches only the pages in use. `start` and `count` select the slice this
+    client replays (count 0: up to the end of the trace).
+    """
+
+    def __init__(self, path: str, start: int = 0, count: int = 0):
+        trace = np.load(path, mmap_mode="r")
+        if start + count > len(trace):
+            raise ValueError(
+                f"Trace {path} has {len(trace)} operations, {start + count} requested"
+            )
+        self.trace = trace[start : start + count] if count else trace[start:]
+        if not len(self.trace):
+            raise ValueError(f"Trace {path} has no operations from {start}")
+        self.position = 0
+        self.block = iter(())
+
+    def __len__(self):
+        return len(self.trace)
+
+    def next_request(self) -> tuple:
+        try:
+            op, keynum, scanlength, read_field, write_field = next(self.block)
+        except StopIteration:
+            block = self.trace[self.position : self.position + TRACE_BLOCK_OPS]
+            self.position += len(block)
+            self.block = iter(block.tolist())
+            op, keynum, scanlength, read_field, write_field = next(self.block)
+        return OPERATIONS[op], keynum, scanlength, read_field, write_field
+
+
+class Measurements:
+    """Per-operation histograms (whole phase and current status interval).
+
+    Like YCSB, an operation that doesn't return OK is measured as
+    "<OP>-FAILED" while its return status is counted under "<OP>"; with
+    measurement.interval=intended/both, latency from the intended start time
+    is measured as "Intended-<OP>".
+    """
+
+    def __init__(self, interval_mode: str):
+        self.measure_op = interval_mode in ("op", "both")
+        self.measure_intended = interval_mode in ("intended", "both")
+        self.histograms = {}
+        self.intervals = {}
+        self.returns = {}
+
+    def _record(self, name: str, latency_us: int):
+        if name not in self.histograms:
+            self.histograms[name] = new_histogram()
+            self.intervals[name] = new_histogram()
+        self.histograms[name].record_value(latency_us)
+        self.intervals[name].record_value(latency_us)
+
+    def measure(self, operation, status, intended_ns, start_ns, end_ns):
+        returns = self.returns.setdefault(operation, {})
+        returns[status] = returns.get(status, 0) + 1
+        name = operation if status == "OK" else f"{operation}-FAILED"
+        if self.measure_op:
+            self._record(name, max(1, (end_ns - start_ns) // 1000))
+        if self.measure_intended:
+            self._record(
+                f"Intended-{name}", max(1, (end_ns - (intended_ns or start_ns)) // 1000)
+            )
+
+    def status_fields(self) -> str:
+        """Interval fields like "[READ: Count=.., Max=.., ...]"; resets them."""
+        fields = []
+        for name, histogram in sorted(self.intervals.items()):
+            count = histogram.get_total_count()
+            if count:
+                fields.append(
+                    f"[{name}: Count={count}, Max={histogram.get_max_value()}, "
+                    f"Min={histogram.get_min_value()}, "
+                    f"Avg={histogram.get_mean_value():.2f}, "
+                    f"90={histogram.get_value_at_percentile(90)}, "
+                    f"99={histogram.get_value_at_percentile(99)}, "
+                    f"99.9={histogram.get_value_at_percentile(99.9)}, "
+                    f"99.99={histogram.get_value_at_percentile(99.99)}]"
+                )
+            histogram.reset()
+        return " ".join(fields)
+
+    def summary_lines(self, percentiles: list) -> list:
+        lines = []
+        for name in dict.fromkeys([*self.histograms, *self.returns]):
+            histogram = self.histograms.get(name)
+            if histogram is not None:
+                lines += self._latency_lines(name, histogram, percentiles)
+            for status, count in self.returns.get(name, {}).items():
+                lines.append(f"[{name}], Return={status}, {count}")
+        return lines
+
+    @staticmethod
+    def _latency_lines(name, histogram, percentiles: list) -> list:
+        return [
+            f"[{name}], Operations, {histogram.get_total_count()}",
+            f"[{name}], AverageLatency(us), {histogram.get_mean_value()}",
+            f"[{name}], MinLatency(us), {histogram.get_min_value()}",
+            f"[{name}], MaxLatency(us), {histogram.get_max_value()}",
+        ] + [
+            f"[{name}], {percentile:g}thPercentileLatency(us), "
+            f"{histogram.get_value_at_percentile(percentile)}"
+            for percentile in percentiles
+        ]
+
+    def write_hdr_logs(self, path: str, start_ms: int, end_ms: int):
+        """One interval per operation, in the `<OP>.hdr` files YCSB exports."""
+        os.makedirs(path, exist_ok=True)
+        for name, histogram in self.histograms.items():
+            with open(os.path.join(path, f"{name}.hdr"), "w") as f:
+                writer = HistogramLogWriter(f)
+                # hdrh's output_start_time() takes the time as seconds; write it here
+                start = datetime.fromtimestamp(start_ms / 1000)
+                writer.output_comment(
+                    f"[StartTime: {start_ms / 1000:.3f} (seconds since epoch), "
+                    f"{start.isoformat(' ')}]"
+                )
+                writer.output_legend()
+                writer.output_interval_histogram(
+                    histogram, start_ms / 1000, end_ms / 1000
+                )
+
+
+class NativeDriver:
+    """One load or run phase: threadcount workers sharing one event loop."""
+
+    def __init__(self, command: str, binding: str, properties: dict, status: bool):
+        self.command = command
+        self.properties = properties
+        self.status = status
+        self.workload = CoreWorkload(properties, random.Random())
+        # Run-phase requests: drawn by the workload, or replayed from trace.file
+        self.requests = self.workload
+        if command == "run" and properties.get("trace.file"):
+            self.requests = TraceReplay(
+                properties["trace.file"],
+                int(properties.get("trace.start", 0)),
+                int(properties.get("operationcount", 0)),
+            )
+        self.measurements = Measurements(properties.get("measurement.interval", "op"))
+        self.threadcount = int(properties.get("threadcount", 1))
+        self.target = float(properties.get("target", 0))
+        self.max_execution_s = float(properties.get("maxexecutiontime", 0))
+        self.status_interval = int(properties.get("status.interval", 10))
+        self.ops_done = 0
+        self.errors = 0
+
+        module, name = NATIVE_CLIENTS[binding]
+        self.client = getattr(importlib.import_module(module), name)(
+            properties, self.threadcount
+        )
+
+    async def _measured(self, operation, intended_ns, call, *args):
+        start_ns = time.perf_counter_ns()
+        try:
+            status = await call(*args)
+        except Exception as e:
+            self.errors += 1
+            if self.errors <= MAX_PRINTED_ERRORS:
+                print(f"Error in {operation}: {e}", file=sys.stderr)
+            status = "ERROR"
+        self.measurements.measure(
+            operation, status, intended_ns, start_ns, time.perf_counter_ns()
+        )
+        return status
+
+    async def do_insert(self, intended_ns):
+        workload = self.workload
+        keynum = workload.keysequence.next()
+        await self._measured(
+            "INSERT",
+            intended_ns,
+            self.client.insert,
+            workload.table,
+            workload.key_name(keynum),
+            workload.all_values(),
+        )
+
+    async def do_transaction(self, intended_ns):
+        workload = self.workload
+        client = self.client
+        operation, keynum, scanlength, read_field, write_field = (
+            self.requests.next_request()
+        )
+        if operation == "INSERT":
+            try:
+                await self._measured(
+                    "INSERT",
+                    intended_ns,
+                    client.insert,
+                    workload.table,
+                    workload.key_name(keynum),
+                    workload.all_values(),
+                )
+            finally:
+                if self.requests is workload:
+                    workload.transaction_inserts.acknowledge(keynum)
+            return
+
+        key = workload.key_name(keynum)
+        if operation == "READ":
+            await self._measured(
+                "READ",
+                intended_ns,
+                client.read,
+                workload.table,
+                key,
+                workload.read_fields(read_field),
+            )
+        elif operation == "UPDATE":
+            await self._measured(
+                "UPDATE",
+                intended_ns,
+                client.update,
+                workload.table,
+                key,
+                workload.update_values(write_field),
+            )
+        elif operation == "SCAN":
+            await self._measured(
+                "SCAN",
+                intended_ns,
+                client.scan,
+                workload.table,
+                key,
+                scanlength,
+                workload.read_fields(read_field),
+            )
+        else:
+            start_ns = time.perf_counter_ns()
+            fields = workload.read_fields(read_field)
+            values = workload.update_values(write_field)
+            read = await self._measured(
+                "READ", intended_ns, client.read, workload.table, key, fields
+            )
+            update = await self._measured(
+                "UPDATE", intended_ns, client.update, workload.table, key, values
+            )
+            status = "OK" if read == update == "OK" else "ERROR"
+            self.measurements.measure(
+                "READ-MODIFY-WRITE",
+                status,
+                intended_ns,
+                start_ns,
+                time.perf_counter_ns(),
+            )
+
+    async def worker(self, operation_count, deadline_ns):
+        """One YCSB client thread: operation_count ops (0: until the deadline)."""
+        step = self.threadcount / self.target if self.target else 0
+        operation = self.do_insert if self.command == "load" else self.do_transaction
+        start = time.perf_counter()
+        i = 0
+        while not operation_count or i < operation_count:
+            intended_ns = None
+            if step:
+                intended = start + i * step
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                intended_ns = int(intended * 1e9)
+            if deadline_ns and time.perf_counter_ns() >= deadline_ns:
+                return
+            await operation(intended_ns)
+            self.ops_done += 1
+            i += 1
+
+    def print_status(self, start, previous_ops, previous):
+        now = time.perf_counter()
+        ops = self.ops_done
+        print(
+            f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S:%f')[:-3]} "
+            f"{int(now - start)} sec: {ops} operations; "
+            f"{(ops - previous_ops) / (now - previous):.2f} current ops/sec; "
+            f"{self.measurements.status_fields()}",
+            flush=True,
+        )
+        return ops, now
+
+    async def report_status(self, start):
+        """Status lines every status.interval; YCSB also prints one at the end."""
+        while True:
+            await asyncio.sleep(self.status_interval)
+            self.last_status = self.print_status(start, *self.last_status)
+
+    async def run(self) -> int:
+        if self.command == "load":
+            total = self.workload.insertcount
+        elif self.requests is not self.workload:
+            total = len(self.requests)
+        else:
+            total = int(self.properties.get("operationcount", 0))
+        shares = [
+            total // self.threadcount + (1 if i < total % self.threadcount else 0)
+            for i in range(self.threadcount)
+        ]
+        if not total and self.command == "run":
+            # operationcount=0 runs every thread until maxexecutiontime
+            shares = [0] * self.threadcount
+        else:
+            shares = [share for share in shares if share]
+
+        await self.client.connect()
+        start_ms = int(time.time() * 1000)
+        start = time.perf_counter()
+        deadline_ns = (
+            time.perf_counter_ns() + int(self.max_execution_s * 1e9)
+            if self.max_execution_s
+            else None
+        )
+        self.last_status = (0, start)
+        status_task = (
+            asyncio.create_task(self.report_status(start)) if self.status else None
+        )
+        try:
+            await asyncio.gather(*(self.worker(share, deadline_ns) for share in shares))
+        finally:
+            runtime_ms = (time.perf_counter() - start) * 1000
+            if status_task is not None:
+                status_task.cancel()
+                self.print_status(start, *self.last_status)
+            await self.client.close()
+        if self.errors > MAX_PRINTED_ERRORS:
+            print(f"{self.errors} operations raised errors", file=sys.stderr)
+
+        print(f"[OVERALL], RunTime(ms), {runtime_ms:.0f}")
+        print(f"[OVERALL], Throughput(ops/sec), {self.ops_done / (runtime_ms / 1000)}")
+        percentiles = [
+            float(p)
+            for p in self.properties.get(
+                "hdrhistogram.percentiles", DEFAULT_HDR_PERCENTILES
+            ).split(",")
+        ]
+        for line in self.measurements.summary_lines(percentiles):
+            print(line)
+        if self.properties.get("hdrhistogram.fileoutput") == "true":
+            self.measurements.write_hdr_logs(
+                self.properties.get("hdrhistogram.output.path", "."),
+                start_ms,
+                start_ms + int(runtime_ms),
+            )
+        return 0
+
+
+def parse_arguments(args: list) -> tuple:
+    """(command, binding, properties, status) from ycsb.sh-style arguments."""
+    if len(args) < 2 or args[0] not in ("load", "run"):
+        raise ValueError("Please use: load|run BINDING [-s] [-P FILE] [-p KEY=VALUE]")
+    command, binding = args[0], args[1]
+    if binding not in NATIVE_CLIENTS:
+        raise ValueError(
+            f"Unsupported binding {binding}. Please use one of "
+            f"{', '.join(NATIVE_CLIENTS)}"
+        )
+    properties = {}
+    status = False
+    rest = iter(args[2:])
+    for arg in rest:
+        if arg == "-s":
+            status = True
+        elif arg == "-P":
+            properties.update(read_workload_properties(next(rest)))
+        elif arg == "-p":
+            key, _, value = next(rest).partition("=")
+            properties[key] = value
+        elif arg in ("-threads", "-target"):
+            properties[arg[1:].replace("threads", "threadcount")] = next(rest)
+        else:
+            raise ValueError(f"Unknown argument: {arg}")
+    return command, binding, properties, status
+
+
+def main():
+    try:
+        command, binding, properties, status = parse_arguments(sys.argv[1:])
+    except (ValueError, StopIteration) as e:
+        print(f"Error: {e}")
+        print(__doc__)
+        sys.exit(2)
+    try:
+        driver = NativeDriver(command, binding, properties, status)
+    except (ValueError, ImportError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(
+        f"Native driver: {command} {binding}, {driver.threadcount} threads", flush=True
+    )
+    try:
+        sys.exit(asyncio.run(driver.run()))
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
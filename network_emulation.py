@@ -0,0 +1,148 @@
+import glob
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from config import CONFIG, params
+from readiness import docker_exec
+from resources import compose_service_names
+
+# Root qdisc of every shaped veth: a prio qdisc whose default priomap only
+# uses bands 1-3, so just the traffic the filters send to band 4 is delayed
+PRIO_QDISC = "prio bands 4 priomap 1 2 2 2 1 2 0 0 1 1 1 1 1 1 1 1"
+NETEM_BAND = "1:4"
+
+
+class NetworkProfileError(RuntimeError):
+    """The requested network profile couldn't be applied (or removed)."""
+
+
+def host_veth(container: str) -> str:
+    """Host-side veth interface of a container's eth0."""
+    iflink = docker_exec(container, "cat", "/sys/class/net/eth0/iflink").stdout.strip()
+    for path in glob.glob("/sys/class/net/*/ifindex"):
+        with open(path, "r") as f:
+            if f.read().strip() == iflink:
+                return path.split("/")[-2]
+    raise RuntimeError(f"No host interface with ifindex {iflink} for {container}")
+
+
+def container_addresses(containers: list) -> dict:
+    """{container: IPv4 address on its (only) network}."""
+    result = subprocess.run(
+        [
+            *CONFIG["DOCKER_COMMAND"],
+            "inspect",
+            "-f",
+            "{{.Name}} {{range .NetworkSettings.Networks}}{{.IPAddress}}{{end}}",
+            *containers,
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        timeout=30,
+    )
+    addresses = {}
+    for line in result.stdout.splitlines():
+        name, _, address = line.partition(" ")
+        if address:
+            addresses[name.lstrip("/")] = address.strip()
+    return addresses
+
+
+def netem_options(profile: dict) -> str:
+    """netem options of one direction: half the RTT (and jitter) per veth."""
+    options = f"delay {profile['rtt_ms'] / 2:g}ms"
+    if profile.get("jitter_ms"):
+        options += f" {profile['jitter_ms'] / 2:g}ms"
+    if profile.get("loss_pct"):
+        options += f" loss {profile['loss_pct']:g}%"
+    if profile.get("rate_mbit"):
+        options += f" rate {profile['rate_mbit']:g}mbit"
+    return options
+
+
+def node_zones(containers: list, zones: int | None = None) -> dict:
+    """Deal containers out to zones round-robin (default: one zone each)."""
+    zones = zones or len(containers)
+    return {container: i % zones for i, container in enumerate(containers)}
+
+
+def run_tc_batch(commands: list, check: bool = True):
+    """Run tc commands in one call; -force keeps going past failed commands."""
+    result = subprocess.run(
+        [*CONFIG["TC_COMMAND"], "-force", "-batch", "-"],
+        input="\n".join(commands) + "\n",
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        timeout=60,
+    )
+    if check and result.returncode != 0:
+        raise RuntimeError(f"tc failed: {result.stderr.strip()}")
+
+
+def cluster_containers() -> list:
+    with open(f"{params['db']}/docker-compose-run.yml", "r") as f:
+        return compose_service_names(f.read())
+
+
+def apply_network_profile() -> dict:
+    """Shape inter-node traffic of the running cluster with params' profile.
+
+    Each container's host-side veth delays (and optionally drops or rate
+    limits) packets arriving from nodes in other zones, so a round trip
+    between two nodes pays the profile's RTT. Traffic from the YCSB client
+    on the host is left alone. Veths are looked up again on every call, so
+    restarted containers are shaped too. Without a profile, shaping left
+    from an earlier call is removed.
+    """
+    name = params["network_profile"]
+    if name is None and params["network"] is None:
+        return None
+
+    containers = cluster_containers()
+    with ThreadPoolExecutor(max_workers=len(containers)) as executor:
+        veths = dict(zip(containers, executor.map(host_veth, containers)))
+    # Deleting fails on veths that were never shaped, which is fine
+    run_tc_batch([f"qdisc del dev {veth} root" for veth in veths.values()], False)
+
+    if name is None:
+        print("✓ Network shaping removed")
+        params["network"] = None
+        return None
+
+    profile = CONFIG["NETWORK_PROFILES"][name]
+    zones = node_zones(containers, profile.get("zones"))
+    addresses = container_addresses(containers)
+    options = netem_options(profile)
+    commands = []
+    links = 0
+    for container, veth in veths.items():
+        peers = [
+            addresses[peer]
+            for peer in containers
+            if zones[peer] != zones[container] and peer in addresses
+        ]
+        if not peers:
+            continue
+        commands += [
+            f"qdisc add dev {veth} root handle 1: {PRIO_QDISC}",
+            f"qdisc add dev {veth} parent {NETEM_BAND} handle 40: netem {options}",
+        ]
+        commands += [
+            f"filter add dev {veth} parent 1: protocol ip prio 1 u32"
+            f" match ip src {address}/32 flowid {NETEM_BAND}"
+            for address in peers
+        ]
+        links += len(peers)
+    run_tc_batch(commands)
+
+    params["network"] = {
+        "profile": name,
+        **profile,
+        "netem": options,
+        "zones": zones,
+        "shaped_links": links,
+    }
+    print(f"✓ Network profile {name} applied ({options}, {links} shaped links)")
+    return params["network"]
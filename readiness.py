@@ -0,0 +1,76 @@
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import CONFIG
+
+# Exponential backoff used by every readiness probe: start short so fast
+# nodes are detected quickly, cap it so slow ones aren't hammered
+INITIAL_INTERVAL_S = 0.25
+MAX_INTERVAL_S = 5
+BACKOFF_FACTOR = 2
+
+
+def docker_exec(container: str, *cmd: str, timeout: float = 10):
+    """Run a command in a container; returns the CompletedProcess (text mode)."""
+    return subprocess.run(
+        [*CONFIG["DOCKER_COMMAND"], "exec", container, *cmd],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        timeout=timeout,
+    )
+
+
+def wait_until(probe, timeout: float):
+    """Call probe() with exponential backoff until it returns True.
+
+    Exceptions raised by the probe count as "not ready yet". Returns the
+    elapsed seconds once ready, or None if the timeout expired.
+    """
+    start_time = time.time()
+    interval = INITIAL_INTERVAL_S
+    while True:
+        try:
+            if probe():
+                return time.time() - start_time
+        except Exception:
+            pass
+
+        remaining = timeout - (time.time() - start_time)
+        if remaining <= 0:
+            return None
+        time.sleep(min(interval, remaining))
+        interval = min(interval * BACKOFF_FACTOR, MAX_INTERVAL_S)
+
+
+def wait_for_nodes(nodes: list, probe, timeout: float) -> dict:
+    """Probe every node concurrently, each with its own backoff.
+
+    Returns {node: seconds until ready, or None if it never became ready}.
+    """
+    if not nodes:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(nodes)) as executor:
+        elapsed = executor.map(
+            lambda node: wait_until(lambda: probe(node), timeout), nodes
+        )
+        return dict(zip(nodes, elapsed))
+
+
+def timed_stage(stages: dict, name: str, wait, *args) -> bool:
+    """Run one readiness stage and record its duration (and per-node times).
+
+    `wait` returns either seconds/None (single probe) or a {node: seconds}
+    dict (per-node probes). Returns whether the stage completed.
+    """
+    start_time = time.time()
+    outcome = wait(*args)
+    stage = {"duration_s": time.time() - start_time}
+    if isinstance(outcome, dict):
+        stage["nodes_s"] = outcome
+        stage["ready"] = all(value is not None for value in outcome.values())
+    else:
+        stage["ready"] = outcome is not None
+    stages[name] = stage
+    return stage["ready"]
@@ -0,0 +1,223 @@
+"""
+Native asyncio Redis client for native_driver.py.
+
+Speaks RESP directly (the `redis` package would clash with this directory's
+name) and stores records like YCSB's redis binding: one hash per key plus
+the "_indices" sorted set, scored by the key's Java hashCode, for scans.
+With redis.cluster=true, commands are routed by hash slot from CLUSTER
+SLOTS and a MOVED reply refreshes the slot map.
+"""
+
+import asyncio
+
+INDEX_KEY = "_indices"
+CLUSTER_SLOTS = 16384
+
+
+class RespError(Exception):
+    pass
+
+
+def java_hash(key: str) -> int:
+    """Java's String.hashCode, YCSB's scan index score."""
+    h = 0
+    for c in key:
+        h = (31 * h + ord(c)) & 0xFFFFFFFF
+    return h - (1 << 32) if h >= 1 << 31 else h
+
+
+def crc16(data: bytes) -> int:
+    """CRC16-CCITT (XMODEM), Redis Cluster's key hash."""
+    crc = 0
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else crc << 1
+            crc &= 0xFFFF
+    return crc
+
+
+def key_slot(key: str) -> int:
+    """Hash slot of a key, honouring {hash tags}."""
+    start = key.find("{")
+    if start != -1:
+        end = key.find("}", start + 1)
+        if end > start + 1:
+            key = key[start + 1 : end]
+    return crc16(key.encode()) % CLUSTER_SLOTS
+
+
+def encode_command(args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+class RespConnection:
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def execute(self, *args):
+        self.writer.write(encode_command(args))
+        return await self.read_reply()
+
+    async def read_reply(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError(f"Connection to {self.host}:{self.port} closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RespError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            return (await self.reader.readexactly(length + 2))[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [await self.read_reply() for _ in range(length)]
+        raise RespError(f"Unexpected reply: {line!r}")
+
+    def close(self):
+        self.writer.close()
+
+
+class RespPool:
+    """Up to `size` connections to one node, each used by one caller at a time."""
+
+    def __init__(self, host: str, port: int, size: int):
+        self.host = host
+        self.port = port
+        self.idle = asyncio.Queue()
+        self.open = []
+        self.size = size
+
+    async def execute(self, *args):
+        if self.idle.empty() and len(self.open) < self.size:
+            connection = RespConnection(self.host, self.port)
+            self.open.append(connection)
+            try:
+                await connection.connect()
+            except Exception:
+                self.open.remove(connection)
+                raise
+        else:
+            connection = await self.idle.get()
+        try:
+            reply = await connection.execute(*args)
+        except RespError:
+            # An error reply leaves the connection usable
+            self.idle.put_nowait(connection)
+            raise
+        except Exception:
+            self.open.remove(connection)
+            connection.close()
+            raise
+        self.idle.put_nowait(connection)
+        return reply
+
+    def close(self):
+        for connection in self.open:
+            connection.close()
+
+
+class RedisNativeClient:
+    def __init__(self, properties: dict, threadcount: int):
+        self.host = properties.get("redis.host", "localhost")
+        self.port = int(properties.get("redis.port", 6379))
+        self.cluster = properties.get("redis.cluster", "false") == "true"
+        self.pool_size = int(properties.get("native.poolsize", threadcount))
+        self.pools = {}
+        self.slots = []
+
+    def _pool(self, host: str, port: int) -> RespPool:
+        address = (host, port)
+        if address not in self.pools:
+            self.pools[address] = RespPool(host, port, self.pool_size)
+        return self.pools[address]
+
+    async def connect(self):
+        if self.cluster:
+            await self._load_slots()
+        else:
+            await self._pool(self.host, self.port).execute("PING")
+
+    async def _load_slots(self):
+        slots = [None] * CLUSTER_SLOTS
+        for start, end, master, *_ in await self._pool(self.host, self.port).execute(
+            "CLUSTER", "SLOTS"
+        ):
+            pool = self._pool(master[0].decode(), int(master[1]))
+            for slot in range(start, end + 1):
+                slots[slot] = pool
+        self.slots = slots
+
+    async def execute(self, key: str, *args):
+        if not self.cluster:
+            return await self._pool(self.host, self.port).execute(*args)
+        try:
+            return await self.slots[key_slot(key)].execute(*args)
+        except RespError as e:
+            if not str(e).startswith(("MOVED", "ASK")):
+                raise
+            await self._load_slots()
+            return await self.slots[key_slot(key)].execute(*args)
+
+    async def close(self):
+        for pool in self.pools.values():
+            pool.close()
+
+    async def read(self, table, key, fields):
+        if fields is None:
+            reply = await self.execute(key, "HGETALL", key)
+        else:
+            reply = await self.execute(key, "HMGET", key, *fields)
+            reply = [value for value in reply if value is not None]
+        return "OK" if reply else "ERROR"
+
+    async def scan(self, table, startkey, recordcount, fields):
+        keys = await self.execute(
+            INDEX_KEY,
+            "ZRANGEBYSCORE",
+            INDEX_KEY,
+            java_hash(startkey),
+            "+inf",
+            "LIMIT",
+            0,
+            recordcount,
+        )
+        for key in keys:
+            await self.read(table, key.decode(), fields)
+        return "OK"
+
+    async def update(self, table, key, values):
+        reply = await self.execute(key, "HMSET", key, *_flatten(values))
+        return "OK" if reply == "OK" else "ERROR"
+
+    async def insert(self, table, key, values):
+        if await self.execute(key, "HMSET", key, *_flatten(values)) != "OK":
+            return "ERROR"
+        await self.execute(INDEX_KEY, "ZADD", INDEX_KEY, java_hash(key), key)
+        return "OK"
+
+    async def delete(self, table, key):
+        deleted = await self.execute(key, "DEL", key)
+        removed = await self.execute(INDEX_KEY, "ZREM", INDEX_KEY, key)
+        return "ERROR" if deleted == 0 and removed == 0 else "OK"
+
+
+def _flatten(values: dict) -> list:
+    return [item for pair in values.items() for item in pair]
@@ -1,56 +1,347 @@
-import os
+from halo import Halo
 
+from engine_adapter import EngineAdapter
+from readiness import docker_exec, timed_stage, wait_for_nodes
+from resources import subnet_address
+from utils import topology_name
 
-def generate_redis_docker_compose(node_count, config):
-    db_name = "redis"
+REDIS_PORT = 6379
+
+# Container names, image and binaries of a Redis-compatible server; drop-in
+# replacements (engines.py) reuse this module with their own
+REDIS_SERVER = {
+    "name": "redis",
+    "image": "redis:latest",
+    "server": "redis-server",
+    "cli": "redis-cli",
+    "options": "",
+}
+
+
+def cluster_node_count(node_count, replicas):
+    """Containers in a Redis Cluster: node_count masters plus their replicas."""
+    return node_count * (1 + replicas)
+
+
+def cluster_node_ip(i, config):
+    """Fixed IP of redis-node-<i> (1-based) on the cluster network."""
+    return subnet_address(config["REDIS_CLUSTER_SUBNET"], i)
+
+
+def cluster_nodes(node_count, replicas, server=REDIS_SERVER):
+    return [
+        f"{server['name']}-node-{i}"
+        for i in range(1, cluster_node_count(node_count, replicas) + 1)
+    ]
+
+
+def master_node(server=REDIS_SERVER):
+    return f"{server['name']}-master"
+
+
+def server_command(server, *args):
+    """Command line of a node: server binary, engine options, then args."""
+    return " ".join(
+        part for part in (server["server"], server["options"], *args) if part
+    )
+
+
+def generate_redis_docker_compose(
+    node_count, config, topology="replication", replicas=0, server=REDIS_SERVER
+):
+    db_name = server["name"]
     docker_compose_path = f"{db_name}/docker-compose-run.yml"
 
+    if topology == "cluster":
+        generate_redis_cluster_docker_compose(
+            node_count, replicas, config, docker_compose_path, server
+        )
+        return
+
     with open(f"{db_name}/{config['DOCKER_COMPOSE_BASE_FILENAME']}", "r") as f:
         redis_yml = f.read()
 
+    volumes = [f"{db_name}-master-data"]
     for i in range(1, node_count):
+        command = server_command(
+            server, "--appendonly yes", f"--replicaof {master_node(server)} 6379"
+        )
         redis_yml += f"""
-  redis-replica-{i}:
-    image: redis:latest
+  {db_name}-replica-{i}:
+    image: {server["image"]}
+    container_name: {db_name}-replica-{i}
     networks:
-      - redis-net
-    command: redis-server --appendonly yes --slaveof redis-master 6379
+      - {db_name}-net
+    command: {command}
+    volumes:
+      - {db_name}-replica-{i}-data:/data
 """
+        volumes.append(f"{db_name}-replica-{i}-data")
 
-    redis_yml += """
+    redis_yml += f"""
 networks:
-  redis-net:
+  {db_name}-net:
     driver: bridge
+
+volumes:
+"""
+    for volume in volumes:
+        redis_yml += f"""  {volume}:
+    name: ycsb-{volume}
 """
 
     with open(docker_compose_path, "w") as f:
         f.write(redis_yml)
 
 
-def handle_redis_workload(
-    workload_path, params, config, ycsb_wrapper, parse_ycsb_output
+def generate_redis_cluster_docker_compose(
+    node_count, replicas, config, docker_compose_path, server=REDIS_SERVER
 ):
-    results = {
-        "workload": os.path.splitext(os.path.basename(params["workload_path"]))[0],
-        "database": params["db"],
-        "node_count": params["node_count"],
-        "phases": [],
-    }
-
-    print("Starting YCSB load phase...")
-    load_output = ycsb_wrapper(config["YCSB_LOAD_COMMAND"], 0, workload_path)
-    load_data = parse_ycsb_output(load_output, "load", 0)
-    results["phases"].append(load_data)
-    print("\n\n✓ Load phase complete!\n")
-    print(f"Starting {params['iteration_count']} run iterations...")
-    for i in range(params["iteration_count"]):
-        print(
-            f"\n Running iteration {i + 1}/{params['iteration_count']}...",
-            end="",
-            flush=True,
+    """N cluster-enabled masters (plus replicas) on a subnet with fixed IPs.
+
+    The nodes announce their bridge IPs, which YCSB on the host follows when
+    it is redirected to another shard, so no ports are published.
+    """
+    redis_yml = "services:"
+    volumes = []
+    command = server_command(
+        server,
+        "--appendonly yes --cluster-enabled yes",
+        "--cluster-config-file nodes.conf --cluster-node-timeout 5000",
+    )
+    for i, node in enumerate(cluster_nodes(node_count, replicas, server), start=1):
+        redis_yml += f"""
+  {node}:
+    image: {server["image"]}
+    container_name: {node}
+    networks:
+      {server["name"]}-net:
+        ipv4_address: {cluster_node_ip(i, config)}
+    command: {command}
+    volumes:
+      - {node}-data:/data
+"""
+        volumes.append(f"{node}-data")
+
+    redis_yml += f"""
+networks:
+  {server["name"]}-net:
+    driver: bridge
+    ipam:
+      config:
+        - subnet: {config["REDIS_CLUSTER_SUBNET"]}
+
+volumes:
+"""
+    for volume in volumes:
+        redis_yml += f"""  {volume}:
+    name: ycsb-{volume}
+"""
+
+    with open(docker_compose_path, "w") as f:
+        f.write(redis_yml)
+
+
+def redis_node_ready(container, server=REDIS_SERVER):
+    """The node answers PING; replicas must also have a live link to the master."""
+    if docker_exec(container, server["cli"], "PING").stdout.strip() != "PONG":
+        return False
+    if container == master_node(server):
+        return True
+    info = docker_exec(container, server["cli"], "INFO", "replication").stdout
+    return "master_link_status:up" in info
+
+
+def wait_for_redis_replication(node_count, max_wait=60, server=REDIS_SERVER):
+    """Wait until the master and every replica are up. Returns stage times."""
+    stages = {}
+    nodes = redis_nodes("replication", node_count, 0, server)
+    spinner = Halo(text="Waiting for Redis nodes to be ready", spinner="dots")
+    spinner.start()
+    if timed_stage(
+        stages,
+        "nodes_ready",
+        wait_for_nodes,
+        nodes,
+        lambda node: redis_node_ready(node, server),
+        max_wait,
+    ):
+        spinner.succeed("Redis nodes ready")
+    else:
+        spinner.warn("Not every Redis node became ready within timeout")
+    return stages
+
+
+def redis_cluster_info(container, server=REDIS_SERVER):
+    """CLUSTER INFO of one node as a dict."""
+    info = docker_exec(container, server["cli"], "CLUSTER", "INFO").stdout
+    return dict(line.strip().split(":", 1) for line in info.splitlines() if ":" in line)
+
+
+def redis_cluster_node_ready(container, expected_nodes, server=REDIS_SERVER):
+    """The node sees a healthy cluster with every slot assigned and all nodes known."""
+    info = redis_cluster_info(container, server)
+    return (
+        info.get("cluster_state") == "ok"
+        and info.get("cluster_slots_assigned") == "16384"
+        and int(info.get("cluster_known_nodes", 0)) == expected_nodes
+    )
+
+
+def create_redis_cluster(
+    node_count, replicas, config, max_wait=120, server=REDIS_SERVER
+):
+    """Start-up of a Redis Cluster: nodes up, `--cluster create`, cluster ok.
+
+    The create step is skipped when the nodes already form a cluster (data
+    volumes restored from a snapshot keep their nodes.conf). Returns stage
+    times like wait_for_redis_replication.
+    """
+    stages = {}
+    nodes = cluster_nodes(node_count, replicas, server)
+    spinner = Halo(text="Waiting for Redis Cluster nodes to be ready", spinner="dots")
+    spinner.start()
+    if not timed_stage(
+        stages,
+        "nodes_ready",
+        wait_for_nodes,
+        nodes,
+        lambda node: docker_exec(node, server["cli"], "PING").stdout.strip() == "PONG",
+        max_wait,
+    ):
+        spinner.warn("Not every Redis node became ready within timeout")
+        return stages
+
+    if redis_cluster_info(nodes[0], server).get("cluster_known_nodes") == str(
+        len(nodes)
+    ):
+        spinner.text = "Redis Cluster already formed, waiting for it to converge"
+    else:
+        spinner.text = f"Creating Redis Cluster with {node_count} masters"
+        addresses = [
+            f"{cluster_node_ip(i, config)}:{REDIS_PORT}"
+            for i in range(1, len(nodes) + 1)
+        ]
+
+        def create():
+            result = docker_exec(
+                nodes[0],
+                server["cli"],
+                "--cluster",
+                "create",
+                *addresses,
+                "--cluster-replicas",
+                str(replicas),
+                "--cluster-yes",
+                timeout=max_wait,
+            )
+            return 0 if result.returncode == 0 else None
+
+        if not timed_stage(stages, "cluster_create", create):
+            spinner.fail("Could not create the Redis Cluster")
+            return stages
+
+    if timed_stage(
+        stages,
+        "cluster_ok",
+        wait_for_nodes,
+        nodes,
+        lambda node: redis_cluster_node_ready(node, len(nodes), server),
+        max_wait,
+    ):
+        spinner.succeed(
+            f"Redis Cluster ready ({node_count} masters, {replicas} replicas each)"
+        )
+    else:
+        spinner.warn("Redis Cluster did not reach cluster_state:ok within timeout")
+    return stages
+
+
+def redis_nodes(topology, node_count, replicas, server=REDIS_SERVER):
+    if topology == "cluster":
+        return cluster_nodes(node_count, replicas, server)
+    return [master_node(server)] + [
+        f"{server['name']}-replica-{i}" for i in range(1, node_count)
+    ]
+
+
+def redis_reads_served(container, server=REDIS_SERVER):
+    """Key lookups served by a node so far; every YCSB read hits or misses one key."""
+    info = docker_exec(container, server["cli"], "INFO", "stats").stdout
+    stats = dict(
+        line.strip().split(":", 1) for line in info.splitlines() if ":" in line
+    )
+    return int(stats["keyspace_hits"]) + int(stats["keyspace_misses"])
+
+
+def flush_redis_database(
+    topology="replication", node_count=1, replicas=0, server=REDIS_SERVER
+):
+    """FLUSHALL the master, or every cluster node (replicas just refuse it)."""
+    if topology == "cluster":
+        containers = cluster_nodes(node_count, replicas, server)
+    else:
+        containers = [master_node(server)]
+    for container in containers:
+        try:
+            docker_exec(container, server["cli"], "FLUSHALL", timeout=60)
+        except Exception as e:
+            print(f"Warning: Could not flush Redis database on {container}: {e}")
+
+
+class RedisEngine(EngineAdapter):
+    """Redis with master/replica replication or as a Redis Cluster."""
+
+    name = "redis"
+    ycsb_binding = "redis"
+    server = REDIS_SERVER
+
+    def generate_compose(self, params, config):
+        generate_redis_docker_compose(
+            params["node_count"],
+            config,
+            topology_name(params),
+            params["replicas"],
+            self.server,
         )
-        run_output = ycsb_wrapper(config["YCSB_RUN_COMMAND"], i, workload_path)
-        run_data = parse_ycsb_output(run_output, "run", i)
-        results["phases"].append(run_data)
 
-    return results
+    def wait_ready(self, params, config):
+        if topology_name(params) == "cluster":
+            return create_redis_cluster(
+                params["node_count"], params["replicas"], config, server=self.server
+            )
+        return wait_for_redis_replication(params["node_count"], server=self.server)
+
+    def connection_properties(self, params, config):
+        if topology_name(params) == "cluster":
+            return f"""
+# Redis Cluster connection settings (auto-added, seed node)
+redis.host={self.node_addresses()[0]}
+redis.port={REDIS_PORT}
+redis.cluster=true
+"""
+        return f"""
+# Redis connection settings (auto-added)
+redis.host=localhost
+redis.port={REDIS_PORT}
+"""
+
+    def reset(self, params, config):
+        flush_redis_database(
+            topology_name(params), params["node_count"], params["replicas"], self.server
+        )
+
+    def data_nodes(self, params):
+        return redis_nodes(
+            topology_name(params), params["node_count"], params["replicas"], self.server
+        )
+
+    def client_nodes(self, params):
+        # The binding reads from the master, or from the cluster masters
+        # (`--cluster create` makes the first node_count nodes masters)
+        if topology_name(params) == "cluster":
+            return self.data_nodes(params)[: params["node_count"]]
+        return [master_node(self.server)]
+
+    def requests_served(self, container):
+        return redis_reads_served(container, self.server)
@@ -0,0 +1,159 @@
+import ipaddress
+import os
+import re
+
+from config import CONFIG, params
+
+# A service header inside the compose "services:" block, e.g. "  mongo2:"
+SERVICE_HEADER_RE = re.compile(r"^  ([\w.-]+):$")
+
+# A fixed node address inside a service, e.g. "        ipv4_address: 172.29.0.11"
+IPV4_ADDRESS_RE = re.compile(r"^\s+ipv4_address:\s*([\d.]+)\s*$")
+
+# Node addresses are offset into a compose subnet to stay clear of the gateway
+NODE_ADDRESS_OFFSET = 10
+
+MIN_NODE_MEMORY_BYTES = 512 * 1024**2
+
+
+def host_cpus() -> list:
+    """CPUs this process may run on (respects an outer cpuset/taskset)."""
+    return sorted(os.sched_getaffinity(0))
+
+
+def host_memory_bytes() -> int:
+    with open("/proc/meminfo", "r") as f:
+        for line in f:
+            if line.startswith("MemTotal:"):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError("MemTotal not found in /proc/meminfo")
+
+
+def format_cpuset(cpus: list) -> str:
+    """[0, 1, 2, 5] -> "0-2,5"."""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(f"{a}-{b}" if a != b else f"{a}" for a, b in ranges)
+
+
+def compose_service_names(compose_yml: str) -> list:
+    services_block = compose_yml.split("\nnetworks:\n", 1)[0]
+    return [
+        match.group(1)
+        for match in map(SERVICE_HEADER_RE.match, services_block.splitlines())
+        if match
+    ]
+
+
+def subnet_address(subnet: str, index: int) -> str:
+    """Fixed address of the index-th (1-based) node of a compose subnet."""
+    return str(ipaddress.ip_network(subnet)[NODE_ADDRESS_OFFSET + index])
+
+
+def compose_service_addresses(compose_yml: str) -> dict:
+    """{service: fixed ipv4_address} for services that have one, in file order."""
+    services_block = compose_yml.split("\nnetworks:\n", 1)[0]
+    addresses = {}
+    service = None
+    for line in services_block.splitlines():
+        header = SERVICE_HEADER_RE.match(line)
+        if header:
+            service = header.group(1)
+            continue
+        address = IPV4_ADDRESS_RE.match(line)
+        if address and service:
+            addresses[service] = address.group(1)
+    return addresses
+
+
+def plan_placement(services: list) -> dict:
+    """Split host CPUs and memory between the YCSB client and the nodes.
+
+    The client gets `client_cpus` CPUs (CLIENT_CPU_FRACTION of the host by
+    default) so it never competes with a node. The remaining CPUs are dealt
+    out to the nodes in contiguous blocks; with fewer CPUs than nodes, nodes
+    share CPUs round-robin and the plan is marked oversubscribed. Nodes split
+    NODE_MEMORY_FRACTION of host memory evenly.
+    """
+    cpus = host_cpus()
+    client_cpu_count = params["client_cpus"] or max(
+        1, round(len(cpus) * CONFIG["CLIENT_CPU_FRACTION"])
+    )
+    client_cpu_count = min(client_cpu_count, len(cpus) - 1) if len(cpus) > 1 else 1
+    client_cpus = cpus[-client_cpu_count:]
+    node_cpus = cpus[:-client_cpu_count] or cpus
+
+    oversubscribed = len(node_cpus) < len(services) or len(cpus) == 1
+    per_node = max(1, len(node_cpus) // len(services))
+    memory_bytes = host_memory_bytes()
+    node_memory = max(
+        MIN_NODE_MEMORY_BYTES,
+        int(memory_bytes * CONFIG["NODE_MEMORY_FRACTION"] / len(services)),
+    )
+
+    nodes = {}
+    for i, service in enumerate(services):
+        if oversubscribed:
+            assigned = [node_cpus[i % len(node_cpus)]]
+        else:
+            assigned = node_cpus[i * per_node : (i + 1) * per_node]
+        nodes[service] = {
+            "cpuset": format_cpuset(assigned),
+            "cpus": len(assigned),
+            "mem_limit_bytes": node_memory,
+        }
+
+    return {
+        "host_cpus": len(cpus),
+        "host_memory_bytes": memory_bytes,
+        "client": {"cpuset": format_cpuset(client_cpus), "cpus": client_cpus},
+        "nodes": nodes,
+        "oversubscribed": oversubscribed,
+    }
+
+
+def apply_placement(compose_path: str) -> dict:
+    """Write cpuset/cpus/mem_limit into every service of a generated compose file.
+
+    Returns the placement, which is also kept in params for the YCSB client
+    and the results.
+    """
+    with open(compose_path, "r") as f:
+        compose_yml = f.read()
+
+    placement = plan_placement(compose_service_names(compose_yml))
+    lines = []
+    in_services = True
+    for line in compose_yml.splitlines():
+        lines.append(line)
+        if line == "networks:":
+            in_services = False
+        match = SERVICE_HEADER_RE.match(line) if in_services else None
+        if match and match.group(1) in placement["nodes"]:
+            node = placement["nodes"][match.group(1)]
+            lines.append(f'    cpuset: "{node["cpuset"]}"')
+            lines.append(f"    cpus: {node['cpus']}")
+            lines.append(f"    mem_limit: {node['mem_limit_bytes'] // 1024**2}m")
+
+    with open(compose_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+    if placement["oversubscribed"]:
+        print("Warning: fewer CPUs than nodes, nodes will share CPUs")
+    return placement
+
+
+def client_pinning() -> list:
+    """Command prefix pinning a YCSB client to the placement's client CPUs.
+
+    taskset sets the affinity before exec'ing the client, so the JVM that
+    ycsb.sh forks inherits it. Empty without a placement.
+    """
+    placement = params["placement"]
+    if not placement:
+        return []
+    return ["taskset", "-c", placement["client"]["cpuset"]]
@@ -0,0 +1,436 @@
+"""
+Append-only results store (SQLite).
+
+Every saved run is kept with its metadata; bulky per-phase arrays (timelines,
+histograms, telemetry) live in a side table as compressed blobs, and the
+merged histograms of aggregated_stats in a blob column of their own, so that
+listing and filtering runs never has to touch them. Runs are stored under
+their base database (db) and their full label, e.g. "cassandra" and
+"cassandra-rf3-rquorum"; a db filter matches either.
+
+    python3 results_store.py import [results_dir]
+    python3 results_store.py query [--db DB] [--nodes N] [--workload W] [--limit N]
+"""
+
+import glob
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+import zlib
+
+from config import CONFIG
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    git_revision TEXT,
+    host TEXT,
+    db TEXT NOT NULL,
+    label TEXT,
+    node_count INTEGER NOT NULL,
+    workload TEXT NOT NULL,
+    mode TEXT,
+    workload_properties TEXT,
+    aggregated_stats TEXT,
+    histograms BLOB,
+    metadata TEXT,
+    source_file TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS runs_lookup
+    ON runs (db, node_count, workload, created_at);
+CREATE INDEX IF NOT EXISTS runs_created_at ON runs (created_at);
+
+CREATE TABLE IF NOT EXISTS phases (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    seq INTEGER NOT NULL,
+    phase TEXT NOT NULL,
+    iteration INTEGER NOT NULL,
+    runtime_ms REAL,
+    throughput_ops_sec REAL,
+    timed_out INTEGER NOT NULL DEFAULT 0,
+    overall TEXT,
+    operations TEXT,
+    extra TEXT,
+    PRIMARY KEY (run_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS phase_arrays (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    seq INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (run_id, seq, kind)
+);
+"""
+
+# Phase keys stored as compressed blobs instead of inline JSON
+ARRAY_KINDS = ("timeline", "histograms", "telemetry")
+
+# Phase keys with their own columns
+PHASE_COLUMNS = ("phase", "iteration", "overall", "operations", "timed_out")
+
+# Top-level result keys with their own columns
+RUN_COLUMNS = ("workload", "database", "node_count", "phases", "aggregated_stats")
+
+
+def connect(db_path: str | None = None) -> sqlite3.Connection:
+    db_path = db_path or CONFIG["RESULTS_DB_PATH"]
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    connection = sqlite3.connect(db_path)
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+    migrate(connection)
+    return connection
+
+
+def migrate(connection: sqlite3.Connection):
+    """Split label and merged histograms out of runs stored before they had columns."""
+    columns = {row["name"] for row in connection.execute("PRAGMA table_info(runs)")}
+    if "label" in columns:
+        return
+    with connection:
+        connection.execute("ALTER TABLE runs ADD COLUMN label TEXT")
+        connection.execute("ALTER TABLE runs ADD COLUMN histograms BLOB")
+        for row in connection.execute(
+            "SELECT id, db, aggregated_stats FROM runs"
+        ).fetchall():
+            aggregated, histograms = split_histograms(
+                json.loads(row["aggregated_stats"])
+            )
+            connection.execute(
+                "UPDATE runs SET db = ?, label = ?, aggregated_stats = ?,"
+                " histograms = ? WHERE id = ?",
+                (
+                    base_db(row["db"]),
+                    row["db"],
+                    json.dumps(aggregated),
+                    pack(histograms) if histograms else None,
+                    row["id"],
+                ),
+            )
+
+
+def base_db(label: str) -> str:
+    """ "cassandra" of "cassandra-rf3-rquorum" (db names have no hyphens)."""
+    return label.split("-", 1)[0]
+
+
+def db_condition(db: str, table: str = "") -> tuple:
+    """SQL condition matching a base db (every variant) or one exact label."""
+    prefix = f"{table}." if table else ""
+    return f"({prefix}db = ? OR {prefix}label = ?)", [db, db]
+
+
+def split_histograms(aggregated_stats: dict) -> tuple:
+    """(aggregated_stats without the merged histograms, {op: histogram})."""
+    percentiles = aggregated_stats.get("latency_percentiles_us")
+    if not percentiles:
+        return aggregated_stats, {}
+    histograms = {
+        op: stats["histogram"]
+        for op, stats in percentiles.items()
+        if "histogram" in stats
+    }
+    stripped = {
+        op: {k: v for k, v in stats.items() if k != "histogram"}
+        for op, stats in percentiles.items()
+    }
+    return {**aggregated_stats, "latency_percentiles_us": stripped}, histograms
+
+
+def git_revision():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=5,
+        )
+        return result.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def source_key(path: str) -> str:
+    """Identify a results file by path and content: "<absolute path>#<sha1>".
+
+    Every run of a db/node count/workload overwrites the same file, so the
+    path alone doesn't tell runs apart.
+    """
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    return f"{os.path.abspath(path)}#{digest}"
+
+
+def pack(value) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+
+
+def unpack(data: bytes):
+    return json.loads(zlib.decompress(data))
+
+
+def append_run(
+    results: dict,
+    workload_properties: dict | None = None,
+    created_at: float | None = None,
+    source_file: str | None = None,
+    connection: sqlite3.Connection | None = None,
+    imported: bool = False,
+) -> int:
+    """Append one run (the dict handle_*_workload produced) and return its id.
+
+    `source_file` is the source_key of the results JSON holding the run, so
+    that importing that file later doesn't add the run twice.
+    """
+    own_connection = connection is None
+    connection = connection or connect()
+    metadata = {k: v for k, v in results.items() if k not in RUN_COLUMNS}
+    aggregated, histograms = split_histograms(results.get("aggregated_stats", {}))
+    try:
+        with connection:
+            cursor = connection.execute(
+                "INSERT INTO runs (created_at, git_revision, host, db, label,"
+                " node_count, workload, mode, workload_properties, aggregated_stats,"
+                " histograms, metadata, source_file)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    created_at or time.time(),
+                    None if imported else git_revision(),
+                    None if imported else socket.gethostname(),
+                    base_db(results["database"]),
+                    results["database"],
+                    results["node_count"],
+                    results["workload"],
+                    results.get("mode", "benchmark"),
+                    json.dumps(workload_properties or {}),
+                    json.dumps(aggregated),
+                    pack(histograms) if histograms else None,
+                    json.dumps(metadata),
+                    source_file,
+                ),
+            )
+            run_id = cursor.lastrowid
+
+            for seq, phase in enumerate(results["phases"]):
+                extra = {
+                    k: v
+                    for k, v in phase.items()
+                    if k not in PHASE_COLUMNS and k not in ARRAY_KINDS
+                }
+                connection.execute(
+                    "INSERT INTO phases (run_id, seq, phase, iteration, runtime_ms,"
+                    " throughput_ops_sec, timed_out, overall, operations, extra)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        run_id,
+                        seq,
+                        phase["phase"],
+                        phase["iteration"],
+                        phase["overall"].get("runtime_ms"),
+                        phase["overall"].get("throughput_ops_sec"),
+                        int(bool(phase.get("timed_out"))),
+                        json.dumps(phase["overall"]),
+                        json.dumps(phase["operations"]),
+                        json.dumps(extra),
+                    ),
+                )
+                connection.executemany(
+                    "INSERT INTO phase_arrays (run_id, seq, kind, data)"
+                    " VALUES (?, ?, ?, ?)",
+                    [
+                        (run_id, seq, kind, pack(phase[kind]))
+                        for kind in ARRAY_KINDS
+                        if phase.get(kind)
+                    ],
+                )
+    finally:
+        if own_connection:
+            connection.close()
+    return run_id
+
+
+def query_runs(
+    db: str | None = None,
+    node_count: int | None = None,
+    workload: str | None = None,
+    since: float | None = None,
+    limit: int = 20,
+    connection: sqlite3.Connection | None = None,
+) -> list:
+    """Most recent runs matching the filters, newest first (no phase data).
+
+    `db` is a base database (all its variants) or one full label.
+    """
+    own_connection = connection is None
+    connection = connection or connect()
+    clauses, values = [], []
+    if db is not None:
+        clause, db_values = db_condition(db)
+        clauses.append(clause)
+        values += db_values
+    for column, value in (
+        ("node_count", node_count),
+        ("workload", workload),
+    ):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            values.append(value)
+    if since is not None:
+        clauses.append("created_at >= ?")
+        values.append(since)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    try:
+        rows = connection.execute(
+            "SELECT id, created_at, git_revision, host, db, label, node_count,"
+            f" workload, mode, aggregated_stats FROM runs {where}"
+            " ORDER BY created_at DESC LIMIT ?",
+            (*values, limit),
+        ).fetchall()
+    finally:
+        if own_connection:
+            connection.close()
+    return [
+        dict(row, aggregated_stats=json.loads(row["aggregated_stats"])) for row in rows
+    ]
+
+
+def load_run(
+    run_id: int,
+    include_arrays: bool = True,
+    connection: sqlite3.Connection | None = None,
+) -> dict:
+    """Rebuild the results dict of a stored run."""
+    own_connection = connection is None
+    connection = connection or connect()
+    try:
+        run = connection.execute(
+            "SELECT * FROM runs WHERE id = ?", (run_id,)
+        ).fetchone()
+        if run is None:
+            raise KeyError(f"No run with id {run_id}")
+        phases = connection.execute(
+            "SELECT * FROM phases WHERE run_id = ? ORDER BY seq", (run_id,)
+        ).fetchall()
+        arrays = {}
+        if include_arrays:
+            for row in connection.execute(
+                "SELECT seq, kind, data FROM phase_arrays WHERE run_id = ?", (run_id,)
+            ):
+                arrays.setdefault(row["seq"], {})[row["kind"]] = unpack(row["data"])
+    finally:
+        if own_connection:
+            connection.close()
+
+    aggregated = json.loads(run["aggregated_stats"])
+    if run["histograms"]:
+        for op, histogram in unpack(run["histograms"]).items():
+            aggregated["latency_percentiles_us"][op]["histogram"] = histogram
+    results = {
+        "workload": run["workload"],
+        "database": run["label"] or run["db"],
+        "node_count": run["node_count"],
+        **json.loads(run["metadata"]),
+        "phases": [],
+        "aggregated_stats": aggregated,
+        "run_id": run["id"],
+        "created_at": run["created_at"],
+        "git_revision": run["git_revision"],
+        "host": run["host"],
+        "workload_properties": json.loads(run["workload_properties"]),
+    }
+    for phase in phases:
+        phase_data = {
+            "phase": phase["phase"],
+            "iteration": phase["iteration"],
+            "overall": json.loads(phase["overall"]),
+            "operations": json.loads(phase["operations"]),
+            **json.loads(phase["extra"]),
+            **arrays.get(phase["seq"], {}),
+        }
+        if phase["timed_out"]:
+            phase_data["timed_out"] = True
+        results["phases"].append(phase_data)
+    return results
+
+
+def import_json_results(results_dir: str | None = None) -> int:
+    """Import results/<db>/<n>/<workload>.json files, skipping imported ones."""
+    results_dir = results_dir or CONFIG["RESULTS_PATH"]
+    imported = 0
+    connection = connect()
+    try:
+        for path in sorted(glob.glob(f"{results_dir}/*/*/*.json")):
+            source_file = source_key(path)
+            # Runs imported before files were keyed by content have the bare path
+            if connection.execute(
+                "SELECT 1 FROM runs WHERE source_file IN (?, ?)",
+                (source_file, os.path.abspath(path)),
+            ).fetchone():
+                continue
+            with open(path, "r") as f:
+                results = json.load(f)
+            if not isinstance(results, dict) or "phases" not in results:
+                continue
+            append_run(
+                results,
+                created_at=os.path.getmtime(path),
+                source_file=source_file,
+                connection=connection,
+                imported=True,
+            )
+            imported += 1
+    finally:
+        connection.close()
+    return imported
+
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ["import"]:
+        imported = import_json_results(args[1] if len(args) > 1 else None)
+        print(f"✓ Imported {imported} result files into {CONFIG['RESULTS_DB_PATH']}")
+        return 0
+
+    if args[:1] == ["query"]:
+        filters = {"--db": None, "--nodes": None, "--workload": None, "--limit": "20"}
+        rest = args[1:]
+        while rest:
+            if rest[0] not in filters or len(rest) < 2:
+                print(f"Unknown or incomplete option: {rest[0]}")
+                return 1
+            filters[rest[0]] = rest[1]
+            rest = rest[2:]
+        runs = query_runs(
+            db=filters["--db"],
+            node_count=int(filters["--nodes"]) if filters["--nodes"] else None,
+            workload=filters["--workload"],
+            limit=int(filters["--limit"]),
+        )
+        for run in runs:
+            throughput = run["aggregated_stats"].get("throughput_ops_sec", {})
+            created = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(run["created_at"])
+            )
+            print(
+                f"#{run['id']:<5} {created}  {run['label'] or run['db']:<10}"
+                f" {run['node_count']:>2} nodes"
+                f"  {run['workload']:<12} {run['mode'] or '':<10}"
+                f"  {throughput.get('mean', float('nan')):>10.1f} ops/sec"
+                f"  {(run['git_revision'] or '')[:8]}"
+            )
+        return 0
+
+    print(__doc__)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
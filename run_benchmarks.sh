@@ -8,13 +8,16 @@ DATABASES=("redis" "mongodb" "cassandra")
 NODE_COUNTS=(3 5)
 # TODO: Based on instructions, we need to choose at least 3 workloads. I chose A, B and E for now. Gotta decide in team.
 WORKLOADS=("workloada" "workloadb" "workloade") 
-ITERATIONS=10
+# Upper bound: runs stop early once the throughput 95% CI is within ±2%
+ITERATIONS=20
+# Reuse loaded datasets across invocations (see README, "Dataset snapshot cache")
+EXTRA_ARGS=("--snapshot-cache" "--target-precision" "0.02")
 
 for DB in "${DATABASES[@]}"; do
     for NODES in "${NODE_COUNTS[@]}"; do
         for WORKLOAD in "${WORKLOADS[@]}"; do
-            echo "⚙️  Running $DB with $NODES nodes, workload $WORKLOAD, $ITERATIONS iterations..."
-            python3 main.py "$DB" "$NODES" "$WORKLOAD" "$ITERATIONS"
+            echo "⚙️  Running $DB with $NODES nodes, workload $WORKLOAD, up to $ITERATIONS iterations..."
+            python3 main.py "$DB" "$NODES" "$WORKLOAD" "$ITERATIONS" "${EXTRA_ARGS[@]}"
             echo "Finished $DB with $NODES nodes, workload $WORKLOAD"
             echo "---------------------------------------------"
         done
@@ -0,0 +1,206 @@
+"""
+Multi-stage workload schedules against one loaded dataset.
+
+The dataset is loaded once from the main workload; the stages of a schedule
+file then run in order against it, so cache, compaction and memory state
+carry over from one stage to the next. CONSULT README.md FOR THE SCHEDULE
+FILE FORMAT!
+"""
+
+import json
+import os
+import statistics
+
+from config import CONFIG, params
+from utils import (
+    read_workload_properties,
+    validate_iteration_count,
+    validate_workload_path,
+)
+from workload_handler import (
+    aggregate_run_phase_metrics,
+    prepare_workload,
+    run_db_workload,
+    run_load_phase,
+    save_results_json,
+    write_workload_overrides,
+)
+
+# Stage keys besides the YCSB property overrides
+STAGE_KEYS = (
+    "name",
+    "workload",
+    "overrides",
+    "operationcount",
+    "duration_s",
+    "iterations",
+)
+
+
+def load_schedule(schedule_path: str) -> dict:
+    """Read and validate a schedule file."""
+    if not os.path.exists(schedule_path):
+        raise ValueError(f"Schedule file does not exist: {schedule_path}")
+    with open(schedule_path, "r") as f:
+        schedule = json.load(f)
+
+    schedule.setdefault("name", os.path.splitext(os.path.basename(schedule_path))[0])
+    if not schedule.get("stages"):
+        raise ValueError(f"Schedule file has no stages: {schedule_path}")
+    for i, stage in enumerate(schedule["stages"]):
+        unknown = set(stage) - set(STAGE_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown stage keys: {', '.join(sorted(unknown))}")
+        stage.setdefault("name", f"stage{i + 1}")
+        if "workload" not in stage:
+            raise ValueError(f"Stage {stage['name']} has no workload")
+        stage["workload_path"] = validate_workload_path(stage["workload"])
+        stage["iterations"] = validate_iteration_count(int(stage.get("iterations", 1)))
+        stage.setdefault("overrides", {})
+        if (
+            stage.get("duration_s") is not None
+            and not 0 < stage["duration_s"] < CONFIG["YCSB_TIMEOUT_SEC"]
+        ):
+            raise ValueError(
+                f"Invalid duration_s in stage {stage['name']}. Please use "
+                f"0 < duration_s < YCSB_TIMEOUT_SEC ({CONFIG['YCSB_TIMEOUT_SEC']})"
+            )
+    return schedule
+
+
+def stage_overrides(stage: dict, record_count: int) -> dict:
+    """YCSB properties of one stage on a dataset of record_count records.
+
+    recordcount follows the dataset as earlier stages insert into it, so
+    reads cover the new keys and inserts don't collide with them. A
+    duration-only stage runs with an unlimited operationcount until YCSB's
+    maxexecutiontime.
+    """
+    overrides = {"recordcount": record_count}
+    if stage.get("duration_s") is not None:
+        overrides["maxexecutiontime"] = stage["duration_s"]
+        overrides["operationcount"] = stage.get("operationcount", 0)
+    elif stage.get("operationcount") is not None:
+        overrides["operationcount"] = stage["operationcount"]
+    overrides.update(stage["overrides"])
+    return overrides
+
+
+def inserted_records(phases: list) -> int:
+    """Records a stage's run phases inserted into the dataset."""
+    inserted = 0
+    for p in phases:
+        insert = p["operations"].get("INSERT", {})
+        inserted += insert.get("return_ok", insert.get("count", 0))
+    return inserted
+
+
+def steady_state(phases: list) -> dict:
+    """Median throughput and per-op p99 over all status samples of a stage."""
+    ops_per_sec = [v for p in phases for v in p["timeline"]["ops_per_sec"]]
+    p99 = {}
+    for p in phases:
+        for op, columns in p["timeline"]["latency_us"].items():
+            p99.setdefault(op, []).extend(v for v in columns["p99"] if v is not None)
+    return {
+        "ops_per_sec": statistics.median(ops_per_sec) if ops_per_sec else None,
+        "p99_latency_us": {op: statistics.median(v) for op, v in p99.items() if v},
+    }
+
+
+def stage_transition(previous: dict, stage: dict) -> dict:
+    """How a stage started compared with its own steady state.
+
+    The first status sample of the stage is compared with the stage's median
+    and with the last sample of the previous stage. warmup_s is the time until
+    throughput first reached STAGE_WARMUP_FRACTION of the steady state.
+    """
+    timeline = stage["phases"][0]["timeline"]
+    steady = steady_state(stage["phases"])
+    transition = {
+        "from": previous["name"] if previous else "load",
+        "to": stage["name"],
+        "previous_final_ops_sec": None,
+        "first_ops_sec": next(iter(timeline["ops_per_sec"]), None),
+        "steady_ops_sec": steady["ops_per_sec"],
+        "warmup_s": None,
+        "first_p99_latency_us": {
+            op: columns["p99"][0]
+            for op, columns in timeline["latency_us"].items()
+            if columns["p99"] and columns["p99"][0] is not None
+        },
+        "steady_p99_latency_us": steady["p99_latency_us"],
+    }
+    if previous:
+        previous_timeline = previous["phases"][-1]["timeline"]
+        if previous_timeline["ops_per_sec"]:
+            transition["previous_final_ops_sec"] = previous_timeline["ops_per_sec"][-1]
+    if steady["ops_per_sec"]:
+        threshold = CONFIG["STAGE_WARMUP_FRACTION"] * steady["ops_per_sec"]
+        for elapsed, ops_per_sec in zip(timeline["elapsed_s"], timeline["ops_per_sec"]):
+            if ops_per_sec >= threshold:
+                transition["warmup_s"] = elapsed
+                break
+    return transition
+
+
+def handle_schedule(workload_path: str, schedule: dict):
+    """Load the dataset once, then run every stage of the schedule in order."""
+    load_results = run_load_phase(workload_path)
+    if load_results is None:
+        print("Error: No results to save. Exiting...")
+        return
+
+    results = dict(load_results, workload=schedule["name"], mode="schedule", stages=[])
+    if params["snapshot"]:
+        results["snapshot"] = params["snapshot"]
+    record_count = int(read_workload_properties(workload_path).get("recordcount", 0))
+
+    previous = None
+    for i, stage in enumerate(schedule["stages"]):
+        overrides = stage_overrides(stage, record_count)
+        print(
+            f"\n\nStage {i + 1}/{len(schedule['stages'])} ({stage['name']}): "
+            f"{stage['workload']} x{stage['iterations']}, {overrides}"
+        )
+        stage_path = write_workload_overrides(
+            prepare_workload(stage["workload_path"]), overrides, f"stage{i + 1}"
+        )
+        stage_results = run_db_workload(
+            stage_path,
+            dict(params, skip_load=True, iteration_count=stage["iterations"]),
+        )
+        stage_result = {
+            "name": stage["name"],
+            "workload": stage["workload"],
+            "overrides": overrides,
+            "phases": stage_results["phases"],
+            "aggregated_stats": aggregate_run_phase_metrics(stage_results),
+        }
+        if stage_result["phases"]:
+            stage_result["transition"] = stage_transition(previous, stage_result)
+        results["stages"].append(stage_result)
+        record_count += inserted_records(stage_result["phases"])
+        print_stage(stage_result)
+        previous = stage_result if stage_result["phases"] else previous
+
+    results["schedule"] = {
+        "name": schedule["name"],
+        "stages": [s["name"] for s in schedule["stages"]],
+        "final_recordcount": record_count,
+    }
+    save_results_json(results, suffix="schedule")
+    print(f"\n✓ Ran {len(results['stages'])} stages of schedule {schedule['name']}")
+
+
+def print_stage(stage: dict):
+    throughput = stage["aggregated_stats"].get("throughput_ops_sec", {}).get("mean", 0)
+    print(f"\n → {stage['name']}: {throughput:.1f} ops/sec")
+    transition = stage.get("transition")
+    if transition:
+        print(
+            f"   transition {transition['from']} → {transition['to']}: "
+            f"first {transition['first_ops_sec']} ops/sec, "
+            f"steady {transition['steady_ops_sec']} ops/sec, "
+            f"warm-up {transition['warmup_s']} s"
+        )
@@ -0,0 +1,102 @@
+from cassandra.cassandra_operations import CassandraEngine
+from readiness import docker_exec
+from resources import subnet_address
+
+SCYLLADB_IMAGE = "scylladb/scylla:latest"
+
+# Requests served per shard, from the node's Prometheus endpoint
+REQUESTS_SERVED_METRIC = "scylla_transport_requests_served"
+
+
+def generate_scylladb_docker_compose(node_count, config):
+    """A ScyllaDB ring with scylla-1 as seed, on a subnet with fixed IPs.
+
+    Nodes must bootstrap one at a time, so each one waits for the previous
+    one to answer CQL (compose healthcheck) before it starts.
+    """
+    docker_compose_path = "scylladb/docker-compose-run.yml"
+    command = (
+        f"--seeds scylla-1 --smp {config['SCYLLADB_SMP']} "
+        f"--memory {config['SCYLLADB_MEMORY']} --overprovisioned 1 "
+        "--developer-mode 1 --api-address 0.0.0.0"
+    )
+
+    scylladb_yml = "services:"
+    volumes = []
+    for i in range(1, node_count + 1):
+        scylladb_yml += f"""
+  scylla-{i}:
+    image: {SCYLLADB_IMAGE}
+    container_name: scylla-{i}
+    ports:
+      - "{9042 + i - 1}:9042"
+    command: {command}
+    volumes:
+      - scylla-{i}-data:/var/lib/scylla
+    networks:
+      scylla-net:
+        ipv4_address: {subnet_address(config["SCYLLADB_SUBNET"], i)}
+    healthcheck:
+      test: ["CMD", "cqlsh", "-e", "SELECT release_version FROM system.local"]
+      interval: 5s
+      timeout: 10s
+      retries: 60
+      start_period: 20s
+"""
+        if i > 1:
+            scylladb_yml += f"""    depends_on:
+      scylla-{i - 1}:
+        condition: service_healthy
+"""
+        volumes.append(f"scylla-{i}-data")
+
+    scylladb_yml += f"""
+networks:
+  scylla-net:
+    driver: bridge
+    ipam:
+      config:
+        - subnet: {config["SCYLLADB_SUBNET"]}
+
+volumes:
+"""
+    for volume in volumes:
+        scylladb_yml += f"""  {volume}:
+    name: ycsb-{volume}
+"""
+
+    with open(docker_compose_path, "w") as f:
+        f.write(scylladb_yml)
+
+
+def scylladb_requests_served(container):
+    """CQL requests this node has served, summed over its shards."""
+    output = docker_exec(
+        container, "curl", "-s", "http://localhost:9180/metrics", timeout=30
+    ).stdout
+    served = [
+        float(line.rsplit(" ", 1)[1])
+        for line in output.splitlines()
+        if line.startswith(REQUESTS_SERVED_METRIC + "{")
+    ]
+    if not served:
+        raise ValueError(f"No {REQUESTS_SERVED_METRIC} metric on {container}")
+    return int(sum(served))
+
+
+class ScyllaDbEngine(CassandraEngine):
+    """A ScyllaDB ring, driven like Cassandra over CQL.
+
+    Keyspace, consistency and table settings (--rf, --read-cl, ...) apply
+    unchanged; nodetool and cqlsh behave the same for readiness and reset.
+    """
+
+    name = "scylladb"
+    node_prefix = "scylla"
+    ycsb_binding = "cassandra-cql"
+
+    def generate_compose(self, params, config):
+        generate_scylladb_docker_compose(params["node_count"], config)
+
+    def requests_served(self, container):
+        return scylladb_requests_served(container)
@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+
+from config import CONFIG, params
+from docker_handler import compose_command, wait_for_cluster_ready
+from engines import get_engine
+from utils import database_label, read_workload_properties
+
+# Workload properties that determine what the load phase writes, with YCSB's
+# defaults for when a workload file doesn't set them
+DATASET_PROPERTIES = {
+    "recordcount": "0",
+    "insertstart": "0",
+    "fieldcount": "10",
+    "fieldlength": "100",
+    "fieldlengthdistribution": "constant",
+    "insertorder": "hashed",
+    "zeropadding": "1",
+}
+
+INDEX_FILENAME = "index.json"
+
+
+def snapshot_key_properties() -> dict:
+    """Everything that identifies a loaded dataset for the current run."""
+    workload = read_workload_properties(params["workload_path"])
+    # The dataset doesn't depend on the network profile or the load driver
+    key_properties = {
+        "db": database_label(dict(params, network_profile=None, driver=None)),
+        "node_count": params["node_count"],
+    }
+    if params["replicas"]:
+        key_properties["replicas"] = params["replicas"]
+    key_properties.update(get_engine(params["db"]).dataset_settings(params))
+    for key, default in DATASET_PROPERTIES.items():
+        key_properties[key] = workload.get(key, default)
+    return key_properties
+
+
+def snapshot_key(key_properties: dict) -> str:
+    digest = hashlib.sha1(
+        json.dumps(key_properties, sort_keys=True).encode()
+    ).hexdigest()[:12]
+    return f"{key_properties['db']}-{key_properties['node_count']}-{digest}"
+
+
+def compose_volume_names() -> list:
+    """Named data volumes declared in the generated compose file."""
+    with open(f"{params['db']}/docker-compose-run.yml", "r") as f:
+        compose_yml = f.read()
+    volumes_section = compose_yml.split("\nvolumes:\n", 1)
+    if len(volumes_section) < 2:
+        return []
+    return re.findall(r"^\s+name: (\S+)$", volumes_section[1], re.MULTILINE)
+
+
+def load_index() -> dict:
+    index_path = f"{CONFIG['SNAPSHOT_CACHE_PATH']}/{INDEX_FILENAME}"
+    if not os.path.exists(index_path):
+        return {}
+    with open(index_path, "r") as f:
+        return json.load(f)
+
+
+def save_index(index: dict):
+    os.makedirs(CONFIG["SNAPSHOT_CACHE_PATH"], exist_ok=True)
+    with open(f"{CONFIG['SNAPSHOT_CACHE_PATH']}/{INDEX_FILENAME}", "w") as f:
+        json.dump(index, f, indent=2)
+
+
+def run_volume_helper(volume: str, snapshot_dir: str, shell_command: str):
+    """Run a shell command in a throwaway container with the volume at /data
+    and the snapshot directory at /snapshot."""
+    subprocess.run(
+        [
+            *CONFIG["DOCKER_COMMAND"],
+            "run",
+            "--rm",
+            "-v",
+            f"{volume}:/data",
+            "-v",
+            f"{os.path.abspath(snapshot_dir)}:/snapshot",
+            CONFIG["SNAPSHOT_HELPER_IMAGE"],
+            "sh",
+            "-c",
+            shell_command,
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=1800,
+        check=True,
+    )
+
+
+def remove_volumes(volumes: list):
+    for volume in volumes:
+        subprocess.run(
+            [*CONFIG["DOCKER_COMMAND"], "volume", "rm", "-f", volume],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=60,
+            check=False,
+        )
+
+
+def restore_snapshot():
+    """Restore the cached dataset into fresh volumes before the cluster starts.
+
+    Must run after generate_docker_compose() and before run_docker_compose().
+    Returns the snapshot info to record in the results, or None on a miss.
+    """
+    key_properties = snapshot_key_properties()
+    key = snapshot_key(key_properties)
+    index = load_index()
+    entry = index.get(key)
+    if entry is None:
+        print(f"Dataset snapshot cache miss ({key})")
+        return None
+
+    print(f"Restoring dataset snapshot {key}...")
+    start_time = time.time()
+    snapshot_dir = f"{CONFIG['SNAPSHOT_CACHE_PATH']}/{key}"
+    created = []
+    try:
+        for volume in entry["volumes"]:
+            subprocess.run(
+                [*CONFIG["DOCKER_COMMAND"], "volume", "create", volume],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=30,
+                check=True,
+            )
+            created.append(volume)
+            run_volume_helper(
+                volume,
+                snapshot_dir,
+                f"tar -xf /snapshot/{volume}.tar --numeric-owner -C /data",
+            )
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+        print(f"Warning: Could not restore snapshot {key}, loading instead: {e}")
+        # The load must not run on top of partly extracted data
+        remove_volumes(created)
+        return None
+    restore_time_s = time.time() - start_time
+
+    entry["last_used"] = time.time()
+    save_index(index)
+
+    print(
+        f"✓ Snapshot restored in {restore_time_s:.1f}s "
+        f"(load phase took {entry['load_time_s']:.1f}s)"
+    )
+    return {
+        "key": key,
+        "properties": key_properties,
+        "restored": True,
+        "restore_time_s": restore_time_s,
+        "load_time_s": entry["load_time_s"],
+        "time_saved_s": entry["load_time_s"] - restore_time_s,
+    }
+
+
+def save_snapshot(load_time_s: float):
+    """Archive the freshly loaded data volumes into the cache.
+
+    The cluster is stopped so the archives are consistent, then started again
+    and waited on before the run phase continues.
+    """
+    key_properties = snapshot_key_properties()
+    key = snapshot_key(key_properties)
+    volumes = compose_volume_names()
+    snapshot_dir = f"{CONFIG['SNAPSHOT_CACHE_PATH']}/{key}"
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+    print(f"Saving dataset snapshot {key}...")
+    start_time = time.time()
+    try:
+        compose_command("stop")
+        uid_gid = f"{os.getuid()}:{os.getgid()}"
+        for volume in volumes:
+            run_volume_helper(
+                volume,
+                snapshot_dir,
+                f"tar -cf /snapshot/{volume}.tar --numeric-owner -C /data . "
+                f"&& chown {uid_gid} /snapshot/{volume}.tar",
+            )
+    except Exception as e:
+        print(f"Warning: Could not save snapshot {key}: {e}")
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        return {"key": key, "properties": key_properties, "restored": False}
+    finally:
+        compose_command("start")
+        wait_for_cluster_ready()
+    snapshot_time_s = time.time() - start_time
+
+    size_bytes = sum(
+        os.path.getsize(f"{snapshot_dir}/{volume}.tar") for volume in volumes
+    )
+    index = load_index()
+    index[key] = {
+        "properties": key_properties,
+        "volumes": volumes,
+        "size_bytes": size_bytes,
+        "load_time_s": load_time_s,
+        "created": time.time(),
+        "last_used": time.time(),
+    }
+    evict_snapshots(index, keep=key)
+    save_index(index)
+
+    print(f"✓ Snapshot saved ({size_bytes / 1e6:.1f} MB in {snapshot_time_s:.1f}s)")
+    return {
+        "key": key,
+        "properties": key_properties,
+        "restored": False,
+        "load_time_s": load_time_s,
+        "snapshot_time_s": snapshot_time_s,
+        "size_bytes": size_bytes,
+    }
+
+
+def evict_snapshots(index: dict, keep: str | None = None):
+    """Drop least recently used snapshots until the cache fits the disk budget."""
+    budget_bytes = CONFIG["SNAPSHOT_CACHE_BUDGET_GB"] * 1e9
+    total_bytes = sum(entry["size_bytes"] for entry in index.values())
+    for key in sorted(index, key=lambda k: index[k]["last_used"]):
+        if total_bytes <= budget_bytes:
+            break
+        if key == keep:
+            continue
+        print(f"Evicting dataset snapshot {key}")
+        shutil.rmtree(f"{CONFIG['SNAPSHOT_CACHE_PATH']}/{key}", ignore_errors=True)
+        total_bytes -= index.pop(key)["size_bytes"]
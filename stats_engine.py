@@ -0,0 +1,311 @@
+"""
+Vectorized statistics over many runs at once.
+
+All run-phase iterations of all runs are laid out in one NumPy array of shape
+(runs, metrics, iterations), NaN-padded where an iteration is missing or an
+operation type didn't occur, and every statistic is computed along the last
+axis in one pass.
+
+    python3 stats_engine.py [--db DB] [--nodes N] [--workload W] [--bootstrap N]
+"""
+
+import json
+import re
+import sys
+import time
+import warnings
+
+import numpy as np
+from scipy import stats
+
+from results_store import connect, db_condition
+
+# Overall metrics taken from each phase's "overall" dict
+OVERALL_METRICS = ("throughput_ops_sec", "runtime_ms")
+
+# Metrics that get bootstrap CIs: throughput and latency percentiles
+BOOTSTRAP_METRIC_RE = re.compile(
+    r"^(overall\.throughput_ops_sec|[^.]+\.p\d[\d_]*_latency_us)$"
+)
+
+# Bootstrap working set is split into chunks of about this many floats
+BOOTSTRAP_CHUNK_ELEMENTS = 20_000_000
+
+
+def phase_layouts(phase_lists: list) -> tuple:
+    """Group phases by layout (which overall keys, op types and op keys).
+
+    Returns (keys, layouts): every metric seen, "overall.<key>" and
+    "<OP>.<key>", and {layout: (metric names, value positions, runs,
+    iterations, value rows)} so each layout is written to the array at once.
+    """
+    layouts = {}
+    for r, phases in enumerate(phase_lists):
+        for i, p in enumerate(phases):
+            overall, operations = p["overall"], p["operations"]
+            layout = (
+                tuple(overall),
+                tuple((op, tuple(values)) for op, values in operations.items()),
+            )
+            values = [*overall.values()]
+            for op_values in operations.values():
+                values.extend(op_values.values())
+            if layout not in layouts:
+                layouts[layout] = (*layout_columns(layout, values), [], [], [])
+            _, _, runs, iterations, rows = layouts[layout]
+            runs.append(r)
+            iterations.append(i)
+            rows.append(values)
+
+    keys = sorted({name for names, *_ in layouts.values() for name in names})
+    return keys, layouts
+
+
+def layout_columns(layout: tuple, values: list) -> tuple:
+    """Metric names of a layout's numeric values and their positions."""
+    overall_keys, operations = layout
+    names = [f"overall.{k}" for k in overall_keys]
+    names += [f"{op}.{k}" for op, op_keys in operations for k in op_keys]
+    numeric = [
+        position
+        for position, (name, v) in enumerate(zip(names, values))
+        if isinstance(v, (int, float))
+        and not isinstance(v, bool)
+        and (position >= len(overall_keys) or overall_keys[position] in OVERALL_METRICS)
+    ]
+    return [names[position] for position in numeric], numeric
+
+
+def metric_keys(phase_lists: list) -> list:
+    """Every metric seen in any phase: "overall.<key>" and "<OP>.<key>"."""
+    return phase_layouts(phase_lists)[0]
+
+
+def phases_to_array(phase_lists: list, keys: list | None = None):
+    """Lay out per-run phase lists as a (runs, metrics, iterations) array.
+
+    Missing values (an op type absent in an iteration, a run with fewer
+    iterations) are NaN. Phases sharing a layout are written with one
+    fancy-indexed assignment. Returns (keys, array).
+    """
+    seen_keys, layouts = phase_layouts(phase_lists)
+    keys = keys if keys is not None else seen_keys
+    index = {key: i for i, key in enumerate(keys)}
+    max_iterations = max((len(phases) for phases in phase_lists), default=0)
+    values = np.full((len(phase_lists), len(keys), max_iterations), np.nan)
+
+    for names, positions, runs, iterations, rows in layouts.values():
+        wanted = [(index[n], p) for n, p in zip(names, positions) if n in index]
+        if not wanted:
+            continue
+        columns, wanted_positions = (np.array(v) for v in zip(*wanted))
+        if len(wanted_positions) == len(rows[0]):
+            block = np.array(rows, dtype=float)
+        else:
+            block = np.array(rows, dtype=object)[:, wanted_positions].astype(float)
+        values[np.array(runs)[:, None], columns, np.array(iterations)[:, None]] = block
+    return keys, values
+
+
+def t_statistics(values: np.ndarray, confidence: float = 0.95) -> dict:
+    """Mean, SD (ddof=1) and Student-t CI along the last axis, NaN-aware.
+
+    Same math as utils.aggregate_metric, for any number of series at once.
+    With a single sample the SD and CI half-width are 0.
+    """
+    n = np.sum(~np.isnan(values), axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(values, axis=-1) / n
+        deviations = np.nansum((values - mean[..., None]) ** 2, axis=-1)
+        sd = np.where(n > 1, np.sqrt(deviations / np.maximum(n - 1, 1)), 0.0)
+        t = stats.t.ppf((1 + confidence) / 2, np.maximum(n - 1, 1))
+        half_width = np.where(n > 1, t * sd / np.sqrt(np.maximum(n, 1)), 0.0)
+    mean = np.where(n > 0, mean, np.nan)
+    return {
+        "n": n,
+        "mean": mean,
+        "sd": np.where(n > 0, sd, np.nan),
+        "ci_low": mean - half_width,
+        "ci_high": mean + half_width,
+        "half_width": np.where(n > 0, half_width, np.nan),
+    }
+
+
+def bootstrap_ci(
+    values: np.ndarray,
+    resamples: int = 1000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> dict:
+    """Percentile bootstrap CIs of the mean and median along the last axis.
+
+    Each series is resampled from its own non-NaN values. Series are
+    processed in chunks so memory stays bounded for large corpora.
+    """
+    shape = values.shape[:-1]
+    series = values.reshape(-1, values.shape[-1]) if values.size else np.empty((0, 0))
+    # Move NaNs to the end so each series' samples are a prefix
+    series = np.sort(series, axis=-1)
+    n = np.sum(~np.isnan(series), axis=-1)
+    width = max(int(n.max()) if n.size else 0, 1)
+    series = series[:, :width]
+
+    rng = np.random.default_rng(seed)
+    tail = (1 - confidence) / 2 * 100
+    bounds = {key: np.full((series.shape[0], 2), np.nan) for key in ("mean", "median")}
+    chunk = max(1, BOOTSTRAP_CHUNK_ELEMENTS // (resamples * width))
+
+    for start in range(0, series.shape[0], chunk):
+        block = series[start : start + chunk]
+        block_n = n[start : start + chunk]
+        valid = block_n > 0
+        if not valid.any():
+            continue
+        draws = rng.random((block.shape[0], resamples, width))
+        picks = (draws * np.maximum(block_n, 1)[:, None, None]).astype(np.intp)
+        samples = np.take_along_axis(block[:, None, :], picks, axis=-1)
+        # Each resample has the series' own size; mask positions beyond it
+        beyond = np.arange(width)[None, None, :] >= block_n[:, None, None]
+        samples[np.broadcast_to(beyond, samples.shape)] = np.nan
+        samples, sizes = samples[valid], block_n[valid][:, None]
+        # NaN-aware mean and median without the slow np.nan* reductions:
+        # sorting puts each resample's values first, NaN padding last
+        samples.sort(axis=-1)
+        middle = np.stack([(sizes - 1) // 2, sizes // 2], axis=-1)
+        estimates = {
+            "mean": np.sum(np.nan_to_num(samples), axis=-1) / sizes,
+            "median": np.take_along_axis(
+                samples, np.broadcast_to(middle, (*samples.shape[:2], 2)), axis=-1
+            ).mean(axis=-1),
+        }
+        for key, estimate in estimates.items():
+            bounds[key][start : start + chunk][valid] = np.percentile(
+                estimate, [tail, 100 - tail], axis=-1
+            ).T
+
+    return {key: b.reshape(*shape, 2) for key, b in bounds.items()}
+
+
+def aggregate_phase_lists(phase_lists: list, resamples: int = 0) -> tuple:
+    """Batch statistics for every metric of every run.
+
+    Returns (keys, stats) where each entry of stats is an array of shape
+    (runs, metrics) (bootstrap bounds: (runs, metrics, 2)). With `resamples`,
+    throughput and latency percentiles also get bootstrap CIs (NaN for the
+    other metrics); the bootstrap dominates the runtime, so it's opt-in.
+    """
+    keys, values = phases_to_array(phase_lists)
+    result = t_statistics(values)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN series
+        result["median"] = (
+            np.nanmedian(values, axis=-1) if values.shape[-1] else result["mean"]
+        )
+    if resamples:
+        columns = [m for m, key in enumerate(keys) if BOOTSTRAP_METRIC_RE.match(key)]
+        bootstrap = bootstrap_ci(values[:, columns], resamples=resamples)
+        for name in ("mean", "median"):
+            bounds = np.full((*values.shape[:2], 2), np.nan)
+            bounds[:, columns] = bootstrap[name]
+            result[f"bootstrap_{name}"] = bounds
+    return keys, result
+
+
+def to_dicts(keys: list, result: dict, index: int) -> dict:
+    """Statistics of one run as {metric: {stat: value}} (NaN metrics omitted)."""
+    run_stats = {}
+    for m, key in enumerate(keys):
+        if result["n"][index, m] == 0:
+            continue
+        entry = {
+            "n": int(result["n"][index, m]),
+            "mean": float(result["mean"][index, m]),
+            "sd": float(result["sd"][index, m]),
+            "median": float(result["median"][index, m]),
+            "95ci": (
+                float(result["ci_low"][index, m]),
+                float(result["ci_high"][index, m]),
+            ),
+        }
+        for name in ("bootstrap_mean", "bootstrap_median"):
+            if name in result and not np.isnan(result[name][index, m]).all():
+                entry[f"{name}_95ci"] = tuple(float(v) for v in result[name][index, m])
+        run_stats[key] = entry
+    return run_stats
+
+
+def load_store_phase_lists(db=None, node_count=None, workload=None) -> tuple:
+    """Run-phase iterations of every matching stored run: (run_ids, phase_lists)."""
+    clauses, values = ["p.phase = 'run'"], []
+    if db is not None:
+        clause, db_values = db_condition(db, "r")
+        clauses.append(clause)
+        values += db_values
+    for column, value in (
+        ("r.node_count", node_count),
+        ("r.workload", workload),
+    ):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            values.append(value)
+
+    connection = connect()
+    try:
+        rows = connection.execute(
+            "SELECT p.run_id, p.overall, p.operations FROM phases p"
+            " JOIN runs r ON r.id = p.run_id"
+            f" WHERE {' AND '.join(clauses)} ORDER BY p.run_id, p.seq",
+            values,
+        ).fetchall()
+    finally:
+        connection.close()
+
+    phase_lists = {}
+    for run_id, overall, operations in rows:
+        phase_lists.setdefault(run_id, []).append(
+            {"overall": json.loads(overall), "operations": json.loads(operations)}
+        )
+    return list(phase_lists), list(phase_lists.values())
+
+
+def main():
+    args = sys.argv[1:]
+    options = {"--db": None, "--nodes": None, "--workload": None, "--bootstrap": "0"}
+    while args:
+        if args[0] not in options or len(args) < 2:
+            print(__doc__)
+            return 1
+        options[args[0]] = args[1]
+        args = args[2:]
+
+    start_time = time.time()
+    run_ids, phase_lists = load_store_phase_lists(
+        db=options["--db"],
+        node_count=int(options["--nodes"]) if options["--nodes"] else None,
+        workload=options["--workload"],
+    )
+    loaded_time = time.time()
+    keys, result = aggregate_phase_lists(
+        phase_lists, resamples=int(options["--bootstrap"])
+    )
+    done_time = time.time()
+
+    print(
+        f"✓ Aggregated {len(keys)} metrics over {len(run_ids)} runs "
+        f"(load {loaded_time - start_time:.3f}s, "
+        f"compute {done_time - loaded_time:.3f}s)"
+    )
+    if "overall.throughput_ops_sec" in keys:
+        column = keys.index("overall.throughput_ops_sec")
+        for r, run_id in enumerate(
+            run_ids[-20:], start=len(run_ids) - len(run_ids[-20:])
+        ):
+            print(
+                f"#{run_id:<5} throughput {result['mean'][r, column]:>10.1f} ops/sec"
+                f"  ±{result['half_width'][r, column]:.1f} (95% t-CI)"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+import os
+import subprocess
+import threading
+import time
+
+from config import CONFIG, params
+from docker_handler import node_request_counters
+from resources import compose_service_names
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# Columns kept per container; rates are derived from cumulative counters
+CONTAINER_COLUMNS = (
+    "cpu_pct",
+    "mem_bytes",
+    "io_read_bps",
+    "io_write_bps",
+    "net_rx_bps",
+    "net_tx_bps",
+)
+
+
+def read_first_int(path: str) -> int:
+    with open(path, "r") as f:
+        return int(f.read().split()[0])
+
+
+def container_cgroups(pid: int) -> dict:
+    """Locate a container's cgroup directories from one of its processes.
+
+    cgroup v2 has a single unified directory; v1 has one per controller.
+    Returns {"v2": dir} or {"cpuacct": dir, "memory": dir, "blkio": dir}.
+    """
+    cgroups = {}
+    with open(f"/proc/{pid}/cgroup", "r") as f:
+        for line in f:
+            _, controllers, path = line.rstrip("\n").split(":", 2)
+            if controllers == "":
+                cgroups["v2"] = f"{CGROUP_ROOT}{path}"
+            for controller in controllers.split(","):
+                if controller in ("cpuacct", "memory", "blkio"):
+                    cgroups[controller] = f"{CGROUP_ROOT}/{controller}{path}"
+    if any(key in cgroups for key in ("cpuacct", "memory", "blkio")):
+        cgroups.pop("v2", None)
+    return cgroups
+
+
+def read_cgroup_counters(cgroups: dict) -> tuple:
+    """(cpu usage in seconds, memory bytes, io read bytes, io write bytes)."""
+    read_bytes = write_bytes = 0
+    if "v2" in cgroups:
+        base = cgroups["v2"]
+        with open(f"{base}/cpu.stat", "r") as f:
+            cpu_s = int(f.readline().split()[1]) / 1e6  # usage_usec
+        memory = read_first_int(f"{base}/memory.current")
+        with open(f"{base}/io.stat", "r") as f:
+            for line in f:
+                for field in line.split()[1:]:
+                    key, _, value = field.partition("=")
+                    if key == "rbytes":
+                        read_bytes += int(value)
+                    elif key == "wbytes":
+                        write_bytes += int(value)
+    else:
+        cpu_s = read_first_int(f"{cgroups['cpuacct']}/cpuacct.usage") / 1e9
+        memory = read_first_int(f"{cgroups['memory']}/memory.usage_in_bytes")
+        with open(f"{cgroups['blkio']}/blkio.throttle.io_service_bytes", "r") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) == 3 and fields[1] == "Read":
+                    read_bytes += int(fields[2])
+                elif len(fields) == 3 and fields[1] == "Write":
+                    write_bytes += int(fields[2])
+    return cpu_s, memory, read_bytes, write_bytes
+
+
+def read_net_counters(pid: int) -> tuple:
+    """(rx bytes, tx bytes) over all non-loopback interfaces of pid's netns."""
+    rx_bytes = tx_bytes = 0
+    with open(f"/proc/{pid}/net/dev", "r") as f:
+        for line in f.readlines()[2:]:
+            interface, data = line.split(":", 1)
+            if interface.strip() == "lo":
+                continue
+            fields = data.split()
+            rx_bytes += int(fields[0])
+            tx_bytes += int(fields[8])
+    return rx_bytes, tx_bytes
+
+
+def read_host_cpu() -> tuple:
+    """(busy jiffies, total jiffies) from /proc/stat."""
+    with open("/proc/stat", "r") as f:
+        fields = [int(value) for value in f.readline().split()[1:]]
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+    return sum(fields) - idle, sum(fields)
+
+
+def cluster_container_pids() -> dict:
+    """{container name: main pid} for every service of the generated cluster.
+
+    This is the only docker call; sampling itself only reads /proc and cgroupfs.
+    """
+    with open(f"{params['db']}/docker-compose-run.yml", "r") as f:
+        names = compose_service_names(f.read())
+    if not names:
+        return {}
+    result = subprocess.run(
+        [
+            *CONFIG["DOCKER_COMMAND"],
+            "inspect",
+            "-f",
+            "{{.Name}} {{.State.Pid}}",
+            *names,
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        timeout=10,
+    )
+    pids = {}
+    for line in result.stdout.splitlines():
+        name, pid = line.split()
+        if int(pid) > 0:
+            pids[name.lstrip("/")] = int(pid)
+    return pids
+
+
+class TelemetrySampler:
+    """Samples container and host counters on a background thread.
+
+    Counters are read every `interval` seconds and turned into compact
+    per-container columns (one value per sample, aligned with `elapsed_s`)
+    when the sampler stops. Sampling starts with the client process, but
+    once anchor() is given the first status sample, `elapsed_s` is on the
+    workload's clock like the phase timeline; samples taken during start-up
+    then have negative offsets.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._targets = {}
+        self._elapsed = []
+        self._host = []
+        self._samples = {}
+        self._requests_before = None
+        self._offset = None
+
+    def anchor(self, elapsed_s: float):
+        """Align `elapsed_s` with a status sample `elapsed_s` into the run."""
+        if self._thread is not None and self._offset is None:
+            self._offset = time.monotonic() - self._start_time - elapsed_s
+
+    def mark_requests(self):
+        """Read the per-node request counters; call before the client starts."""
+        try:
+            self._requests_before = node_request_counters()
+        except Exception as e:
+            print(f"\n    WARNING: Could not read per-node request counters: {e}")
+
+    def start(self):
+        try:
+            for name, pid in cluster_container_pids().items():
+                self._targets[name] = (pid, container_cgroups(pid))
+        except Exception as e:
+            print(f"\n    WARNING: Telemetry disabled, could not find containers: {e}")
+            return
+        self._samples = {name: [] for name in self._targets}
+        self._start_time = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self._sample()
+            if self._stop.wait(self.interval):
+                break
+        self._sample()
+
+    def _sample(self):
+        self._elapsed.append(time.monotonic() - self._start_time)
+        self._host.append(read_host_cpu())
+        for name, (pid, cgroups) in self._targets.items():
+            try:
+                sample = read_cgroup_counters(cgroups) + read_net_counters(pid)
+            except (OSError, ValueError, IndexError):
+                sample = None  # container stopped or paused mid-run
+            self._samples[name].append(sample)
+
+    def stop(self) -> dict:
+        """Stop sampling and return the telemetry (empty if never started)."""
+        if self._thread is None:
+            return {}
+        self._stop.set()
+        self._thread.join()
+        telemetry = self._build()
+        if self._requests_before:
+            try:
+                telemetry["requests"] = request_spread(
+                    self._requests_before, node_request_counters()
+                )
+            except Exception as e:
+                print(f"\n    WARNING: Could not read per-node request counters: {e}")
+        return telemetry
+
+    def _build(self) -> dict:
+        elapsed = self._elapsed
+        telemetry = {
+            "interval_s": self.interval,
+            "elapsed_s": [round(t - (self._offset or 0), 3) for t in elapsed[1:]],
+            "host": {"cpu_pct": []},
+            "containers": {},
+        }
+
+        for (busy_a, total_a), (busy_b, total_b) in zip(self._host, self._host[1:]):
+            total = total_b - total_a
+            telemetry["host"]["cpu_pct"].append(
+                round(100 * (busy_b - busy_a) / total, 2) if total else None
+            )
+
+        for name, samples in self._samples.items():
+            columns = {column: [] for column in CONTAINER_COLUMNS}
+            for i in range(1, len(samples)):
+                previous, current = samples[i - 1], samples[i]
+                dt = elapsed[i] - elapsed[i - 1]
+                if previous is None or current is None or dt <= 0:
+                    for values in columns.values():
+                        values.append(None)
+                    continue
+                cpu_s, memory, read_b, write_b, rx_b, tx_b = current
+                columns["cpu_pct"].append(round(100 * (cpu_s - previous[0]) / dt, 2))
+                columns["mem_bytes"].append(memory)
+                columns["io_read_bps"].append(round((read_b - previous[2]) / dt))
+                columns["io_write_bps"].append(round((write_b - previous[3]) / dt))
+                columns["net_rx_bps"].append(round((rx_b - previous[4]) / dt))
+                columns["net_tx_bps"].append(round((tx_b - previous[5]) / dt))
+            columns["summary"] = summarize_container(samples, columns)
+            telemetry["containers"][name] = columns
+
+        host_cpu = [v for v in telemetry["host"]["cpu_pct"] if v is not None]
+        telemetry["host"]["summary"] = {
+            "cpu_pct_mean": sum(host_cpu) / len(host_cpu) if host_cpu else None,
+            "cpu_pct_max": max(host_cpu, default=None),
+        }
+        return telemetry
+
+
+def summarize_container(samples: list, columns: dict) -> dict:
+    """Per-phase summary: CPU mean/max, peak memory and I/O/network totals."""
+    cpu = [v for v in columns["cpu_pct"] if v is not None]
+    memory = [v for v in columns["mem_bytes"] if v is not None]
+    valid = [s for s in samples if s is not None]
+    summary = {
+        "cpu_pct_mean": sum(cpu) / len(cpu) if cpu else None,
+        "cpu_pct_max": max(cpu, default=None),
+        "mem_bytes_max": max(memory, default=None),
+    }
+    if len(valid) >= 2:
+        first, last = valid[0], valid[-1]
+        summary["io_read_bytes"] = last[2] - first[2]
+        summary["io_write_bytes"] = last[3] - first[3]
+        summary["net_rx_bytes"] = last[4] - first[4]
+        summary["net_tx_bytes"] = last[5] - first[5]
+    return summary
+
+
+def request_spread(before: dict, after: dict) -> dict:
+    """How the requests of one phase were spread over the nodes."""
+    per_node = {node: after[node] - before[node] for node in after if node in before}
+    total = sum(per_node.values())
+    spread = {"per_node": per_node, "total": total}
+    if total:
+        spread["share"] = {node: round(n / total, 4) for node, n in per_node.items()}
+        spread["idle_nodes"] = [node for node, n in per_node.items() if n == 0]
+        spread["imbalance"] = round(max(per_node.values()) * len(per_node) / total, 3)
+    return spread
+
+
+def telemetry_enabled() -> bool:
+    return bool(params["telemetry_interval"]) and os.path.exists(
+        f"{params['db']}/docker-compose-run.yml"
+    )
@@ -0,0 +1,135 @@
+import stat
+import time
+
+import pytest
+
+from config import CONFIG
+from fault_injector import (
+    FaultInjector,
+    aggregate_fault_impact,
+    fault_impact,
+    parse_fault_schedule,
+)
+
+# Stand-in for the docker CLI: logs its arguments, fails for "missing" nodes
+STUB_DOCKER = """#!/bin/sh
+echo "$@" >> "{log}"
+if [ "$2" = "missing" ]; then
+    echo "Error response from daemon: No such container: $2" >&2
+    exit 1
+fi
+"""
+
+
+@pytest.fixture
+def docker_log(tmp_path, monkeypatch):
+    log = tmp_path / "docker.log"
+    stub = tmp_path / "docker"
+    stub.write_text(STUB_DOCKER.format(log=log))
+    stub.chmod(stub.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setitem(CONFIG, "DOCKER_COMMAND", [str(stub)])
+    return log
+
+
+def run_injector(schedule: str, elapsed_s: float = 0) -> dict:
+    injector = FaultInjector(parse_fault_schedule(schedule))
+    injector.start()
+    injector.anchor(elapsed_s)
+    deadline = time.monotonic() + 10
+    while len(injector.applied) < len(injector.events):
+        assert time.monotonic() < deadline, "faults were not applied"
+        time.sleep(0.01)
+    return injector.stop()
+
+
+def test_fault_is_applied_and_healed(docker_log):
+    record = run_injector("pause:mongo2@0.1", elapsed_s=1)
+
+    [event] = record["events"]
+    assert event["action"] == "pause"
+    assert event["returncode"] == 0
+    assert "error" not in event
+    # Due before the anchoring sample, so it fires right away
+    assert event["at_s"] >= 1
+    assert [r["action"] for r in record["healed"]] == ["unpause"]
+    assert docker_log.read_text().splitlines() == ["pause mongo2", "unpause mongo2"]
+
+
+def test_failed_fault_is_recorded_and_not_healed(docker_log):
+    record = run_injector("kill:missing@0")
+
+    [event] = record["events"]
+    assert event["returncode"] == 1
+    assert "No such container" in event["error"]
+    assert record["healed"] == []
+    assert docker_log.read_text().splitlines() == ["kill missing"]
+
+
+def test_unanchored_injector_applies_nothing(docker_log):
+    injector = FaultInjector(parse_fault_schedule("stop:mongo2@0"))
+    injector.start()
+
+    assert injector.stop() == {"events": [], "healed": []}
+    assert not docker_log.exists()
+
+
+def test_parse_fault_schedule_sorts_by_offset():
+    events = parse_fault_schedule("unpause:mongo2@60, pause:mongo2@30")
+
+    assert [(e["action"], e["offset_s"]) for e in events] == [
+        ("pause", 30.0),
+        ("unpause", 60.0),
+    ]
+    with pytest.raises(ValueError):
+        parse_fault_schedule("freeze:mongo2@30")
+
+
+def fault_timeline(ops_per_sec: list, p99: list, failed_ops: list) -> dict:
+    return {
+        "elapsed_s": list(range(1, len(ops_per_sec) + 1)),
+        "ops_per_sec": ops_per_sec,
+        "failed_ops": failed_ops,
+        "latency_us": {
+            "READ": {"p99": p99},
+            # Failed operations don't count towards the p99 recovery
+            "READ-FAILED": {"p99": [None] * 4 + [10**6] * (len(p99) - 4)},
+        },
+    }
+
+
+def test_fault_impact():
+    timeline = fault_timeline(
+        ops_per_sec=[1000, 1000, 1000, 1000, 100, 500, 950, 1000, 1000, 1000],
+        p99=[100, 100, 100, 100, 1000, 400, 130, 100, 100, 100],
+        failed_ops=[0, 0, 0, 0, 5, 3, 0, 0, 0, 0],
+    )
+    events = [{"action": "pause", "node": "mongo2", "offset_s": 4, "at_s": 4.5}]
+
+    impact = fault_impact(timeline, events, {"READ"})
+
+    assert impact["fault_s"] == 4.5
+    assert impact["failed_ops"] == 8
+    assert impact["baseline_ops_sec"] == 1000
+    assert impact["min_ops_sec"] == 100
+    assert impact["dip_depth"] == pytest.approx(0.9)
+    assert impact["time_to_recover_s"] == pytest.approx(2.5)
+    assert impact["baseline_p99_us"] == 100
+    assert impact["peak_p99_us"] == 1000
+    assert impact["p99_recovery_s"] == pytest.approx(3.5)
+
+
+def test_fault_impact_without_recovery():
+    timeline = fault_timeline(
+        ops_per_sec=[1000, 1000, 1000, 1000, 100, 200, 300],
+        p99=[100, 100, 100, 100, 1000, 900, 800],
+        failed_ops=[0] * 7,
+    )
+    events = [{"action": "stop", "node": "mongo2", "offset_s": 4}]
+
+    impact = fault_impact(timeline, events, {"READ"})
+
+    assert impact["time_to_recover_s"] is None
+    assert impact["p99_recovery_s"] is None
+    aggregated = aggregate_fault_impact([{"faults": {"impact": impact}}])
+    assert aggregated["not_recovered"] == 1
+    assert aggregated["dip_depth"]["mean"] == pytest.approx(0.9)
@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from native_driver import (
+    SCRAMBLED_ITEM_COUNT,
+    SCRAMBLED_ZETAN,
+    ZIPFIAN_CONSTANT,
+    CoreWorkload,
+    ZipfianGenerator,
+    build_key_name,
+    fnvhash64,
+    zeta,
+)
+
+MASK_64 = (1 << 64) - 1
+
+
+def java_fnvhash64(value: int) -> int:
+    """YCSB's Utils.fnvhash64, transcribed with Java's signed 64-bit longs."""
+
+    def signed(x):
+        x &= MASK_64
+        return x - (1 << 64) if x >= 1 << 63 else x
+
+    hashval = signed(0xCBF29CE484222325)
+    for _ in range(8):
+        octet = value & 0x00FF
+        value >>= 8
+        hashval = signed(hashval ^ octet)
+        hashval = signed(hashval * 1099511628211)
+    return abs(hashval)
+
+
+def test_fnvhash64_matches_ycsb():
+    for value in [*range(1000), 2**31 - 1, 2**40 + 7, 10**12]:
+        assert fnvhash64(value) == java_fnvhash64(value)
+
+
+def test_hashed_key_names_match_ycsb():
+    # The first keys a YCSB load phase inserts with insertorder=hashed
+    assert [build_key_name(keynum, 1, False) for keynum in range(3)] == [
+        "user6284781860667377211",
+        "user8517097267634966620",
+        "user1820151046732198393",
+    ]
+
+
+def test_ordered_key_names_are_zero_padded():
+    assert build_key_name(7, 5, True) == "user00007"
+    assert build_key_name(123456, 5, True) == "user123456"
+
+
+def test_zeta():
+    expected = sum(1 / i**ZIPFIAN_CONSTANT for i in range(1, 1001))
+
+    assert zeta(0, 1000, ZIPFIAN_CONSTANT) == pytest.approx(expected)
+    # Extending a partial sum gives the same total
+    partial = zeta(0, 400, ZIPFIAN_CONSTANT)
+    assert zeta(400, 1000, ZIPFIAN_CONSTANT, partial) == pytest.approx(expected)
+
+
+def test_scrambled_zetan_is_ycsbs_constant():
+    # YCSB's ScrambledZipfianGenerator.ZETAN, over its fixed 10^10 item space
+    assert SCRAMBLED_ITEM_COUNT == 10_000_000_000
+    assert SCRAMBLED_ZETAN == 26.46902820178302
+
+
+class FixedRandom:
+    """Stand-in rng returning preset uniform draws."""
+
+    def __init__(self, draws):
+        self.draws = iter(draws)
+
+    def random(self):
+        return next(self.draws)
+
+
+def test_zipfian_generator_follows_ycsbs_formula():
+    items = 1000
+    zetan = zeta(0, items, ZIPFIAN_CONSTANT)
+    zeta2 = zeta(0, 2, ZIPFIAN_CONSTANT)
+    alpha = 1 / (1 - ZIPFIAN_CONSTANT)
+    eta = (1 - (2 / items) ** (1 - ZIPFIAN_CONSTANT)) / (1 - zeta2 / zetan)
+    draws = [0.0, 1.5 / zetan, 0.5, 0.9, 0.999]
+    generator = ZipfianGenerator(10, 10 + items - 1, FixedRandom(draws))
+
+    values = [generator.next() for _ in draws]
+
+    assert values[:2] == [10, 11]
+    for i in range(2, len(draws)):
+        u = draws[i]
+        assert values[i] == 10 + int(items * (eta * u - eta + 1) ** alpha)
+    assert all(10 <= value < 10 + items for value in values)
+
+
+def test_core_workload_requests_stay_in_the_loaded_range():
+    properties = {
+        "recordcount": "1000",
+        "operationcount": "1000",
+        "insertstart": "200",
+        "insertcount": "300",
+        "readproportion": "0.5",
+        "updateproportion": "0.3",
+        "scanproportion": "0.2",
+        "requestdistribution": "zipfian",
+    }
+    workload = CoreWorkload(properties, random.Random(1))
+
+    requests = [workload.next_request() for _ in range(2000)]
+
+    assert {op for op, *_ in requests} == {"READ", "UPDATE", "SCAN"}
+    # Zipfian keys span [insertstart, insertstart + insertcount], as in YCSB
+    assert all(200 <= keynum <= 500 for _, keynum, *_ in requests)
+    assert all(1 <= length <= 1000 for op, _, length, *_ in requests if op == "SCAN")
+    reads = sum(op == "READ" for op, *_ in requests) / len(requests)
+    assert reads == pytest.approx(0.5, abs=0.05)
@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from compare import hedges_g
+from stats_engine import t_statistics
+
+
+def test_t_statistics_matches_scipy():
+    values = np.array([10.0, 12.0, 11.0, 15.0, 9.0])
+
+    result = t_statistics(values)
+
+    low, high = stats.t.interval(
+        0.95, len(values) - 1, loc=values.mean(), scale=stats.sem(values)
+    )
+    assert result["n"] == 5
+    assert result["mean"] == pytest.approx(values.mean())
+    assert result["sd"] == pytest.approx(values.std(ddof=1))
+    assert result["ci_low"] == pytest.approx(low)
+    assert result["ci_high"] == pytest.approx(high)
+
+
+def test_t_statistics_per_series_and_nan_aware():
+    values = np.array(
+        [
+            [1.0, 2.0, 3.0, np.nan],
+            [5.0, np.nan, np.nan, np.nan],
+            [np.nan, np.nan, np.nan, np.nan],
+        ]
+    )
+
+    result = t_statistics(values)
+
+    assert result["n"].tolist() == [3, 1, 0]
+    assert result["mean"][0] == pytest.approx(2.0)
+    assert result["half_width"][0] == pytest.approx(
+        stats.t.ppf(0.975, 2) / math.sqrt(3)
+    )
+    # A single sample has no spread
+    assert result["mean"][1] == 5.0
+    assert result["sd"][1] == 0.0
+    assert result["ci_low"][1] == result["ci_high"][1] == 5.0
+    assert np.isnan(result["mean"][2])
+    assert np.isnan(result["sd"][2])
+
+
+def test_hedges_g():
+    a = np.array([1.0, 2.0, 3.0])
+    b = np.array([4.0, 5.0, 6.0])
+
+    # d = 3 with pooled SD 1, times the small-sample correction 1 - 3 / 15
+    assert hedges_g(a, b) == pytest.approx(2.4)
+    assert hedges_g(b, a) == pytest.approx(-2.4)
+
+
+def test_hedges_g_edge_cases():
+    assert math.isnan(hedges_g(np.array([1.0]), np.array([1.0, 2.0])))
+    assert hedges_g(np.array([2.0, 2.0]), np.array([2.0, 2.0])) == 0.0
+    assert hedges_g(np.array([2.0, 2.0]), np.array([3.0, 3.0])) == math.inf
+    assert hedges_g(np.array([3.0, 3.0]), np.array([2.0, 2.0])) == -math.inf
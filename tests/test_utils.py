@@ -0,0 +1,49 @@
+import pytest
+
+from utils import parse_rate_schedule, split_range
+
+
+@pytest.mark.parametrize(
+    ("start", "total", "parts", "expected"),
+    [
+        (0, 10, 3, [(0, 4), (4, 3), (7, 3)]),
+        (100, 6, 2, [(100, 3), (103, 3)]),
+        # Empty slices are dropped
+        (0, 2, 4, [(0, 1), (1, 1)]),
+        (5, 0, 3, []),
+    ],
+)
+def test_split_range(start, total, parts, expected):
+    assert split_range(start, total, parts) == expected
+
+
+def test_split_range_covers_the_range():
+    slices = split_range(1000, 12345, 7)
+
+    assert sum(count for _, count in slices) == 12345
+    assert all(
+        slices[i][0] + slices[i][1] == slices[i + 1][0] for i in range(len(slices) - 1)
+    )
+    assert max(n for _, n in slices) - min(n for _, n in slices) <= 1
+
+
+def test_parse_rate_schedule():
+    assert parse_rate_schedule("5000, 1000:3000:1000") == [
+        {"rate": 5000.0},
+        {"rate": 1000.0},
+        {"rate": 2000.0},
+        {"rate": 3000.0},
+    ]
+
+
+def test_parse_rate_schedule_percentages():
+    steps = parse_rate_schedule("25%,10%:40%:10%")
+
+    assert steps[0] == {"percent": 25.0}
+    assert [step["percent"] for step in steps[1:]] == pytest.approx([10, 20, 30, 40])
+
+
+@pytest.mark.parametrize("value", ["", "1000:500:100", "100:200:0", "1:2", "x"])
+def test_parse_rate_schedule_rejects(value):
+    with pytest.raises(ValueError):
+        parse_rate_schedule(value)
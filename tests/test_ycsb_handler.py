@@ -0,0 +1,117 @@
+import pytest
+
+from ycsb_handler import merge_timelines, parse_ycsb_output
+
+STATUS_LINES = [
+    (
+        "2024-05-01 10:00:01:000 1 sec: 1200 operations; 1200 current ops/sec; "
+        "[READ: Count=600, Max=900, Min=80, Avg=150.5, 90=200, 99=400] "
+        "[UPDATE: Count=600, Max=1200, Min=90, Avg=210, 90=300, 99=600]"
+    ),
+    (
+        "2024-05-01 10:00:02:000 2 sec: 2400 operations; 1200 current ops/sec; "
+        "[READ: Count=590, Max=700, Min=75, Avg=140, 90=190, 99=380] "
+        "[READ-FAILED: Count=10, Max=5000, Min=4000, Avg=4500, 90=5000, 99=5000] "
+        "[UPDATE: Count=600, Max=1100, Min=85, Avg=205, 90=290, 99=580]"
+    ),
+]
+
+SUMMARY = """\
+[OVERALL], RunTime(ms), 2000
+[OVERALL], Throughput(ops/sec), 1200.0
+[TOTAL_GCS_PS_Scavenge], Count, 3
+[READ], Operations, 1190
+[READ], AverageLatency(us), 145.2
+[READ], MinLatency(us), 75
+[READ], MaxLatency(us), 900
+[READ], 95thPercentileLatency(us), 250
+[READ], 99thPercentileLatency(us), 390
+[READ], 99.9thPercentileLatency(us), 750
+[READ], Return=OK, 1190
+[READ-FAILED], Operations, 10
+[READ-FAILED], 99thPercentileLatency(us), 5000
+[READ-FAILED], Return=ERROR, 7
+[READ-FAILED], Return=NOT_FOUND, 3
+[UPDATE], Operations, 1200
+[UPDATE], AverageLatency(us), 207.5
+[UPDATE], 99thPercentileLatency(us), 590
+[UPDATE], Return=OK, 1200
+[CLEANUP], Operations, 1
+"""
+
+YCSB_RUN_OUTPUT = "\n".join(
+    [
+        "Command line: -db site.ycsb.db.RedisClient -s -P workloads/workloada -t",
+        "YCSB Client 0.17.0",
+        "Loading workload...",
+        "Starting test.",
+        *STATUS_LINES,
+        SUMMARY,
+    ]
+)
+
+
+def test_parse_ycsb_output_summary():
+    phase = parse_ycsb_output(YCSB_RUN_OUTPUT, "run", 2)
+
+    assert phase["phase"] == "run"
+    assert phase["iteration"] == 2
+    assert phase["overall"] == {"runtime_ms": 2000.0, "throughput_ops_sec": 1200.0}
+    assert set(phase["operations"]) == {"READ", "READ-FAILED", "UPDATE", "CLEANUP"}
+    read = phase["operations"]["READ"]
+    assert read["count"] == 1190
+    assert read["avg_latency_us"] == 145.2
+    assert read["p99_latency_us"] == 390.0
+    assert read["p99_9_latency_us"] == 750.0
+    assert read["return_ok"] == 1190
+    assert phase["operations"]["READ-FAILED"]["return_failed"] == 10
+
+
+def test_parse_ycsb_output_timeline():
+    timeline = parse_ycsb_output(YCSB_RUN_OUTPUT, "run", 0)["timeline"]
+
+    assert timeline["elapsed_s"] == [1, 2]
+    assert timeline["ops"] == [1200, 2400]
+    assert timeline["ops_per_sec"] == [1200.0, 1200.0]
+    assert timeline["failed_ops"] == [0, 10]
+    assert timeline["latency_us"]["READ"] == {
+        "avg": [150.5, 140.0],
+        "max": [900.0, 700.0],
+        "p99": [400.0, 380.0],
+    }
+    # First seen in the second sample: back-filled to stay aligned
+    assert timeline["latency_us"]["READ-FAILED"]["p99"] == [None, 5000.0]
+
+
+def client_timeline(ops_per_sec: list, p99: list, avg: list) -> dict:
+    ops = []
+    for rate in ops_per_sec:
+        ops.append((ops[-1] if ops else 0) + int(rate))
+    return {
+        "elapsed_s": list(range(1, len(ops_per_sec) + 1)),
+        "ops": ops,
+        "ops_per_sec": ops_per_sec,
+        "failed_ops": [0] * len(ops_per_sec),
+        "latency_us": {"READ": {"avg": avg, "max": p99, "p99": p99}},
+    }
+
+
+def test_merge_timelines():
+    merged = merge_timelines(
+        [
+            client_timeline([100.0, 100.0, 100.0], [10.0, 20.0, 30.0], [1.0, 2.0, 3.0]),
+            client_timeline([50.0, 50.0], [40.0, None], [3.0, None]),
+        ]
+    )
+
+    assert merged["elapsed_s"] == [1, 2, 3]
+    # The finished client keeps contributing its final op count
+    assert merged["ops"] == [150, 300, 400]
+    assert merged["ops_per_sec"] == [150.0, 150.0, 100.0]
+    assert merged["failed_ops"] == [0, 0, 0]
+    assert merged["latency_us"]["READ"]["p99"] == [40.0, 20.0, 30.0]
+    assert merged["latency_us"]["READ"]["avg"] == pytest.approx([2.0, 2.0, 3.0])
+
+
+def test_merge_timelines_empty():
+    assert merge_timelines([])["elapsed_s"] == []
@@ -0,0 +1,395 @@
+"""
+Precompute the run-phase request stream of a workload into a trace file.
+
+    python3 trace_generator.py WORKLOAD_FILE OUTPUT.npy [--seed N]
+        [--operations N]
+
+Draws every request YCSB's CoreWorkload would make (operation, key number,
+scan length and the read/written field) with vectorized NumPy and writes
+them as one record each to an .npy file, chunk by chunk, so memory use stays
+flat whatever the operation count. The same workload properties and seed
+always give the same trace. native_driver.py replays it memory-mapped with
+-p trace.file=OUTPUT.npy, so every iteration and every database gets exactly
+the same requests. The generating properties are kept next to the trace in
+OUTPUT.json.
+
+--operations defaults to the workload's operationcount.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from config import CONFIG
+from native_driver import (
+    ALL_FIELDS,
+    OPERATIONS,
+    SCRAMBLED_ITEM_COUNT,
+    SCRAMBLED_ZETAN,
+    ZIPFIAN_CONSTANT,
+    operation_proportions,
+    zeta,
+)
+from utils import read_workload_properties
+
+# Requests drawn and written per chunk (bounds the generator's memory)
+TRACE_CHUNK_OPS = 1 << 18
+
+FNV_OFFSET_BASIS_64 = np.uint64(0xCBF29CE484222325)
+FNV_PRIME_64 = np.uint64(1099511628211)
+
+
+def fnvhash64(values: np.ndarray) -> np.ndarray:
+    """native_driver.fnvhash64 over an array of key numbers."""
+    values = values.astype(np.uint64)
+    hashval = np.full(len(values), FNV_OFFSET_BASIS_64, dtype=np.uint64)
+    low_byte = np.empty_like(values)
+    for _ in range(8):
+        np.bitwise_and(values, np.uint64(0xFF), out=low_byte)
+        hashval ^= low_byte
+        values >>= np.uint64(8)
+        hashval *= FNV_PRIME_64  # wraps around like Java's long
+    return np.abs(hashval.view(np.int64)).view(np.uint64)
+
+
+def zipfian_offsets(u, items, zetan, eta, theta=ZIPFIAN_CONSTANT) -> np.ndarray:
+    """ZipfianGenerator.next_long offsets for uniform draws `u`.
+
+    `items`, `zetan` and `eta` may be arrays, for a key space that grows as
+    the trace inserts.
+    """
+    uz = u * zetan
+    offsets = (items * (eta * u - eta + 1) ** (1.0 / (1.0 - theta))).astype(np.int64)
+    offsets[uz < 1.0 + 0.5**theta] = 1
+    offsets[uz < 1.0] = 0
+    return offsets
+
+
+def zipfian_eta(items, zetan, theta=ZIPFIAN_CONSTANT):
+    return (1 - (2.0 / items) ** (1 - theta)) / (1 - zeta(0, 2, theta) / zetan)
+
+
+class TraceWorkload:
+    """The request-drawing half of native_driver.CoreWorkload, vectorized.
+
+    A trace is drawn chunk by chunk, with plan() then fill(). Inserts take
+    consecutive key numbers from recordcount on, and a request only picks
+    keys inserted before it, as if every earlier insert had been
+    acknowledged.
+    """
+
+    def __init__(self, properties: dict, operations: int, seed: int):
+        get = properties.get
+        self.seed = seed
+        self.fieldcount = int(get("fieldcount", 10))
+        self.readallfields = get("readallfields", "true") == "true"
+        self.writeallfields = get("writeallfields", "false") == "true"
+
+        self.recordcount = int(get("recordcount", 0))
+        self.insertstart = int(get("insertstart", 0))
+        insertcount = int(get("insertcount", self.recordcount - self.insertstart))
+        self.last_key = self.insertstart + insertcount - 1
+        self.inserted = 0
+
+        proportions = operation_proportions(properties)
+        self.cumulative = np.cumsum([proportions[op] for op in OPERATIONS])
+        self.distribution = get("requestdistribution", "uniform")
+        if self.distribution == "zipfian":
+            expected_new_keys = int(
+                int(get("operationcount", 0)) * proportions["INSERT"] * 2.0
+            )
+            self.itemcount = self.last_key + 2 + expected_new_keys - self.insertstart
+            self.scrambled_eta = zipfian_eta(SCRAMBLED_ITEM_COUNT + 1, SCRAMBLED_ZETAN)
+        elif self.distribution == "latest":
+            # Zipfian over the inserted keys; its zeta grows with them
+            self.latest_items = max(1, self.recordcount - 1)
+            self.zeta_count = self.latest_items
+            self.zeta_sum = zeta(0, self.zeta_count, ZIPFIAN_CONSTANT)
+        elif self.distribution == "hotspot":
+            keys = self.last_key - self.insertstart + 1
+            self.hot_interval = int(keys * float(get("hotspotdatafraction", 0.2)))
+            self.cold_interval = keys - self.hot_interval
+            self.hot_operations = float(get("hotspotopnfraction", 0.8))
+        elif self.distribution != "uniform":
+            raise ValueError(f"Unsupported requestdistribution: {self.distribution}")
+
+        self.scan_distribution = get("scanlengthdistribution", "uniform")
+        self.minscanlength = int(get("minscanlength", 1))
+        self.maxscanlength = int(get("maxscanlength", 1000))
+        if self.scan_distribution == "zipfian":
+            self.scan_items = self.maxscanlength - self.minscanlength + 1
+            self.scan_zetan = zeta(0, self.scan_items, ZIPFIAN_CONSTANT)
+            self.scan_eta = zipfian_eta(self.scan_items, self.scan_zetan)
+        elif self.scan_distribution not in ("uniform", "constant"):
+            raise ValueError(
+                f"Unsupported scanlengthdistribution: {self.scan_distribution}"
+            )
+
+        max_keynum = max(self.last_key, self.recordcount + operations)
+        if self.distribution == "zipfian":
+            max_keynum = max(max_keynum, self.insertstart + self.itemcount)
+        self.dtype = np.dtype(
+            [
+                ("op", np.uint8),
+                ("keynum", np.promote_types(np.min_scalar_type(max_keynum), np.uint32)),
+                ("scanlength", np.min_scalar_type(self.maxscanlength)),
+                ("read_field", np.min_scalar_type(-self.fieldcount)),
+                ("write_field", np.min_scalar_type(-self.fieldcount)),
+            ]
+        )
+
+    def _latest_zetan(self, itemcounts: np.ndarray) -> np.ndarray:
+        """zeta(n) for every item count, extending the running sum to the max."""
+        first, last = self.zeta_count, int(itemcounts.max())
+        sums = np.empty(last - first + 1)
+        sums[0] = self.zeta_sum
+        sums[1:] = self.zeta_sum + np.cumsum(
+            np.arange(first + 1, last + 1, dtype=np.float64) ** -ZIPFIAN_CONSTANT
+        )
+        self.zeta_count, self.zeta_sum = last, float(sums[-1])
+        return sums[itemcounts - first]
+
+    def _keys(self, rng, limits: np.ndarray, zetan=None) -> np.ndarray:
+        """Key numbers drawn by the request distribution, none above `limits`."""
+        if self.distribution == "latest":
+            eta = zipfian_eta(self.latest_items, zetan)
+            return limits - zipfian_offsets(rng.random(len(limits)), limits, zetan, eta)
+
+        keys = self._draw_keys(rng, len(limits))
+        # Keys not inserted yet are drawn again, like next_keynum()
+        pending = np.flatnonzero(keys > limits)
+        while len(pending):
+            keys[pending] = self._draw_keys(rng, len(pending))
+            pending = pending[keys[pending] > limits[pending]]
+        return keys
+
+    def _draw_keys(self, rng, count: int) -> np.ndarray:
+        if self.distribution == "uniform":
+            return rng.integers(self.insertstart, self.last_key + 1, count)
+        if self.distribution == "zipfian":
+            offsets = zipfian_offsets(
+                rng.random(count),
+                SCRAMBLED_ITEM_COUNT + 1,
+                SCRAMBLED_ZETAN,
+                self.scrambled_eta,
+            )
+            hashed = fnvhash64(offsets) % np.uint64(self.itemcount)
+            return self.insertstart + hashed.astype(np.int64)
+        hot = rng.random(count) < self.hot_operations
+        return np.where(
+            hot,
+            self.insertstart + rng.integers(0, max(1, self.hot_interval), count),
+            self.insertstart
+            + self.hot_interval
+            + rng.integers(0, max(1, self.cold_interval), count),
+        )
+
+    def _scanlengths(self, rng, count: int) -> np.ndarray:
+        if self.scan_distribution == "constant":
+            return np.full(count, self.maxscanlength)
+        if self.scan_distribution == "uniform":
+            return rng.integers(self.minscanlength, self.maxscanlength + 1, count)
+        return self.minscanlength + zipfian_offsets(
+            rng.random(count), self.scan_items, self.scan_zetan, self.scan_eta
+        )
+
+    def _fields(self, rng, all_fields: bool, count: int) -> np.ndarray:
+        if all_fields:
+            return np.full(count, ALL_FIELDS)
+        return rng.integers(0, self.fieldcount, count)
+
+    def plan(self, chunk: int, count: int) -> tuple:
+        """The sequential part of a chunk: its operations and insert counts.
+
+        Every chunk draws from its own generator, seeded with (seed, chunk),
+        so fill() can run for several chunks at once and the trace still
+        doesn't depend on how many ran in parallel.
+        """
+        rng = np.random.default_rng([self.seed, chunk])
+        ops = np.searchsorted(self.cumulative, rng.random(count), side="right")
+        ops = np.minimum(ops, len(OPERATIONS) - 1)
+        inserts = ops == OPERATIONS.index("INSERT")
+        # Inserts done before each request, and the highest key they reached
+        inserted_before = self.inserted + np.cumsum(inserts) - inserts
+        self.inserted += int(inserts.sum())
+        zetan = None
+        if self.distribution == "latest":
+            limits = self.recordcount - 1 + inserted_before
+            zetan = self._latest_zetan(np.maximum(limits, self.latest_items))
+        return rng, ops, inserts, inserted_before, zetan
+
+    def fill(self, plan: tuple) -> np.ndarray:
+        """The chunk's records: keys, scan lengths and fields of its operations."""
+        rng, ops, inserts, inserted_before, zetan = plan
+        count = len(ops)
+        keys = self._keys(rng, self.recordcount - 1 + inserted_before, zetan)
+        keys[inserts] = self.recordcount + inserted_before[inserts]
+        scans = ops == OPERATIONS.index("SCAN")
+
+        records = np.empty(count, dtype=self.dtype)
+        records["op"] = ops
+        records["keynum"] = keys
+        records["scanlength"] = 0
+        records["scanlength"][scans] = self._scanlengths(rng, int(scans.sum()))
+        records["read_field"] = self._fields(rng, self.readallfields, count)
+        records["write_field"] = self._fields(rng, self.writeallfields, count)
+        return records
+
+
+def generate_trace(properties: dict, path: str, operations: int, seed: int) -> dict:
+    """Write `operations` requests to the .npy file at `path`; returns its metadata.
+
+    Chunks are filled on a thread pool (NumPy releases the GIL) and written
+    in order; only a few chunks are in memory at any time.
+    """
+    start = time.time()
+    workload = TraceWorkload(properties, operations, seed)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.tmp"
+    workers = os.cpu_count() or 1
+    with open(temp_path, "wb") as f, ThreadPoolExecutor(workers) as executor:
+        np.lib.format.write_array_header_2_0(
+            f,
+            {
+                "descr": np.lib.format.dtype_to_descr(workload.dtype),
+                "fortran_order": False,
+                "shape": (operations,),
+            },
+        )
+        pending = deque()
+        for chunk, first in enumerate(range(0, operations, TRACE_CHUNK_OPS)):
+            plan = workload.plan(chunk, min(TRACE_CHUNK_OPS, operations - first))
+            pending.append(executor.submit(workload.fill, plan))
+            if len(pending) > workers:
+                f.write(pending.popleft().result().tobytes())
+        while pending:
+            f.write(pending.popleft().result().tobytes())
+    os.replace(temp_path, path)
+
+    metadata = {
+        "operations": operations,
+        "seed": seed,
+        "record_bytes": workload.dtype.itemsize,
+        "generation_s": time.time() - start,
+        "properties": properties,
+    }
+    with open(trace_metadata_path(path), "w") as f:
+        json.dump(metadata, f, indent=2)
+    return metadata
+
+
+def trace_metadata_path(path: str) -> str:
+    return f"{os.path.splitext(path)[0]}.json"
+
+
+def trace_length(path: str) -> int:
+    return len(np.load(path, mmap_mode="r"))
+
+
+def workload_trace(workload_path: str) -> str:
+    """Path of the trace of a workload file, generated on first use.
+
+    Traces are cached in TRACES_PATH, keyed on the workload properties and
+    TRACE_SEED.
+    """
+    properties = read_workload_properties(workload_path)
+    digest = hashlib.sha1(
+        json.dumps([properties, CONFIG["TRACE_SEED"]], sort_keys=True).encode()
+    ).hexdigest()[:12]
+    name = os.path.splitext(os.path.basename(workload_path))[0]
+    path = f"{CONFIG['TRACES_PATH']}/{name}-{digest}.npy"
+    if os.path.exists(path):
+        print(f"✓ Reusing trace {path}")
+        return path
+
+    operations = int(properties.get("operationcount", 0))
+    if operations <= 0:
+        raise ValueError("Traces need a workload with operationcount > 0")
+    print(f"Generating trace of {operations} operations...")
+    metadata = generate_trace(properties, path, operations, CONFIG["TRACE_SEED"])
+    print(
+        f"✓ Trace saved to {path} "
+        f"({operations * metadata['record_bytes'] / 1e6:.1f} MB, "
+        f"{metadata['generation_s']:.1f}s)"
+    )
+    return path
+
+
+def validate_trace(path: str, workload_path: str) -> str:
+    """Validate and return a trace file to replay with a workload file."""
+    if not os.path.isfile(path):
+        raise ValueError(f"Trace file {path} not found")
+    properties = read_workload_properties(workload_path)
+    operations = int(properties.get("operationcount", 0))
+    if trace_length(path) < operations:
+        raise ValueError(
+            f"Trace {path} has fewer than the workload's {operations} operations"
+        )
+    with open(trace_metadata_path(path), "r") as f:
+        generated_from = json.load(f)["properties"]
+    for key in ("recordcount", "insertstart"):
+        if generated_from.get(key) != properties.get(key):
+            print(
+                f"Warning: Trace {path} was generated for {key}="
+                f"{generated_from.get(key)}, the workload has {properties.get(key)}"
+            )
+    return path
+
+
+def trace_summary(path: str) -> dict:
+    """Trace entry of the results: where it is and how it was generated."""
+    with open(trace_metadata_path(path), "r") as f:
+        metadata = json.load(f)
+    return {
+        "path": path,
+        "operations": metadata["operations"],
+        "seed": metadata["seed"],
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    options = {"--seed": str(CONFIG["TRACE_SEED"]), "--operations": None}
+    paths = []
+    while args:
+        if args[0] in options and len(args) >= 2:
+            options[args[0]] = args[1]
+            args = args[2:]
+        elif not args[0].startswith("--"):
+            paths.append(args.pop(0))
+        else:
+            print(__doc__)
+            return 2
+    if len(paths) != 2:
+        print(__doc__)
+        return 2
+
+    workload_path, output_path = paths
+    try:
+        properties = read_workload_properties(workload_path)
+        operations = int(options["--operations"] or properties.get("operationcount", 0))
+        if operations <= 0:
+            raise ValueError("Please set --operations or operationcount > 0")
+        metadata = generate_trace(
+            properties, output_path, operations, int(options["--seed"])
+        )
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}")
+        return 2
+
+    print(
+        f"✓ {operations} operations written to {output_path} "
+        f"({operations * metadata['record_bytes'] / 1e6:.1f} MB) "
+        f"in {metadata['generation_s']:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
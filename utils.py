@@ -1,7 +1,6 @@
-import math
 import os
 
-from scipy import stats
+import numpy as np
 
 from config import CONFIG
 
@@ -22,6 +21,104 @@ def validate_node_count(count):
     return count
 
 
+def validate_topology(db, topology, node_count, replicas):
+    """Validate and return the cluster topology (None means the default)."""
+    topologies = CONFIG["TOPOLOGIES"][db]
+    if topology is not None and topology not in topologies:
+        raise ValueError(
+            f"Invalid topology for {db}. Please use {' or '.join(topologies)}"
+        )
+    if replicas < 0:
+        raise ValueError("Invalid replica count. Please use 0 or a positive integer")
+    if replicas and topology in (None, topologies[0]):
+        raise ValueError(f"--replicas only applies to sharded {db} topologies")
+    if topology == "cluster" and node_count < 3:
+        raise ValueError(f"{db} cluster needs at least 3 masters (node_count >= 3)")
+    return topology
+
+
+def validate_shard_key(shard_key):
+    """Validate and return the MongoDB shard key type."""
+    if shard_key not in ("hashed", "ranged"):
+        raise ValueError("Invalid shard key. Please use hashed or ranged")
+    return shard_key
+
+
+def topology_name(params):
+    return params["topology"] or CONFIG["TOPOLOGIES"][params["db"]][0]
+
+
+def topology_summary(params):
+    return {"name": topology_name(params), "replicas": params["replicas"]}
+
+
+def database_label(params, variant=None):
+    """Database name used in results: "<db>", plus "-<topology>" if not the
+    default, "-<variant>" for database settings that differ from the defaults,
+    "-native" when driven by the native driver and "-<network profile>" if
+    one is applied.
+    """
+    label = params["db"]
+    topology = topology_name(params)
+    if topology != CONFIG["TOPOLOGIES"][params["db"]][0]:
+        label += f"-{topology}"
+    if variant:
+        label += f"-{variant}"
+    if params.get("driver") == "native":
+        label += "-native"
+    if params.get("network_profile"):
+        label += f"-{params['network_profile']}"
+    return label
+
+
+def validate_network_profile(name):
+    """Validate and return a network profile name."""
+    if name not in CONFIG["NETWORK_PROFILES"]:
+        raise ValueError(
+            "Invalid network profile. Please use one of "
+            f"{', '.join(CONFIG['NETWORK_PROFILES'])}"
+        )
+    return name
+
+
+def validate_driver(driver):
+    """Validate and return a load driver name."""
+    if driver not in CONFIG["DRIVERS"]:
+        raise ValueError(
+            f"Invalid driver. Please use one of {', '.join(CONFIG['DRIVERS'])}"
+        )
+    return driver
+
+
+def validate_read_preference(mode):
+    """Validate and return a MongoDB read preference mode."""
+    if mode not in CONFIG["MONGODB_READ_PREFERENCES"]:
+        raise ValueError(
+            "Invalid read preference. Please use one of "
+            f"{', '.join(CONFIG['MONGODB_READ_PREFERENCES'])}"
+        )
+    return mode
+
+
+def validate_consistency_level(level):
+    """Validate and return a Cassandra consistency level (case-insensitive)."""
+    if level.upper() not in CONFIG["CASSANDRA_CONSISTENCY_LEVELS"]:
+        raise ValueError(
+            "Invalid consistency level. Please use one of "
+            f"{', '.join(CONFIG['CASSANDRA_CONSISTENCY_LEVELS'])}"
+        )
+    return level.upper()
+
+
+def validate_replication_factor(rf, node_count):
+    """Validate and return a Cassandra replication factor."""
+    if not 0 < rf <= node_count:
+        raise ValueError(
+            f"Invalid replication factor. Please use 1 to node_count ({node_count})"
+        )
+    return rf
+
+
 def validate_iteration_count(count):
     """Validate and return iteration count."""
     if count <= 0:
@@ -29,6 +126,38 @@ def validate_iteration_count(count):
     return count
 
 
+def validate_pool_size(size):
+    """Validate and return the client connection pool size."""
+    if size <= 0:
+        raise ValueError("Invalid pool size. Please use a positive integer")
+    return size
+
+
+def validate_status_interval(interval):
+    """Validate and return the YCSB status interval in seconds."""
+    if interval <= 0:
+        raise ValueError("Invalid status interval. Please use a positive integer")
+    return interval
+
+
+def validate_telemetry_interval(interval):
+    """Validate and return the telemetry sampling interval (0 disables it)."""
+    if interval < 0:
+        raise ValueError(
+            "Invalid telemetry interval. Please use 0 or a positive number"
+        )
+    return interval
+
+
+def validate_target_precision(precision):
+    """Validate and return the relative CI half-width target."""
+    if not 0 < precision < 1:
+        raise ValueError(
+            "Invalid target precision. Please use a fraction between 0 and 1"
+        )
+    return precision
+
+
 def validate_workload_path(workload_file):
     """Validate and return the full workload path."""
     workload_path = f"{CONFIG['WORKLOADS_PATH']}/{workload_file}"
@@ -37,17 +166,197 @@ def validate_workload_path(workload_file):
     return workload_path
 
 
+def validate_client_count(count):
+    """Validate and return the YCSB client count ("auto" or a positive integer)."""
+    if count == "auto":
+        return count
+    count = int(count)
+    if count <= 0:
+        raise ValueError("Invalid client count. Please use a positive integer or auto")
+    return count
+
+
+def validate_client_cpus(count):
+    """Validate and return the number of CPUs reserved for YCSB."""
+    if count <= 0 or count >= len(os.sched_getaffinity(0)):
+        raise ValueError(
+            "Invalid client CPU count. Please leave at least one CPU for the nodes"
+        )
+    return count
+
+
+def resolve_client_count(count):
+    """Number of concurrent YCSB clients; "auto" derives it from host cores."""
+    if count == "auto":
+        return max(1, (os.cpu_count() or 1) // CONFIG["CORES_PER_YCSB_CLIENT"])
+    return count
+
+
+def parse_positive_int_list(value):
+    """Parse a comma-separated list of positive integers, e.g. "1,2,4"."""
+    numbers = [int(item) for item in value.split(",") if item.strip()]
+    if not numbers or any(n <= 0 for n in numbers):
+        raise ValueError(f"Invalid list: {value}. Please use positive integers")
+    return numbers
+
+
+def parse_rate_schedule(value):
+    """Parse an offered-rate schedule into a list of {"rate"} / {"percent"} steps.
+
+    Entries are comma-separated: a fixed rate in ops/sec ("5000"), a ramp
+    "start:stop:step" (inclusive), or either with a % suffix for a
+    percentage of the measured maximum throughput ("25%", "10%:100%:10%").
+    """
+    steps = []
+    for item in (item.strip() for item in value.split(",")):
+        if not item:
+            continue
+        percent = item.endswith("%")
+        fields = [float(field.rstrip("%")) for field in item.split(":")]
+        if len(fields) == 3:
+            start, stop, step = fields
+            if step <= 0 or stop < start:
+                raise ValueError(f"Invalid ramp: {item}. Please use start:stop:step")
+            count = round((stop - start) / step) + 1
+            values = [start + i * step for i in range(count)]
+        elif len(fields) == 1:
+            values = fields
+        else:
+            raise ValueError(f"Invalid rate: {item}. Please use R or start:stop:step")
+        if any(v <= 0 for v in values):
+            raise ValueError(f"Invalid rate: {item}. Please use positive rates")
+        steps += [{"percent": v} if percent else {"rate": v} for v in values]
+    if not steps:
+        raise ValueError(f"Invalid rate schedule: {value}")
+    return steps
+
+
+def read_workload_properties(workload_path):
+    """Read a YCSB workload (Java properties) file into a dict of strings."""
+    properties = {}
+    with open(workload_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith(("#", "!")) or "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            properties[key.strip()] = value.strip()
+    return properties
+
+
+def split_range(start, total, parts):
+    """Split [start, start + total) into `parts` contiguous (start, count) slices.
+
+    Slices differ in size by at most one; empty slices are dropped.
+    """
+    base, remainder = divmod(total, parts)
+    slices = []
+    for i in range(parts):
+        count = base + (1 if i < remainder else 0)
+        if count:
+            slices.append((start, count))
+        start += count
+    return slices
+
+
+def relative_precision(values):
+    """95% CI half-width relative to the mean (inf until there are 2 samples)."""
+    stats = aggregate_metric(values)
+    if len(values) < 2 or not stats["mean"]:
+        return float("inf")
+    return (stats["95ci"][1] - stats["95ci"][0]) / 2 / abs(stats["mean"])
+
+
+def iteration_precision(run_phases, include_p99=False):
+    """Relative CI precision of throughput (and each operation's p99).
+
+    Only operations with a p99 in every iteration are checked; sections such
+    as "<OP>-FAILED" only show up in some iterations and would never reach
+    the target on their few samples.
+    """
+    precision = {
+        "throughput_ops_sec": relative_precision(
+            [
+                p["overall"]["throughput_ops_sec"]
+                for p in run_phases
+                if "throughput_ops_sec" in p["overall"]
+            ]
+        )
+    }
+    if include_p99:
+        ops = {op for p in run_phases for op in p["operations"] if op != "CLEANUP"}
+        for op in sorted(ops):
+            values = [
+                p["operations"][op]["p99_latency_us"]
+                for p in run_phases
+                if "p99_latency_us" in p["operations"].get(op, {})
+            ]
+            if len(values) == len(run_phases):
+                precision[f"{op}.p99_latency_us"] = relative_precision(values)
+    return precision
+
+
+def run_iterations(params, results):
+    """Yield run iteration indices for a run_db_workload loop.
+
+    Runs `iteration_count` iterations, or with `target_precision` set keeps
+    going (at least `min_iterations`, at most `iteration_count`) until the
+    relative 95% CI half-width of throughput, and with `precision_p99` of
+    every operation's p99, is at or below the target. The loop body must
+    append each run phase to results["phases"] before asking for the next
+    index. The stop reason and achieved precision go to results["adaptive"].
+    """
+    maximum = params["iteration_count"]
+    target = params["target_precision"]
+    if not target or not maximum:
+        print(f"Starting {maximum} run iterations...")
+        for i in range(maximum):
+            print(f"\n Running iteration {i + 1}/{maximum}...", end="", flush=True)
+            yield i
+        return
+
+    minimum = min(
+        params["min_iterations"] or CONFIG["ADAPTIVE_MIN_ITERATIONS"], maximum
+    )
+    first_phase = len(results["phases"])
+    print(
+        f"Starting {minimum}-{maximum} run iterations "
+        f"(until the 95% CI is within ±{target:.1%})..."
+    )
+    stop_reason = "max_iterations"
+    precision = {}
+    for i in range(maximum):
+        print(f"\n Running iteration {i + 1} (max {maximum})...", end="", flush=True)
+        yield i
+        run_phases = results["phases"][first_phase:]
+        precision = iteration_precision(run_phases, params["precision_p99"])
+        if i + 1 >= minimum and max(precision.values()) <= target:
+            stop_reason = "precision_reached"
+            break
+
+    results["adaptive"] = {
+        "target_precision": target,
+        "min_iterations": minimum,
+        "max_iterations": maximum,
+        "iterations": len(results["phases"]) - first_phase,
+        "stop_reason": stop_reason,
+        "precision": precision,
+    }
+    print(
+        f"\n\n✓ Stopped after {results['adaptive']['iterations']} iterations "
+        f"({stop_reason}, throughput ±{precision['throughput_ops_sec']:.1%})"
+    )
+
+
 def aggregate_metric(values):
     """Compute mean, standard deviation and 95% confidence interval."""
-    n = len(values)
-    mean = sum(values) / n
-    sd = math.sqrt(sum((x - mean) ** 2 for x in values) / (n - 1)) if n > 1 else 0
-    ci = 0
-    if n > 1:
-        t = stats.t.ppf(0.975, n - 1)  # 95% CI, two-tailed
-        ci = t * sd / math.sqrt(n)
+    # Imported here: scipy takes a second to import, and the native driver's
+    # start-up shouldn't pay for it
+    from stats_engine import t_statistics
+
+    result = t_statistics(np.asarray(values, dtype=float))
     return {
-        "mean": mean,
-        "sd": sd,
-        "95ci": (mean - ci, mean + ci),
+        "mean": float(result["mean"]),
+        "sd": float(result["sd"]),
+        "95ci": (float(result["ci_low"]), float(result["ci_high"])),
     }
@@ -1,43 +1,38 @@
+import glob
 import json
 import os
+import time
+from itertools import zip_longest
 
-from cassandra.cassandra_operations import (
-    handle_cassandra_workload as handle_cassandra_workload_impl,
-)
+from compare import compare_phases, json_rows, print_comparison
 from config import CONFIG, params
-from mongodb.mongodb_operations import (
-    handle_mongodb_workload as handle_mongodb_workload_impl,
-)
-from redis.redis_operations import (
-    handle_redis_workload as handle_redis_workload_impl,
+from docker_handler import reset_database
+from engines import get_engine
+from fault_injector import aggregate_fault_impact
+from histogram_handler import histogram_summary, merge_histograms
+from results_store import append_run, source_key
+from snapshot_cache import save_snapshot
+from trace_generator import trace_summary
+from utils import (
+    aggregate_metric,
+    database_label,
+    read_workload_properties,
+    run_iterations,
+    topology_summary,
 )
-from utils import aggregate_metric
-from ycsb_handler import parse_ycsb_output, ycsb_wrapper
+from ycsb_handler import INTENDED_PREFIX, parse_ycsb_output, ycsb_wrapper
 
 
 def prepare_workload(workload_path: str) -> str:
-    """Read the workload file and add database-specific connection settings."""
+    """Read the workload file and add database-specific connection settings.
+
+    Every node of the cluster is listed as an endpoint where the YCSB binding
+    can use more than one, so the client doesn't funnel through one node.
+    """
     with open(workload_path, "r") as f:
         workload_data = f.read()
 
-    # Add database-specific configuration
-    if params["db"] == "redis":
-        workload_data += """
-# Redis connection settings (auto-added)
-redis.host=localhost
-redis.port=6379
-"""
-    elif params["db"] == "mongodb":
-        workload_data += """
-# MongoDB connection settings (auto-added)
-mongodb.url=mongodb://localhost:27017
-"""
-    elif params["db"] == "cassandra":
-        workload_data += """
-# Cassandra connection settings (auto-added)
-hosts=localhost
-port=9042
-"""
+    workload_data += get_engine(params["db"]).connection_properties(params, CONFIG)
 
     # Write to a temporary workload file with configuration
     output_path = f"{CONFIG['WORKLOADS_PATH']}/{params['db']}_workload_temp.txt"
@@ -47,32 +42,97 @@ port=9042
     return output_path
 
 
+def write_workload_overrides(workload_path: str, overrides: dict, tag: str) -> str:
+    """Write a copy of a workload file with extra properties appended."""
+    with open(workload_path, "r") as f:
+        workload_data = f.read()
+
+    workload_data += "\n# Overrides (auto-added)\n"
+    for key, value in overrides.items():
+        workload_data += f"{key}={value}\n"
+
+    output_path = f"{CONFIG['WORKLOADS_PATH']}/{params['db']}_workload_temp_{tag}.txt"
+    with open(output_path, "w") as f:
+        f.write(workload_data)
+
+    return output_path
+
+
+def run_db_workload(workload_path: str, run_params: dict):
+    """Load (unless skipped) and run iterations with the given parameters."""
+    engine = get_engine(run_params["db"])
+    results = {
+        "workload": os.path.splitext(os.path.basename(run_params["workload_path"]))[0],
+        "database": database_label(run_params, engine.variant(run_params)),
+        "node_count": run_params["node_count"],
+        "topology": topology_summary(run_params),
+        **engine.settings(run_params),
+        "phases": [],
+    }
+
+    if run_params["skip_load"]:
+        print("Skipping YCSB load phase (dataset already loaded)")
+    else:
+        engine.setup_schema(run_params, CONFIG)
+
+        print("Starting YCSB load phase...")
+        load_output = ycsb_wrapper(CONFIG["YCSB_LOAD_COMMAND"], 0, workload_path)
+        results["phases"].append(parse_ycsb_output(load_output, "load", 0))
+        print("\n\n✓ Load phase complete!\n")
+
+    for i in run_iterations(run_params, results):
+        run_output = ycsb_wrapper(CONFIG["YCSB_RUN_COMMAND"], i, workload_path)
+        results["phases"].append(parse_ycsb_output(run_output, "run", i))
+
+    if params["network"]:
+        results["network"] = params["network"]
+    if run_params["trace"]:
+        results["trace"] = trace_summary(run_params["trace"])
+    return results
+
+
+def run_load_phase(workload_path: str):
+    """Run the database setup and load phase only, without run iterations.
+
+    With the snapshot cache enabled, the freshly loaded volumes are saved so
+    later invocations can restore them instead of loading.
+    """
+    start_time = time.time()
+    load_results = run_db_workload(workload_path, dict(params, iteration_count=0))
+    load_time_s = time.time() - start_time
+    if (
+        load_results is not None
+        and params["snapshot_cache"]
+        and not params["skip_load"]
+    ):
+        params["snapshot"] = save_snapshot(load_time_s)
+    return load_results
+
+
 def handle_workload(workload_path: str):
-    results = None
-    if params["db"] == "redis":
-        results = handle_redis_workload_impl(
-            workload_path, params, CONFIG, ycsb_wrapper, parse_ycsb_output
-        )
-    elif params["db"] == "mongodb":
-        results = handle_mongodb_workload_impl(
-            workload_path,
-            params,
-            CONFIG,
-            ycsb_wrapper,
-            parse_ycsb_output,
-        )
-    elif params["db"] == "cassandra":
-        results = handle_cassandra_workload_impl(
-            workload_path,
-            params,
-            CONFIG,
-            ycsb_wrapper,
-            parse_ycsb_output,
-        )
+    if params["snapshot_cache"] and not params["skip_load"]:
+        # Load separately so the snapshot is taken before any run iteration
+        load_results = run_load_phase(workload_path)
+        results = run_db_workload(workload_path, dict(params, skip_load=True))
+        if results is not None and load_results is not None:
+            results["phases"] = load_results["phases"] + results["phases"]
+    else:
+        results = run_db_workload(workload_path, params)
 
     if results is not None:
+        if params["snapshot"]:
+            results["snapshot"] = params["snapshot"]
+        if params["matrix"]:
+            results["matrix"] = params["matrix"]
+        if params["startup"]:
+            results["startup"] = params["startup"]
+        if params["placement"]:
+            results["placement"] = params["placement"]
         aggregated_stats = aggregate_run_phase_metrics(results)
         results["aggregated_stats"] = aggregated_stats
+        report_request_spread(
+            aggregated_stats, get_engine(params["db"]).client_nodes(params)
+        )
         save_results_json(results)
 
         print("\n✓ Done running all iterations!")
@@ -80,21 +140,330 @@ def handle_workload(workload_path: str):
         print("Error: No results to save. Exiting...")
 
 
+def handle_cross_check(workload_path: str):
+    """Run the same workload with every load driver and compare them.
+
+    Each driver loads its own dataset (the database is reset in between,
+    unless the dataset was restored from a snapshot) and runs the
+    iterations; the run phases of the native driver are then compared with
+    YCSB's like compare.py does. A discrepancy beyond the usual noise points
+    at one of the clients rather than at the database.
+    """
+    results = None
+    drivers = {}
+    for i, driver in enumerate(CONFIG["DRIVERS"]):
+        print(f"\n\nCross-check {i + 1}/{len(CONFIG['DRIVERS'])}: {driver} driver")
+        if i and not params["skip_load"]:
+            print("Resetting database for the next driver...")
+            reset_database()
+        params["driver"] = driver
+        driver_results = run_db_workload(workload_path, params)
+        for phase in driver_results["phases"]:
+            phase["driver"] = driver
+        drivers[driver] = {
+            "database": driver_results["database"],
+            "aggregated_stats": aggregate_run_phase_metrics(driver_results),
+        }
+        if results is None:
+            results = driver_results
+        else:
+            results["phases"] += driver_results["phases"]
+    params["driver"] = "ycsb"
+
+    baseline, candidate = (
+        [p for p in results["phases"] if p["phase"] == "run" and p["driver"] == driver]
+        for driver in CONFIG["DRIVERS"]
+    )
+    rows = compare_phases(baseline, candidate)
+    print("\n\nBaseline: ycsb driver, candidate: native driver\n")
+    print_comparison(rows, "welch")
+
+    results.update(mode="cross_check", drivers=drivers, comparison=json_rows(rows))
+    if params["snapshot"]:
+        results["snapshot"] = params["snapshot"]
+    save_results_json(results, suffix="cross_check")
+
+    differing = [
+        row["metric"] for row in rows if row["verdict"] in ("improvement", "regression")
+    ]
+    if differing:
+        print(f"\n{len(differing)} metric(s) differ between the drivers")
+    elif any(row["verdict"] == "too few samples" for row in rows):
+        print("\nRun at least 2 iterations to test the differences")
+    else:
+        print("\n✓ The drivers agree on every compared metric")
+
+
+def run_step(workload_path: str, overrides: dict) -> dict:
+    """Run iterations with workload overrides on the already loaded dataset."""
+    step_path = write_workload_overrides(workload_path, overrides, "step")
+    step_results = run_db_workload(step_path, dict(params, skip_load=True))
+    step = {
+        "overrides": overrides,
+        "phases": step_results["phases"],
+        "aggregated_stats": aggregate_run_phase_metrics(step_results),
+    }
+    if "adaptive" in step_results:
+        step["adaptive"] = step_results["adaptive"]
+    return step
+
+
+def saturation_schedule(threadcounts: list, targets: list) -> list:
+    """Pair thread counts with optional target rates, padding the shorter list.
+
+    A shorter list repeats its last value, so `threads=[1, 2, 4]` with
+    `targets=[]` raises threads only, and one thread count with several
+    targets raises the target rate only.
+    """
+    threadcounts = threadcounts or [None]
+    targets = targets or [None]
+    return [
+        (
+            threads if threads is not None else threadcounts[-1],
+            target if target is not None else targets[-1],
+        )
+        for threads, target in zip_longest(threadcounts, targets)
+    ]
+
+
+def step_p99_latency_us(aggregated: dict):
+    """Worst merged p99 across operation types (CLEANUP excluded)."""
+    p99_values = [
+        stats["p99"]
+        for op, stats in aggregated.get("latency_percentiles_us", {}).items()
+        if op != "CLEANUP"
+    ]
+    return max(p99_values) if p99_values else None
+
+
+def handle_saturation(workload_path: str):
+    """Raise threadcount (and optionally target) until throughput stops improving.
+
+    The dataset is loaded once; every step then runs `iteration_count` run
+    iterations with the step's overrides. The sweep stops once throughput has
+    failed to improve by SATURATION_MIN_GAIN for SATURATION_PATIENCE steps in
+    a row, or the worst p99 exceeds the configured SLO. The knee is the
+    highest-throughput step that met the SLO.
+    """
+    load_results = run_load_phase(workload_path)
+    if load_results is None:
+        print("Error: No results to save. Exiting...")
+        return
+
+    results = dict(load_results, mode="saturation", steps=[])
+    if params["snapshot"]:
+        results["snapshot"] = params["snapshot"]
+    curve = []
+    stop_reason = "schedule_exhausted"
+    best_throughput = 0
+    steps_without_gain = 0
+    slo = params["p99_slo_us"]
+
+    schedule = saturation_schedule(
+        params["saturation_threadcounts"], params["saturation_targets"]
+    )
+    for step, (threadcount, target) in enumerate(schedule):
+        overrides = {}
+        if threadcount is not None:
+            overrides["threadcount"] = threadcount
+        if target is not None:
+            overrides["target"] = target
+        print(
+            f"\n\nSaturation step {step + 1}/{len(schedule)}: "
+            f"threadcount={threadcount}, target={target or 'unbounded'}"
+        )
+
+        results["steps"].append(run_step(workload_path, overrides))
+        aggregated = results["steps"][-1]["aggregated_stats"]
+        throughput = aggregated.get("throughput_ops_sec", {}).get("mean", 0)
+        p99 = step_p99_latency_us(aggregated) if aggregated else None
+
+        point = {
+            "threadcount": threadcount,
+            "target": target,
+            "throughput_ops_sec": throughput,
+            "p99_latency_us": p99,
+            "meets_slo": slo is None or (p99 is not None and p99 <= slo),
+        }
+        curve.append(point)
+        print(f"\n → {throughput:.1f} ops/sec, p99 {p99} us")
+
+        if not point["meets_slo"]:
+            stop_reason = "p99_slo_exceeded"
+            break
+        if throughput > best_throughput * (1 + CONFIG["SATURATION_MIN_GAIN"]):
+            steps_without_gain = 0
+        else:
+            steps_without_gain += 1
+        best_throughput = max(best_throughput, throughput)
+        if steps_without_gain >= CONFIG["SATURATION_PATIENCE"]:
+            stop_reason = "throughput_plateau"
+            break
+
+    within_slo = [p for p in curve if p["meets_slo"]]
+    knee = (
+        max(within_slo, key=lambda p: p["throughput_ops_sec"]) if within_slo else None
+    )
+    results["saturation"] = {
+        "curve": curve,
+        "knee": knee,
+        "stop_reason": stop_reason,
+        "p99_slo_us": slo,
+        "min_gain": CONFIG["SATURATION_MIN_GAIN"],
+    }
+    save_results_json(results, suffix="saturation")
+
+    if knee:
+        print(
+            f"\n✓ Knee at threadcount={knee['threadcount']}, target={knee['target']}: "
+            f"{knee['throughput_ops_sec']:.1f} ops/sec ({stop_reason})"
+        )
+    else:
+        print(f"\nNo step met the p99 SLO ({stop_reason})")
+
+
+# Merged histogram summary entries kept per point of the open-loop curve
+OPEN_LOOP_SUMMARY_KEYS = ("p50", "p90", "p99", "p99_9", "p99_99", "max", "mean")
+
+
+def open_loop_point(offered: float, aggregated: dict) -> dict:
+    """One point of the latency-vs-offered-load curve.
+
+    Per operation, the service time is measured from when the request was
+    actually sent and the response time from when the schedule intended to
+    send it, so the latter includes the time spent queueing behind slow
+    requests (coordinated omission).
+    """
+    percentiles = aggregated.get("latency_percentiles_us", {})
+    achieved = aggregated.get("throughput_ops_sec", {}).get("mean", 0)
+    operations = {}
+    for op, summary in percentiles.items():
+        if op == "CLEANUP" or op.startswith(INTENDED_PREFIX):
+            continue
+        response = percentiles.get(f"{INTENDED_PREFIX}{op}", {})
+        operations[op] = {
+            "service_time_us": {k: summary[k] for k in OPEN_LOOP_SUMMARY_KEYS},
+            "response_time_us": {
+                k: response[k] for k in OPEN_LOOP_SUMMARY_KEYS if k in response
+            },
+        }
+    return {
+        "offered_ops_sec": offered,
+        "achieved_ops_sec": achieved,
+        "sustained": achieved >= offered * CONFIG["OPEN_LOOP_MIN_ACHIEVED"],
+        "operations": operations,
+    }
+
+
+def handle_open_loop(workload_path: str):
+    """Drive the run phase at a schedule of offered rates (open loop).
+
+    The dataset is loaded once. Percentage steps are resolved against the
+    throughput of an unthrottled calibration step at the same threadcount.
+    Every rate step runs with YCSB's intended-time measurement, so each point
+    of the curve has both service-time and response-time percentiles. The
+    sweep stops after the first rate the cluster could not sustain.
+    """
+    load_results = run_load_phase(workload_path)
+    if load_results is None:
+        print("Error: No results to save. Exiting...")
+        return
+
+    results = dict(load_results, mode="open_loop", steps=[])
+    if params["snapshot"]:
+        results["snapshot"] = params["snapshot"]
+    threadcount = (
+        max(params["saturation_threadcounts"] or [0]) or CONFIG["OPEN_LOOP_THREADCOUNT"]
+    )
+    schedule = params["open_loop_rates"]
+
+    max_throughput = None
+    if any("percent" in step for step in schedule):
+        print(f"\n\nCalibration step: threadcount={threadcount}, target=unbounded")
+        calibration = run_step(workload_path, {"threadcount": threadcount})
+        results["calibration"] = calibration
+        max_throughput = (
+            calibration["aggregated_stats"].get("throughput_ops_sec", {}).get("mean")
+        )
+        if not max_throughput:
+            print("Error: Calibration step measured no throughput. Exiting...")
+            return
+        print(f"\n → max {max_throughput:.1f} ops/sec")
+
+    curve = []
+    stop_reason = "schedule_exhausted"
+    for i, step in enumerate(schedule):
+        offered = step.get("rate") or step["percent"] / 100 * max_throughput
+        target = max(1, round(offered))
+        print(
+            f"\n\nOpen-loop step {i + 1}/{len(schedule)}: "
+            f"target={target} ops/sec, threadcount={threadcount}"
+        )
+        overrides = {
+            "threadcount": threadcount,
+            "target": target,
+            "measurement.interval": "both",
+        }
+        results["steps"].append(run_step(workload_path, overrides))
+        point = open_loop_point(target, results["steps"][-1]["aggregated_stats"])
+        if "percent" in step:
+            point["percent_of_max"] = step["percent"]
+        curve.append(point)
+        print_open_loop_point(point)
+
+        if not point["sustained"]:
+            stop_reason = "rate_not_sustained"
+            break
+
+    results["open_loop"] = {
+        "threadcount": threadcount,
+        "max_throughput_ops_sec": max_throughput,
+        "min_achieved": CONFIG["OPEN_LOOP_MIN_ACHIEVED"],
+        "curve": curve,
+        "stop_reason": stop_reason,
+    }
+    save_results_json(results, suffix="open_loop")
+
+    sustained = [p for p in curve if p["sustained"]]
+    if sustained:
+        print(
+            f"\n✓ Highest sustained rate: {sustained[-1]['offered_ops_sec']} ops/sec "
+            f"({stop_reason})"
+        )
+    else:
+        print(f"\nNo offered rate was sustained ({stop_reason})")
+
+
+def print_open_loop_point(point: dict):
+    print(
+        f"\n → offered {point['offered_ops_sec']} ops/sec, "
+        f"achieved {point['achieved_ops_sec']:.1f} ops/sec"
+    )
+    for op, latency in point["operations"].items():
+        service, response = latency["service_time_us"], latency["response_time_us"]
+        print(
+            f"   {op}: p99 service {service['p99']} us, "
+            f"response {response.get('p99', 'n/a')} us"
+        )
+
+
 def cleanup_temp_workload():
-    """Delete the temporary workload file created with database settings."""
-    temp_workload_path = f"{CONFIG['WORKLOADS_PATH']}/{params['db']}_workload_temp.txt"
-    try:
-        if os.path.exists(temp_workload_path):
+    """Delete the temporary workload files created with database settings."""
+    pattern = f"{CONFIG['WORKLOADS_PATH']}/{params['db']}_workload_temp*.txt"
+    for temp_workload_path in glob.glob(pattern):
+        try:
             os.remove(temp_workload_path)
             print(f"✓ Cleaned up temporary workload file: {temp_workload_path}")
-    except Exception as e:
-        print(f"Warning: Could not delete temporary workload file: {e}")
+        except Exception as e:
+            print(f"Warning: Could not delete temporary workload file: {e}")
 
 
-def save_results_json(results: dict):
-    db = params["db"]
+def save_results_json(results: dict, suffix: str | None = None):
+    db = results["database"]
     node_count = params["node_count"]
     workload_name = results["workload"]
+    if suffix:
+        workload_name = f"{workload_name}_{suffix}"
 
     results_dir = f"{CONFIG['RESULTS_PATH']}/{db}/{node_count}"
     os.makedirs(results_dir, exist_ok=True)
@@ -105,6 +474,13 @@ def save_results_json(results: dict):
 
     print(f"\n\n✓ Results saved to {results_file}")
 
+    run_id = append_run(
+        results,
+        read_workload_properties(params["workload_path"]),
+        source_file=source_key(results_file),
+    )
+    print(f"✓ Run #{run_id} appended to {CONFIG['RESULTS_DB_PATH']}")
+
 
 def aggregate_run_phase_metrics(results):
     """Aggregate throughput and operation latencies from all run-phase iterations."""
@@ -115,8 +491,13 @@ def aggregate_run_phase_metrics(results):
     aggregated = {}
 
     # Overall throughput
-    throughput_values = [p["overall"]["throughput_ops_sec"] for p in run_phases]
-    aggregated["throughput_ops_sec"] = aggregate_metric(throughput_values)
+    throughput_values = [
+        p["overall"]["throughput_ops_sec"]
+        for p in run_phases
+        if "throughput_ops_sec" in p["overall"]
+    ]
+    if throughput_values:
+        aggregated["throughput_ops_sec"] = aggregate_metric(throughput_values)
 
     # Find all operation types dynamically
     op_types = set()
@@ -126,10 +507,92 @@ def aggregate_run_phase_metrics(results):
     # Aggregate latencies per operation
     latency_stats = {}
     for op in op_types:
-        # Average latency
-        values = [p["operations"][op]["avg_latency_us"] for p in run_phases]
+        # Average latency, over the iterations where this op type occurred
+        values = [
+            p["operations"][op]["avg_latency_us"]
+            for p in run_phases
+            if "avg_latency_us" in p["operations"].get(op, {})
+        ]
         if values:
             latency_stats[op] = aggregate_metric(values)
 
     aggregated["avg_latency_us"] = latency_stats
+    aggregated["latency_percentiles_us"] = aggregate_run_phase_histograms(run_phases)
+    aggregated["telemetry"] = aggregate_run_phase_telemetry(run_phases)
+    if any(p.get("faults") for p in run_phases):
+        aggregated["faults"] = aggregate_fault_impact(run_phases)
+    return aggregated
+
+
+def aggregate_run_phase_telemetry(run_phases):
+    """Per-container resource summaries and request shares across run iterations."""
+    containers = {}
+    for p in run_phases:
+        for name, columns in p.get("telemetry", {}).get("containers", {}).items():
+            containers.setdefault(name, []).append(columns["summary"])
+
+    aggregated = {}
+    for name, summaries in containers.items():
+        aggregated[name] = {}
+        for key in ("cpu_pct_mean", "cpu_pct_max", "mem_bytes_max"):
+            values = [s[key] for s in summaries if s.get(key) is not None]
+            if values:
+                aggregated[name][key] = aggregate_metric(values)
+
+    # Share of the requests each node served
+    shares = {}
+    for p in run_phases:
+        for name, share in (
+            p.get("telemetry", {}).get("requests", {}).get("share", {}).items()
+        ):
+            shares.setdefault(name, []).append(share)
+    for name, values in shares.items():
+        aggregated.setdefault(name, {})["request_share"] = aggregate_metric(values)
     return aggregated
+
+
+def report_request_spread(aggregated_stats: dict, client_nodes: list):
+    """Print how evenly the run phases' requests were spread over the nodes.
+
+    Only `client_nodes`, the nodes the topology routes client requests to,
+    are expected to serve any; e.g. Redis replicas always serve none.
+    """
+    shares = {
+        name: stats["request_share"]["mean"]
+        for name, stats in aggregated_stats.get("telemetry", {}).items()
+        if "request_share" in stats
+    }
+    if not shares:
+        return
+    idle = [
+        name for name, share in shares.items() if share == 0 and name in client_nodes
+    ]
+    if idle:
+        print(f"Warning: {', '.join(idle)} served no requests during the run phases")
+    else:
+        print(f"✓ Requests spread over all {len(client_nodes)} client-facing nodes")
+    print(
+        "  Request share: "
+        + ", ".join(f"{name} {share:.0%}" for name, share in shares.items())
+    )
+
+
+def aggregate_run_phase_histograms(run_phases):
+    """Merge each operation's HdrHistograms across iterations.
+
+    Percentiles can't be averaged, so the per-iteration histograms are summed
+    and the percentiles read off the merged histogram. The merged histogram is
+    kept (base64 compressed) so it can be combined again later.
+    """
+    encoded_by_op = {}
+    for p in run_phases:
+        for op, encoded in p.get("histograms", {}).items():
+            encoded_by_op.setdefault(op, []).append(encoded)
+
+    merged_stats = {}
+    for op, encoded_histograms in encoded_by_op.items():
+        merged = merge_histograms(encoded_histograms)
+        merged_stats[op] = histogram_summary(merged)
+        merged_stats[op]["iterations"] = len(encoded_histograms)
+        merged_stats[op]["histogram"] = merged.encode().decode("ascii")
+    return merged_stats
@@ -1,145 +1,622 @@
+import os
 import re
+import signal
 import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from config import CONFIG, params
+from docker_handler import wait_for_cluster_ready
+from engines import get_engine
+from fault_injector import FaultInjector, fault_impact
+from histogram_handler import (
+    REPORTED_PERCENTILES,
+    collect_hdr_histograms,
+    histogram_summary,
+    merge_histograms,
+)
+from network_emulation import NetworkProfileError, apply_network_profile
+from resources import client_pinning
+from telemetry import TelemetrySampler, telemetry_enabled
+from trace_generator import trace_length
+from utils import read_workload_properties, resolve_client_count, split_range
 
+# "[SECTION], metric, value" summary lines, e.g. "[READ], AverageLatency(us), 412.3"
+SUMMARY_LINE_RE = re.compile(r"^\[([^\]]+)\], ([^,]+), (.+)$")
 
-def ycsb_wrapper(command_type: str, iteration: int, workload_path: str) -> str:
+# [OVERALL] metric -> (phase_data["overall"] key, cast)
+OVERALL_METRICS = {
+    "RunTime(ms)": ("runtime_ms", float),
+    "Throughput(ops/sec)": ("throughput_ops_sec", float),
+}
+
+# Per-operation metric -> (phase_data["operations"][op] key, cast)
+OPERATION_METRICS = {
+    "Operations": ("count", int),
+    "AverageLatency(us)": ("avg_latency_us", float),
+    "MinLatency(us)": ("min_latency_us", float),
+    "MaxLatency(us)": ("max_latency_us", float),
+    "95thPercentileLatency(us)": ("p95_latency_us", float),
+    "99thPercentileLatency(us)": ("p99_latency_us", float),
+    "Return=OK": ("return_ok", int),
+}
+
+# Percentiles YCSB prints in the summary when measuring with hdrhistogram
+HDR_SUMMARY_PERCENTILES = "50,90,95,99,99.9,99.99"
+PERCENTILE_METRIC_SUFFIX = "thPercentileLatency(us)"
+RETURN_METRIC_PREFIX = "Return="
+
+OPERATION_TYPES = {
+    "READ",
+    "INSERT",
+    "UPDATE",
+    "DELETE",
+    "SCAN",
+    "READ-MODIFY-WRITE",
+    "CLEANUP",
+}
+
+# With measurement.interval=both, YCSB also measures every operation from its
+# intended start time (open-loop response time), reported as "Intended-<OP>"
+INTENDED_PREFIX = "Intended-"
+
+# Operations that didn't return OK are measured separately as "<OP>-FAILED"
+FAILED_SUFFIX = "-FAILED"
+
+
+def operation_type(section: str) -> str:
+    """Operation of a summary section, e.g. "Intended-READ-FAILED" -> "READ"."""
+    return section.removeprefix(INTENDED_PREFIX).removesuffix(FAILED_SUFFIX)
+
+
+# Periodic status line printed by `-s`, e.g.
+# "2024-05-01 10:00:10:123 10 sec: 4810 operations; 481 current ops/sec; ...
+#  [READ: Count=2395, Max=8191, Min=143, Avg=412.3, 90=602, 99=1203, ...]"
+STATUS_LINE_RE = re.compile(r"(\d+) sec: (\d+) operations; ([\d.]+) current ops/sec")
+STATUS_OPERATION_RE = re.compile(r"\[([A-Za-z-]+): ([^\]]*)\]")
+
+# Per-operation status field -> timeline latency column
+STATUS_LATENCY_FIELDS = {
+    "Avg": "avg",
+    "Max": "max",
+    "99": "p99",
+}
+
+# Summary sections echoed to the console while the phase is running
+ECHOED_SECTIONS = ("[READ]", "[UPDATE]", "[OVERALL]", "[INSERT]")
+
+
+class YcsbProcess:
+    """A running YCSB client whose output is consumed line by line.
+
+    Iterating yields stripped output lines as YCSB prints them, so nothing is
+    buffered beyond the current line. A watchdog kills the process once
+    `timeout` seconds have elapsed; iteration then ends normally and whatever
+    was read up to that point is still available to the parser.
+
+    If `hdr_dir` is set, the `.hdr` latency logs YCSB exports there are
+    collected into `histograms` once the process has exited. If
+    `telemetry_interval` is set, container and host counters are sampled
+    while the process runs and kept in `telemetry`, timed like the status
+    timeline from the first status line. If `faults` is set, the
+    fault schedule is applied while the process runs, timed from its first
+    status line, and the cluster is healed afterwards; what happened is kept
+    in `faults`. The client's wall
+    time, start-up included, is kept in `wall_time_s`.
+    """
+
+    def __init__(
+        self,
+        cmd: list,
+        timeout: float = 600,
+        hdr_dir: str | None = None,
+        telemetry_interval: float | None = None,
+        faults: list | None = None,
+    ):
+        self.cmd = cmd
+        self.timeout = timeout
+        self.hdr_dir = hdr_dir
+        self.telemetry_interval = telemetry_interval
+        self.timed_out = False
+        self.returncode = None
+        self.histograms = {}
+        self.telemetry = {}
+        self.fault_schedule = faults
+        self.faults = {}
+        self.wall_time_s = None
+
+    def _kill(self, process):
+        self.timed_out = True
+        self._kill_group(process)
+
+    @staticmethod
+    def _kill_group(process):
+        # ycsb.sh forks the JVM, so the whole process group has to go
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def __iter__(self):
+        print(f" Running: {' '.join(self.cmd)}")
+        sampler = None
+        if self.telemetry_interval:
+            sampler = TelemetrySampler(self.telemetry_interval)
+            # Baseline the request counters before the client sends anything
+            sampler.mark_requests()
+
+        started = time.monotonic()
+        try:
+            process = subprocess.Popen(
+                [*client_pinning(), *self.cmd],
+                stdout=subprocess.PIPE,
+                # Status lines go to stderr; merge them into the same stream
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                start_new_session=True,
+            )
+        except Exception as e:
+            print(f"\n    ERROR: {str(e)}")
+            return
+        if sampler is not None:
+            sampler.start()
+        injector = None
+        if self.fault_schedule:
+            injector = FaultInjector(self.fault_schedule)
+            injector.start()
+
+        watchdog = threading.Timer(self.timeout, self._kill, args=(process,))
+        watchdog.daemon = True
+        watchdog.start()
+        anchored = False
+        try:
+            for line in process.stdout:
+                line = line.strip()
+                if not line:
+                    continue
+                if line.startswith(ECHOED_SECTIONS):
+                    print(f"\n    {line}", end="")
+                elif not anchored and " sec: " in line:
+                    match = STATUS_LINE_RE.search(line)
+                    if match:
+                        # Put faults and telemetry on the timeline's clock
+                        anchored = True
+                        for clock in (injector, sampler):
+                            if clock is not None:
+                                clock.anchor(int(match.group(1)))
+                yield line
+        finally:
+            watchdog.cancel()
+            if process.poll() is None:
+                # The consumer stopped early; don't leave the JVM behind
+                self._kill_group(process)
+            process.stdout.close()
+            self.returncode = process.wait()
+            self.wall_time_s = time.monotonic() - started
+            if injector is not None:
+                self.faults = injector.stop()
+                if injector.disturbed():
+                    print("\n    Waiting for the cluster to recover from the faults...")
+                    wait_for_cluster_ready()
+            if sampler is not None:
+                self.telemetry = sampler.stop()
+            if self.hdr_dir:
+                self.histograms = collect_hdr_histograms(self.hdr_dir)
+
+            if self.timed_out:
+                print(
+                    f"\n    ERROR: YCSB command timed out after {self.timeout:g} seconds"
+                )
+            elif self.returncode != 0:
+                print(f"\n    WARNING: YCSB exited with code {self.returncode}")
+
+
+class YcsbFanOut:
+    """Several YCSB clients running one phase concurrently, one share each."""
+
+    def __init__(self, clients: list):
+        self.clients = clients
+
+
+def build_ycsb_process(
+    command_type: str,
+    iteration: int,
+    workload_path: str,
+    client: int = 0,
+    extra_properties: dict | None = None,
+) -> YcsbProcess:
     db = params["db"]
-    db_binding = "cassandra-cql" if db == "cassandra" else db
-    output_lines = []
+    db_binding = get_engine(db).ycsb_binding
+    hdr_dir = tempfile.mkdtemp(prefix=f"ycsb_{db}_{command_type}_{iteration}_{client}_")
 
-    try:
-        process = subprocess.Popen(
-            [
-                CONFIG["YCSB_BIN_PATH"],
-                command_type,
-                db_binding,
-                "-s",
-                "-P",
-                workload_path,
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            text=True,
+    if params["driver"] == "native":
+        client_cmd = [sys.executable, CONFIG["NATIVE_DRIVER_PATH"]]
+    else:
+        client_cmd = [CONFIG["YCSB_BIN_PATH"]]
+    cmd = [
+        *client_cmd,
+        command_type,
+        db_binding,
+        "-s",
+        "-P",
+        workload_path,
+        "-p",
+        f"status.interval={params['status_interval']}",
+        "-p",
+        "measurementtype=hdrhistogram",
+        "-p",
+        "hdrhistogram.fileoutput=true",
+        "-p",
+        f"hdrhistogram.output.path={hdr_dir}/",
+        "-p",
+        f"hdrhistogram.percentiles={HDR_SUMMARY_PERCENTILES}",
+    ]
+    if params["trace"] and command_type == CONFIG["YCSB_RUN_COMMAND"]:
+        cmd += ["-p", f"trace.file={params['trace']}"]
+    for key, value in (extra_properties or {}).items():
+        cmd += ["-p", f"{key}={value}"]
+    return YcsbProcess(
+        cmd,
+        timeout=CONFIG["YCSB_TIMEOUT_SEC"],
+        hdr_dir=hdr_dir,
+        # One sampler per phase is enough, so only the first client samples
+        telemetry_interval=params["telemetry_interval"]
+        if client == 0 and telemetry_enabled()
+        else None,
+        # Faults are injected during run phases only, by the first client
+        faults=params["faults"]
+        if client == 0 and command_type == CONFIG["YCSB_RUN_COMMAND"]
+        else None,
+    )
+
+
+def client_shares(command_type: str, workload_path: str, client_count: int) -> list:
+    """Per-client property overrides that partition one phase between clients.
+
+    Load: each client inserts its own insertstart/insertcount slice of the
+    key space. Run: operationcount (and target, if set) is divided between
+    the clients; when replaying a trace, each client replays its own slice.
+    """
+    properties = read_workload_properties(workload_path)
+    if command_type == CONFIG["YCSB_LOAD_COMMAND"]:
+        start = int(properties.get("insertstart", 0))
+        total = int(
+            properties.get("insertcount", int(properties.get("recordcount", 0)) - start)
         )
+        return [
+            {"insertstart": share_start, "insertcount": share_count}
+            for share_start, share_count in split_range(start, total, client_count)
+        ]
 
-        cmd = [
-            CONFIG["YCSB_BIN_PATH"],
-            command_type,
-            db_binding,
-            "-s",
-            "-P",
-            workload_path,
+    total = int(properties.get("operationcount", 0))
+    if params["trace"]:
+        # Each client replays its own slice, so together they send the trace once
+        total = total or trace_length(params["trace"])
+        shares = [
+            {"operationcount": share_count, "trace.start": share_start}
+            for share_start, share_count in split_range(0, total, client_count)
+        ]
+    elif total == 0:
+        # operationcount=0 runs until maxexecutiontime, on every client
+        shares = [{"operationcount": 0} for _ in range(client_count)]
+    else:
+        shares = [
+            {"operationcount": share_count}
+            for _, share_count in split_range(0, total, client_count)
         ]
-        print(f" Running: {' '.join(cmd)}")
+    if "target" in properties:
+        # target is per client; split it so the offered rate stays the same
+        targets = split_range(0, int(properties["target"]), len(shares))
+        for i, share in enumerate(shares):
+            share["target"] = targets[i][1] if i < len(targets) else 1
+    return shares
 
-        try:
-            stdout_data, stderr_data = process.communicate(timeout=600)
-        except subprocess.TimeoutExpired:
-            process.kill()
-            stdout_data, stderr_data = process.communicate()
-            print("\n    ERROR: YCSB command timed out after 10 minutes")
-
-        for line in stdout_data.split("\n"):
-            if line:
-                output_lines.append(line)
-                if (
-                    "[READ]" in line
-                    or "[UPDATE]" in line
-                    or "[OVERALL]" in line
-                    or "[INSERT]" in line
-                ):
-                    print(f"\n    {line.strip()}", end="")
-
-        if process.returncode != 0:
-            print(f"\n    WARNING: YCSB exited with code {process.returncode}")
 
+def ycsb_wrapper(command_type: str, iteration: int, workload_path: str):
+    try:
+        # Before every phase, so containers restarted since are shaped too
+        apply_network_profile()
     except Exception as e:
-        print(f"\n    ERROR: {str(e)}")
+        # Running on anyway would save unshaped results under the profile's label
+        raise NetworkProfileError(f"Could not apply network profile: {e}") from e
+    client_count = resolve_client_count(params["client_count"])
+    if client_count <= 1:
+        return build_ycsb_process(command_type, iteration, workload_path)
+
+    shares = client_shares(command_type, workload_path, client_count)
+    print(f" Fanning out over {len(shares)} YCSB clients")
+    return YcsbFanOut(
+        [
+            build_ycsb_process(command_type, iteration, workload_path, client, share)
+            for client, share in enumerate(shares)
+        ]
+    )
+
+
+def new_timeline() -> dict:
+    """Empty columnar status timeline; every column shares one index."""
+    return {
+        "elapsed_s": [],
+        "ops": [],
+        "ops_per_sec": [],
+        "failed_ops": [],
+        "latency_us": {},
+    }
+
+
+def append_status_sample(timeline: dict, line: str) -> bool:
+    """Append one status line to the timeline. Returns False if it isn't one."""
+    match = STATUS_LINE_RE.search(line)
+    if not match:
+        return False
 
-    return "\n".join(output_lines)
+    index = len(timeline["elapsed_s"])
+    timeline["elapsed_s"].append(int(match.group(1)))
+    timeline["ops"].append(int(match.group(2)))
+    timeline["ops_per_sec"].append(float(match.group(3)))
+    timeline["failed_ops"].append(0)
 
+    for op_type, fields in STATUS_OPERATION_RE.findall(line, match.end()):
+        columns = timeline["latency_us"].get(op_type)
+        if columns is None:
+            # Op type first seen mid-run: back-fill so columns stay aligned
+            columns = {
+                column: [None] * index for column in STATUS_LATENCY_FIELDS.values()
+            }
+            timeline["latency_us"][op_type] = columns
 
-def parse_ycsb_output(output: str, phase: str, iteration: int) -> dict:
+        values = dict(
+            field.split("=", 1) for field in fields.split(", ") if "=" in field
+        )
+        if op_type.endswith(FAILED_SUFFIX) and not op_type.startswith(INTENDED_PREFIX):
+            timeline["failed_ops"][index] += int(values.get("Count", 0))
+        for field, column in STATUS_LATENCY_FIELDS.items():
+            try:
+                columns[column].append(float(values[field]))
+            except (KeyError, ValueError):
+                columns[column].append(None)
+
+    # Op types missing from this line still need a slot
+    for columns in timeline["latency_us"].values():
+        for values in columns.values():
+            if len(values) <= index:
+                values.append(None)
+
+    return True
+
+
+def parse_ycsb_output(output, phase: str, iteration: int) -> dict:
+    """Parse YCSB output in a single pass.
+
+    `output` is any iterable of lines (typically the `YcsbProcess` returned by
+    `ycsb_wrapper`) or a complete output string. Summary lines are dispatched
+    on their `[SECTION], metric` prefix, so each line is matched once;
+    `-s` status lines are collected into a columnar `timeline`, and any
+    HdrHistograms the process exported are attached as `histograms`.
+    """
     phase_data = {
         "phase": phase,
         "iteration": iteration,
         "overall": {},
         "operations": {},
+        "timeline": new_timeline(),
     }
 
-    lines = output.split("\n")
-    for line in lines:
+    if isinstance(output, str):
+        output = output.splitlines()
+
+    clients = getattr(output, "clients", None)
+    if clients is not None:
+        with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+            client_phases = list(
+                executor.map(
+                    lambda client: parse_ycsb_output(client, phase, iteration), clients
+                )
+            )
+        return merge_client_phases(client_phases, phase, iteration)
+
+    overall = phase_data["overall"]
+    operations = phase_data["operations"]
+    timeline = phase_data["timeline"]
+
+    for line in output:
         line = line.strip()
+        if not line.startswith("["):
+            if " sec: " in line:
+                append_status_sample(timeline, line)
+            continue
+
+        match = SUMMARY_LINE_RE.match(line)
+        if not match:
+            continue
+        section, metric, value = match.groups()
+
+        try:
+            if section == "OVERALL":
+                if metric in OVERALL_METRICS:
+                    key, cast = OVERALL_METRICS[metric]
+                    overall[key] = cast(value)
+            elif operation_type(section) in OPERATION_TYPES:
+                if metric in OPERATION_METRICS:
+                    key, cast = OPERATION_METRICS[metric]
+                    operations.setdefault(section, {})[key] = cast(value)
+                elif metric.startswith(RETURN_METRIC_PREFIX):
+                    # Return=ERROR, Return=NOT_FOUND, ...: anything but OK
+                    stats = operations.setdefault(section, {})
+                    stats["return_failed"] = stats.get("return_failed", 0) + int(value)
+                elif metric.endswith(PERCENTILE_METRIC_SUFFIX):
+                    # "99.9thPercentileLatency(us)" -> "p99_9_latency_us"
+                    percentile = metric[: -len(PERCENTILE_METRIC_SUFFIX)]
+                    key = f"p{percentile.replace('.', '_')}_latency_us"
+                    operations.setdefault(section, {})[key] = float(value)
+        except ValueError:
+            continue
+
+    if getattr(output, "timed_out", False):
+        phase_data["timed_out"] = True
+
+    histograms = getattr(output, "histograms", None)
+    if histograms:
+        phase_data["histograms"] = histograms
 
-        if line.startswith("[OVERALL], RunTime(ms),"):
-            runtime = float(line.split(",")[2])
-            phase_data["overall"]["runtime_ms"] = runtime
-
-        elif line.startswith("[OVERALL], Throughput(ops/sec),"):
-            throughput = float(line.split(",")[2])
-            phase_data["overall"]["throughput_ops_sec"] = throughput
-
-        elif re.match(r"\[(READ|INSERT|UPDATE|DELETE|CLEANUP)\], Operations,", line):
-            op_type = re.match(r"\[(\w+)\]", line).group(1)
-            count = int(line.split(",")[2])
-            if op_type not in phase_data["operations"]:
-                phase_data["operations"][op_type] = {}
-            phase_data["operations"][op_type]["count"] = count
-
-        elif re.match(
-            r"\[(READ|INSERT|UPDATE|DELETE|CLEANUP)\], AverageLatency\(us\),", line
-        ):
-            op_type = re.match(r"\[(\w+)\]", line).group(1)
-            latency = float(line.split(",")[2])
-            if op_type not in phase_data["operations"]:
-                phase_data["operations"][op_type] = {}
-            phase_data["operations"][op_type]["avg_latency_us"] = latency
-
-        elif re.match(
-            r"\[(READ|INSERT|UPDATE|DELETE|CLEANUP)\], MinLatency\(us\),", line
-        ):
-            op_type = re.match(r"\[(\w+)\]", line).group(1)
-            latency = float(line.split(",")[2])
-            if op_type not in phase_data["operations"]:
-                phase_data["operations"][op_type] = {}
-            phase_data["operations"][op_type]["min_latency_us"] = latency
-
-        elif re.match(
-            r"\[(READ|INSERT|UPDATE|DELETE|CLEANUP)\], MaxLatency\(us\),", line
-        ):
-            op_type = re.match(r"\[(\w+)\]", line).group(1)
-            latency = float(line.split(",")[2])
-            if op_type not in phase_data["operations"]:
-                phase_data["operations"][op_type] = {}
-            phase_data["operations"][op_type]["max_latency_us"] = latency
-
-        elif re.match(
-            r"\[(READ|INSERT|UPDATE|DELETE|CLEANUP)\], 95thPercentileLatency\(us\),",
-            line,
-        ):
-            op_type = re.match(r"\[(\w+)\]", line).group(1)
-            latency = float(line.split(",")[2])
-            if op_type not in phase_data["operations"]:
-                phase_data["operations"][op_type] = {}
-            phase_data["operations"][op_type]["p95_latency_us"] = latency
-
-        elif re.match(
-            r"\[(READ|INSERT|UPDATE|DELETE|CLEANUP)\], 99thPercentileLatency\(us\),",
-            line,
-        ):
-            op_type = re.match(r"\[(\w+)\]", line).group(1)
-            latency = float(line.split(",")[2])
-            if op_type not in phase_data["operations"]:
-                phase_data["operations"][op_type] = {}
-            phase_data["operations"][op_type]["p99_latency_us"] = latency
-
-        elif re.match(r"\[(READ|INSERT|UPDATE|DELETE)\], Return=OK,", line):
-            op_type = re.match(r"\[(\w+)\]", line).group(1)
-            count = int(line.split(",")[2])
-            if op_type not in phase_data["operations"]:
-                phase_data["operations"][op_type] = {}
-            phase_data["operations"][op_type]["return_ok"] = count
+    telemetry = getattr(output, "telemetry", None)
+    if telemetry:
+        phase_data["telemetry"] = telemetry
+
+    wall_time_s = getattr(output, "wall_time_s", None)
+    if wall_time_s is not None:
+        phase_data["client_wall_s"] = wall_time_s
+
+    faults = getattr(output, "faults", None)
+    if faults:
+        phase_data["faults"] = dict(
+            faults, impact=fault_impact(timeline, faults["events"], OPERATION_TYPES)
+        )
 
     return phase_data
+
+
+def merge_client_phases(client_phases: list, phase: str, iteration: int) -> dict:
+    """Combine the phases of concurrent clients into one phase result.
+
+    Throughput is total operations over the slowest client's runtime, counts
+    are summed, and latency percentiles are read from the merged histograms
+    (falling back to the worst client when no histogram was exported).
+    """
+    merged = {
+        "phase": phase,
+        "iteration": iteration,
+        "overall": {},
+        "operations": {},
+        "timeline": merge_timelines([p["timeline"] for p in client_phases]),
+        "clients": len(client_phases),
+    }
+    if client_phases and client_phases[0].get("telemetry"):
+        merged["telemetry"] = client_phases[0]["telemetry"]
+    if client_phases and client_phases[0].get("faults"):
+        faults = client_phases[0]["faults"]
+        merged["faults"] = dict(
+            faults,
+            impact=fault_impact(merged["timeline"], faults["events"], OPERATION_TYPES),
+        )
+
+    encoded_by_op = {}
+    for p in client_phases:
+        for op, encoded in p.get("histograms", {}).items():
+            encoded_by_op.setdefault(op, []).append(encoded)
+    histograms = {op: merge_histograms(e) for op, e in encoded_by_op.items()}
+    if histograms:
+        merged["histograms"] = {
+            op: h.encode().decode("ascii") for op, h in histograms.items()
+        }
+
+    for p in client_phases:
+        for op, stats in p["operations"].items():
+            target = merged["operations"].setdefault(op, {})
+            for key, value in stats.items():
+                if key in ("count", "return_ok", "return_failed"):
+                    target[key] = target.get(key, 0) + value
+                elif key == "min_latency_us":
+                    target[key] = min(target.get(key, value), value)
+                elif key.endswith("_latency_us") and key != "avg_latency_us":
+                    # max and percentiles; percentiles are overwritten below
+                    target[key] = max(target.get(key, value), value)
+
+    for op, target in merged["operations"].items():
+        weighted = [
+            (p["operations"][op]["avg_latency_us"], p["operations"][op].get("count", 0))
+            for p in client_phases
+            if "avg_latency_us" in p["operations"].get(op, {})
+        ]
+        total_count = sum(count for _, count in weighted)
+        if total_count:
+            target["avg_latency_us"] = (
+                sum(avg * count for avg, count in weighted) / total_count
+            )
+
+        if op in histograms:
+            summary = histogram_summary(histograms[op])
+            for key in REPORTED_PERCENTILES:
+                if f"{key}_latency_us" in target:
+                    target[f"{key}_latency_us"] = float(summary[key])
+            if "p95_latency_us" in target:
+                target["p95_latency_us"] = float(
+                    histograms[op].get_value_at_percentile(95.0)
+                )
+
+    runtimes = [
+        p["overall"]["runtime_ms"]
+        for p in client_phases
+        if "runtime_ms" in p["overall"]
+    ]
+    if runtimes:
+        merged["overall"]["runtime_ms"] = max(runtimes)
+    total_ops = sum(
+        stats.get("count", 0)
+        for op, stats in merged["operations"].items()
+        if op != "CLEANUP" and not op.startswith(INTENDED_PREFIX)
+    )
+    if runtimes and max(runtimes) > 0 and total_ops:
+        merged["overall"]["throughput_ops_sec"] = total_ops / (max(runtimes) / 1000)
+    else:
+        merged["overall"]["throughput_ops_sec"] = sum(
+            p["overall"].get("throughput_ops_sec", 0) for p in client_phases
+        )
+
+    wall_times = [p["client_wall_s"] for p in client_phases if "client_wall_s" in p]
+    if wall_times:
+        merged["client_wall_s"] = max(wall_times)
+
+    if any(p.get("timed_out") for p in client_phases):
+        merged["timed_out"] = True
+
+    return merged
+
+
+def merge_timelines(timelines: list) -> dict:
+    """Sum concurrent client timelines sample by sample.
+
+    Clients share the status interval, so sample i of every client covers the
+    same window. A client that already finished contributes its final op
+    count and no throughput. Latency columns take the mean of avg and the
+    worst of max/p99.
+    """
+    merged = new_timeline()
+    length = max((len(t["elapsed_s"]) for t in timelines), default=0)
+    op_types = {op for t in timelines for op in t["latency_us"]}
+    for op in op_types:
+        merged["latency_us"][op] = {
+            column: [] for column in STATUS_LATENCY_FIELDS.values()
+        }
+
+    for i in range(length):
+        active = [t for t in timelines if i < len(t["elapsed_s"])]
+        merged["elapsed_s"].append(max(t["elapsed_s"][i] for t in active))
+        merged["ops"].append(
+            sum(t["ops"][min(i, len(t["ops"]) - 1)] for t in timelines if t["ops"])
+        )
+        merged["ops_per_sec"].append(sum(t["ops_per_sec"][i] for t in active))
+        merged["failed_ops"].append(
+            sum(t["failed_ops"][i] for t in active if i < len(t.get("failed_ops", [])))
+        )
+
+        for op, columns in merged["latency_us"].items():
+            for column, values in columns.items():
+                samples = [
+                    t["latency_us"][op][column][i]
+                    for t in active
+                    if op in t["latency_us"]
+                    and t["latency_us"][op][column][i] is not None
+                ]
+                if not samples:
+                    values.append(None)
+                elif column == "avg":
+                    values.append(sum(samples) / len(samples))
+                else:
+                    values.append(max(samples))
+
+    return merged